@@ -3,13 +3,13 @@ import time
 import os
 import logging
 
+# Add the src directory to Python path (config imports from stringZ)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
 from app import create_app
 
 logging.getLogger('werkzeug').setLevel(logging.WARNING)
 
-# Add the src directory to Python path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
-
 app = create_app()
 
 def open_browser():
@@ -1,6 +1,12 @@
 from flask import Flask
 from flask_session import Session
 from config import DevelopmentConfig
+from app.services.dataset_cache import DatasetCache
+from app.services.dataset_store import DatasetStore
+from app.services.job_service import JobManager
+from app.services.processing_service import warm_up
+import multiprocessing
+import os
 import tempfile
 
 def create_app(config_class=DevelopmentConfig):
@@ -19,6 +25,31 @@ def create_app(config_class=DevelopmentConfig):
 
     Session(app)
 
+    # Content-addressed files of all sessions
+    store = DatasetStore(app.config.get('DATASET_STORE_DIR') or os.path.join(tempfile.gettempdir(), 'stringz_store'))
+    app.extensions['dataset_store'] = store
+
+    # In-process cache of datasets and derived results, shared by all requests
+    app.extensions['dataset_cache'] = DatasetCache(app.config.get('DATASET_CACHE_MAX_MB', 256) * 1024 * 1024)
+
+    # Background processing jobs
+    jobs = JobManager(
+        workers=app.config.get('PROCESS_WORKERS', 1),
+        max_queued=app.config.get('PROCESS_QUEUE_SIZE', 4),
+        retention=app.config.get('PROCESS_JOB_RETENTION', 3600),
+        warm_up=warm_up
+    )
+    app.extensions['job_manager'] = jobs
+
+    # Start the workers now, except in the debug reloader's watcher process and in the
+    # workers themselves (they import the main module again); otherwise the first job does
+    reloader_watcher = app.debug and os.environ.get('WERKZEUG_RUN_MAIN') != 'true'
+    if not reloader_watcher and multiprocessing.parent_process() is None:
+        # Files of abandoned sessions and jobs
+        store.collect()
+        if app.config.get('PROCESS_PREWARM', True):
+            jobs.start()
+
     # Blueprints register
     from app.routes.main import main_bp
     from app.routes.upload import upload_bp
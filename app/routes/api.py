@@ -1,34 +1,34 @@
-import os
 import html
 import pandas as pd
-from flask import Blueprint, request, session, jsonify
+import pyarrow.compute as pc
+from flask import Blueprint, request, session, jsonify, current_app
+
+from app.services.file_services import FileService
+from app.services.dataset_cache import get_dataset_cache, cache_key, processed_files, load_processed_dataset
+from app.services.dataset_store import get_dataset_store
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
 @api_bp.route('/page_data')
 def get_page_data():
     """API endpoint to get page data for results"""
-    if 'processed_dataset' not in session or 'processing_stats' not in session:
+    if 'processed_files' not in session or 'processing_stats' not in session:
         return jsonify({'error': 'No processed data found'}), 400
     
     try:
-        # Get the processed dataset stored in the current session
-        temp_file = session.get('temp_file')
-        if not temp_file or not os.path.exists(temp_file):
-            return jsonify({'error': 'Original data not found'}), 400
-            
         # Get basic info from session
         stats = session['processing_stats']['processing_summary']
         target_language = session.get('target_language')
         str_id_col = session.get('str_id_col')
         source_col = session.get('source_col')
         
-        # Calculate completion rate (Indicates whether all the rows were processed)
-        df = pd.read_pickle(temp_file)
-        columns_to_keep = [str_id_col, source_col, target_language]
-        df_filtered = df[columns_to_keep].copy()
-        
-        completion_rate = (df_filtered[target_language].notna().sum() / len(df_filtered) * 100) if len(df_filtered) > 0 else 0
+        # Calculate completion rate (Indicates whether all the rows were processed), once per dataset version
+        completion_rate = get_dataset_cache().get_or_create(
+            cache_key(session, 'completion_rate', target_language),
+            lambda: _completion_rate(get_dataset_store().path(session.get('dataset_file')), target_language)
+        )
+        if completion_rate is None:
+            return jsonify({'error': 'Original data not found'}), 400
         
         return jsonify({
             'success': True,
@@ -56,82 +56,28 @@ def get_review_data():
     try:       
         # Use the stored processed dataframe directly
         processed_file = session.get('processed_file')
-        if not processed_file or not os.path.exists(processed_file):
+        if get_dataset_store().path(processed_file) is None:
             print("ERROR: No processed file found")
             return jsonify({'error': 'No processed data found. Please process file first.'}), 400
         
-        # Load the EXACT same processed dataframe used for downloads
-        df_display = pd.read_pickle(processed_file)
-
         # Get language info from session
         source_col = session.get('source_col')
         target_language = session.get('target_language')
         
-        # Get search and filter parameters
+        # Get search, filter and paging parameters
         search = request.args.get('search', '').strip()
         filter_type = request.args.get('filter', 'all')
+        page = max(1, request.args.get('page', 1, type=int) or 1)
+        per_page = request.args.get('per_page', '100')
+        per_page = None if per_page == 'all' else max(1, int(per_page))
         
-        # Apply filtering
-        filtered_df = df_display.copy()
-        
-        # Search filter
-        if search:
-            mask = filtered_df.astype(str).apply(
-                lambda x: x.str.contains(search, case=False, na=False)
-            ).any(axis=1)
-            filtered_df = filtered_df[mask]
-        
-        # Type filters
-        if filter_type == 'missing' and target_language in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df[target_language].isna()]
-        elif filter_type == 'priority' and 'Occurrences' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['Occurrences'] > 5]
-        
-        # Get first 100 rows for display
-        display_df = filtered_df.head(100)
-        
-        # Convert to records
-        records = []
-        for _, row in display_df.iterrows():
-            occurrences_val = row.get('Occurrences', 1)
-            if pd.isna(occurrences_val):
-                occurrences_val = 1
-            
-            record = {
-                'strId': str(row.get('strId', '')),
-                'source': str(row.get(source_col, '')),
-                'target': str(row.get(target_language, '') if target_language in row else ''),
-                'occurrences': int(occurrences_val)
-            }
-            records.append(record)
-        
-        # Calculate metrics
-        missing_count = 0
-        high_priority_count = 0
-        
-        if target_language in filtered_df.columns:
-            missing_count = int(filtered_df[target_language].isna().sum())
-        
-        if 'Occurrences' in filtered_df.columns:
-            high_priority_count = int((filtered_df['Occurrences'] > 5).sum())
-        
-        return jsonify({
-            'success': True,
-            'data': records,
-            'pagination': {
-                'total_entries': int(len(filtered_df)),
-                'showing': int(len(records))
-            },
-            'stats': {
-                'total_strings': int(len(filtered_df)),
-                'missing_translations': missing_count,
-                'high_priority': high_priority_count
-            },
-            'columns': {
-                'source_lang': source_col,
-                'target_lang': target_language
-            }
-        })
+        # Repeated queries (paging back, re-applying a filter) are answered from the cache
+        cache = get_dataset_cache()
+        response = cache.get_or_create(
+            cache_key(session, 'review', target_language, search, filter_type, page, per_page),
+            lambda: _review_response(processed_file, source_col, target_language, search, filter_type, page, per_page)
+        )
+        return jsonify(response)
         
     except Exception as e:
         print(f"ERROR in get_review_data: {str(e)}")
@@ -144,31 +90,26 @@ def get_review_data():
 def run_validations():
     """API endpoint to run LQA Validation"""
     try:       
-        from stringZ.models.data_models import TranslationDataset
-        from stringZ.validation.validators import run_validation
+        from stringZ.validation.validators import validate_languages
        
-        processed_file = session.get('processed_file')
-        if not processed_file or not os.path.exists(processed_file):
+        if get_dataset_store().path(session.get('processed_file')) is None:
             return jsonify({'error': 'No processed data found to validate'}), 400
-
-        df_processed = pd.read_pickle(processed_file)
-        print(f"DEBUG: Loaded processed DataFrame with {len(df_processed)} rows")
        
-        # Get stored session info
-        str_id_col = session.get('str_id_col')
-        source_col = session.get('source_col')
         target_language = session.get('target_language')
+        cache = get_dataset_cache()
+        workers = current_app.config.get('VALIDATION_WORKERS', 1)
 
-        # Create dataset from the PROCESSED dataframe
-        processed_dataset = TranslationDataset.from_dataframe(
-            df_processed,
-            source_col=source_col,
-            target_col=target_language,
-            str_id_col=str_id_col
-        )
+        def validate():
+            # Datasets from the PROCESSED data (shared with the visualizer), one per language processed in the run
+            processed_datasets = {
+                language: load_processed_dataset(session, language)
+                for language in processed_files(session)
+            }
+            return validate_languages(processed_datasets, workers=workers)
 
-        # Run validation directly on the processed dataset
-        validation_results = run_validation(processed_dataset)
+        # Validate every language once per processing run; the issues of the shown language are listed, the others summarised
+        language_results = cache.get_or_create(cache_key(session, 'validation'), validate)
+        validation_results = language_results[target_language]
         
         # Format results for frontend
         formatted_issues = []
@@ -191,7 +132,16 @@ def run_validations():
                 'warnings': validation_results['warnings']
             },
             'issues': formatted_issues,
-            'target_lang': target_language
+            'target_lang': target_language,
+            'languages': {
+                language: {
+                    'total_strings': results['total_strings'],
+                    'issues_found': results['issues_found'],
+                    'critical_issues': results['critical_issues'],
+                    'warnings': results['warnings']
+                }
+                for language, results in language_results.items()
+            }
         })
         
     except Exception as e:
@@ -200,3 +150,111 @@ def run_validations():
         print(f"TRACEBACK: {traceback.format_exc()}")
         return jsonify({'error': f'Validation failed: {str(e)}'}), 400
 
+
+@api_bp.route('/cache_stats')
+def get_cache_stats():
+    """API endpoint with the hit/miss counters and size of the dataset cache"""
+    return jsonify({'success': True, 'cache': get_dataset_cache().stats})
+
+
+@api_bp.route('/job_stats')
+def get_job_stats():
+    """API endpoint with the load of the processing worker pool"""
+    from app.services.job_service import get_job_manager
+    return jsonify({'success': True, 'jobs': get_job_manager().stats})
+
+
+def _completion_rate(dataset_file, target_language):
+    """Share of loaded rows with a translation, in percent (None when the data is gone)"""
+    # The loaded (unprocessed) dataset of the current session; only its target column is mapped
+    dataset_file = FileService.open_temp_dataset(dataset_file)
+    if dataset_file is None:
+        return None
+    with dataset_file:
+        if target_language not in dataset_file.languages:
+            return None
+        target = dataset_file.target(target_language)
+        return ((len(target) - target.null_count) / len(target) * 100) if len(target) > 0 else 0
+
+
+def _open_processed(processed_file):
+    """Memory-mapped processed file (a DatasetStore handle), kept open in the cache between requests"""
+    return get_dataset_cache().get_or_create(
+        cache_key(session, 'processed_file', processed_file),
+        lambda: FileService.open_processed_file(get_dataset_store().path(processed_file))
+    )
+
+
+def _search_index(processed_file, source_col, target_language):
+    """Search index of a processed file (strId, source and target text, missing/priority filters)"""
+    from stringZ.utils.search_index import SearchIndex
+
+    def build():
+        processed = _open_processed(processed_file)
+        columns = processed.column_names
+        texts = processed.read([name for name in ('strId', source_col, target_language) if name in columns])
+        
+        filters = {}
+        if target_language in columns:
+            filters['missing'] = pc.is_null(processed.column(target_language)).to_numpy(zero_copy_only=False)
+        if 'Occurrences' in columns:
+            priority = pc.fill_null(pc.greater(processed.column('Occurrences'), 5), False)
+            filters['priority'] = priority.to_numpy(zero_copy_only=False)
+        
+        return SearchIndex({name: texts[name].to_numpy() for name in texts.columns}, filters)
+
+    return get_dataset_cache().get_or_create(cache_key(session, 'search_index', processed_file), build)
+
+
+def _review_response(processed_file, source_col, target_language, search, filter_type, page, per_page):
+    """Review table payload: one page of the matching rows and counts over all of them"""
+    # The EXACT same processed data used for downloads, memory-mapped: the search index
+    # resolves the query and filter to row ids, and only the rows of the page are converted
+    processed = _open_processed(processed_file)
+    index = _search_index(processed_file, source_col, target_language)
+    rows = index.search(search, filter_type if filter_type in ('missing', 'priority') else None)
+    
+    per_page = per_page or max(1, len(rows))
+    total_pages = max(1, -(-len(rows) // per_page))
+    page = min(page, total_pages)
+    offset = (page - 1) * per_page
+    
+    display_df = processed.take(rows[offset:offset + per_page],
+                                [name for name in ('strId', source_col, target_language, 'Occurrences')
+                                 if name in processed.column_names])
+    
+    # Convert to records
+    records = []
+    for row in display_df.to_dict('records'):
+        occurrences_val = row.get('Occurrences', 1)
+        if pd.isna(occurrences_val):
+            occurrences_val = 1
+        
+        record = {
+            'strId': str(row.get('strId') or ''),
+            'source': str(row.get(source_col) or ''),
+            'target': str(row.get(target_language) or ''),
+            'occurrences': int(occurrences_val)
+        }
+        records.append(record)
+    
+    return {
+        'success': True,
+        'data': records,
+        'pagination': {
+            'total_entries': int(len(rows)),
+            'showing': int(len(records)),
+            'page': page,
+            'per_page': per_page,
+            'total_pages': total_pages
+        },
+        'stats': {
+            'total_strings': int(len(rows)),
+            'missing_translations': index.count(rows, 'missing'),
+            'high_priority': index.count(rows, 'priority')
+        },
+        'columns': {
+            'source_lang': source_col,
+            'target_lang': target_language
+        }
+    }
@@ -1,44 +1,37 @@
-from flask import Blueprint, session, flash, redirect, url_for, send_file
-import pandas as pd
-import os
-import io
+from flask import Blueprint, session, flash, redirect, url_for, send_file, request, Response
+from urllib.parse import quote
 import time
 import re
+import unicodedata
+
+from app.services.dataset_cache import session_id, processed_files, load_processed_dataset
+from app.services.dataset_store import get_dataset_store
+from app.services.file_services import FileService, CLUSTER_COLUMNS
 
 download_bp = Blueprint('download', __name__, url_prefix='/download')
 
 @download_bp.route('/visualizer')
 def download_visualizer():
-    """Download the HTML Visualizer"""
+    """Download the HTML Visualizer (?compact=1 embeds the data once, compressed)"""
     try:
-        from stringZ.models.data_models import TranslationDataset
-        from stringZ.export.visualizer import generate_visualizer_html
+        from stringZ.export.visualizer import write_visualizer_html
 
         # Use stored processedfile to recreate dataset
-        processed_file = session.get('processed_file')
-        if not processed_file  or not os.path.exists(processed_file):
+        if get_dataset_store().path(session.get('processed_file')) is None:
             flash('No processed data found. Please process file first.', 'error')
             return redirect(url_for('main.results'))
 
-        # Load processed dataframe
-        df_processed = pd.read_pickle(processed_file)
-
-        # Session info to properly recreate the dataset as DataFrame
-        source_col = session.get('source_col')
         target_language = session.get('target_language')
-        str_id_col = session.get('str_id_col')
-
-        # Finally create the dataset
-        processed_dataset = TranslationDataset.from_dataframe(
-            df_processed,
-            source_col=source_col,
-            target_col=target_language,
-            str_id_col=str_id_col
-        )
-
-        # Generate the Visualizer through the template
         original_filename = session.get('original_filename', 'processed')
-        visualizer_html = generate_visualizer_html(processed_dataset, original_filename)
+        compact = request.args.get('compact', '').lower() in ('1', 'true', 'yes')
+
+        # Write the Visualizer through the template from the processed dataset, once per processing run
+        visualizer_path = _export_file(
+            f"visualizer:{target_language}:{'compact' if compact else 'full'}",
+            lambda path: write_visualizer_html(load_processed_dataset(session, target_language), path,
+                                               original_filename, compact),
+            'html'
+        )
 
         # Create clean filename
         if original_filename:
@@ -48,13 +41,8 @@ def download_visualizer():
             current_time = int(time.time())
             filename = f"Visualizer-{target_language}-{current_time}.html"
 
-        # Create the final file object 
-        output = io.BytesIO()
-        output.write(visualizer_html.encode('utf-8'))
-        output.seek(0)
-
         return send_file(
-            output,
+            visualizer_path,
             as_attachment=True,
             download_name=filename,
             mimetype='text/html'
@@ -66,32 +54,81 @@ def download_visualizer():
 
 @download_bp.route('/spreadsheet')
 def download_spreadsheet():
-    """Download the processed Excel spreadsheet"""
+    """Download the processed Excel spreadsheet (?clusters=1 adds the cluster id, type and score columns)"""
     try:
-        # Use stored processed file from the current session
-        processed_file = session.get('processed_file')
-        if not processed_file or not os.path.exists(processed_file):
+        from stringZ.export.spreadsheet import stream_xlsx, MAX_ROWS
+
+        # Use the stored processed files of the current session; every language processed
+        # in the same run gets its own sheet
+        store = get_dataset_store()
+        files = {language: store.path(handle) for language, handle in processed_files(session).items()}
+        if store.path(session.get('processed_file')) is None or None in files.values():
             flash('No processed data found. Please process file first.', "error")
             return redirect(url_for("main.results"))
+        include_clusters = request.args.get('clusters', '').lower() in ('1', 'true', 'yes')
 
-        df_processed = pd.read_pickle(processed_file)
+        # Checked before streaming: once the first bytes are sent, errors can no longer redirect
+        for path in files.values():
+            with FileService.open_processed_file(path) as processed:
+                if len(processed) >= MAX_ROWS:
+                    raise ValueError(f"{len(processed)} rows do not fit in an Excel sheet")
 
-        # Create the Excel file object
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df_processed.to_excel(writer, sheet_name="Processed_Translations", index=False) 
-        output.seek(0)
+        sheets = [
+            (language if len(files) > 1 else "Processed_Translations", path)
+            for language, path in files.items()
+        ]
 
         original_filename = session.get('original_filename', 'processed')
         filename = f"{original_filename}_Processed.xlsx"
 
-        return send_file(
-            output,
-            as_attachment=True,
-            download_name=filename,
+        # Rows go from the memory-mapped processed files into the response chunk by chunk
+        response = Response(
+            stream_xlsx(_sheets(sheets, include_clusters)),
             mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         )
+        response.headers.set('Content-Disposition', 'attachment', **_download_names(filename))
+        response.cache_control.no_cache = True
+        return response
         
     except Exception as e:
         flash(f"Error generating spreadsheet: {str(e)}", "error")
         return redirect(url_for("main.results"))
+
+def _export_file(name, writer, extension):
+    """Path of an export of the session's processed data, written into the DatasetStore
+    by writer(path) on first use and kept (as a session reference) until the next processing run"""
+    store = get_dataset_store()
+    exports = session.get('export_files') or {}
+    path = store.path(exports.get(name))
+    if path is None:
+        handle = store.write(writer, extension, session_id(session))
+        session['export_files'] = {**exports, name: handle}
+        path = store.path(handle)
+    return path
+
+def _sheets(sheets, include_clusters):
+    """(name, header, row chunks) per (sheet name, processed file path); rows are read while streaming"""
+    result = []
+    for name, path in sheets:
+        processed = FileService.open_processed_file(path)
+        columns = [column for column in processed.column_names
+                   if include_clusters or column not in CLUSTER_COLUMNS]
+        result.append((name, columns, _chunks(processed, columns)))
+    return result
+
+def _chunks(processed, columns):
+    """Column value lists of consecutive row ranges of a processed file (closed at the end)"""
+    from stringZ.export.spreadsheet import CHUNK_ROWS
+
+    with processed:
+        for start in range(0, len(processed), CHUNK_ROWS):
+            yield [processed.column(column, start, start + CHUNK_ROWS).to_pylist() for column in columns]
+
+def _download_names(filename):
+    """Content-Disposition file name options, with an RFC 5987 name for non-ASCII names (like send_file)"""
+    try:
+        filename.encode('ascii')
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii')
+        return {'filename': simple, 'filename*': f"UTF-8''{quote(filename, safe='!#$&+-.^_`|~')}"}
+    return {'filename': filename}
@@ -1,12 +1,15 @@
-import os
 from flask import Blueprint, render_template, session, redirect, url_for, flash, send_from_directory
 
+from app.services.dataset_cache import get_dataset_cache, session_id
+from app.services.job_service import get_job_manager
+from app.services.dataset_store import get_dataset_store
+
 main_bp = Blueprint('main', __name__)
 
 @main_bp.route('/')
 def index():
     """Main page - show upload form or results based on the session"""
-    if 'processed_dataset' in session:
+    if 'processed_files' in session:
         return render_template('pages/results.html')
     else:
         return render_template('pages/upload.html')
@@ -14,7 +17,7 @@ def index():
 @main_bp.route('/results')
 def results():
     """Show processing results and download options"""
-    if 'processed_dataset' not in session:
+    if 'processed_files' not in session:
         flash('No processed dataset found. Please upload and process a file')
         return redirect(url_for('main.index'))
 
@@ -24,11 +27,21 @@ def results():
 def reset_session():
     """Clear the current session and start over"""
     
-        # Clean up temp files
-    if 'temp_file' in session:
-        temp_file = session['temp_file']
-        if os.path.exists(temp_file):
-            os.remove(temp_file)
+    # Cached data holds the files open
+    get_dataset_cache().invalidate(session_id(session))
+    
+    # Release the stored files; they are deleted unless another session uses them too
+    handles = [session.get('temp_file'), session.get('dataset_file')]
+    handles.extend((session.get('processed_files') or {}).values())
+    handles.extend((session.get('export_files') or {}).values())
+    store = get_dataset_store()
+    for handle in handles:
+        store.release(handle, session_id(session))
+    
+    # Stop a processing job that is still running for this session
+    job = get_job_manager().active_job(session_id(session))
+    if job is not None:
+        get_job_manager().cancel(job.id)
     
     session.clear()
     flash('Session cleared. You can now upload a new file.', 'info')
@@ -1,11 +1,17 @@
-from flask import Blueprint, request, session, jsonify
-import pandas as pd
-import os
+from flask import Blueprint, request, session, jsonify, url_for, Response
+import json
+import uuid
 from werkzeug.utils import secure_filename
 
 from app.services.file_services import FileService
+from app.services.dataset_cache import get_dataset_cache, new_dataset_version, session_id
+from app.services.job_service import get_job_manager, DONE, FAILED
+from app.services.dataset_store import get_dataset_store
 
 upload_bp = Blueprint('upload', __name__)
+
+# targetLanguage value that selects every language column of the file
+ALL_LANGUAGES = '__all__'
     
 @upload_bp.route('/upload', methods=['POST'])
 def upload_file():
@@ -20,17 +26,24 @@ def upload_file():
         return jsonify({'error': 'No file selected'}), 400
     
     if not FileService.allowed_file(file.filename, current_app.config['ALLOWED_EXTENSIONS']):
-        return jsonify({'error': 'Invalid file type. Please upload .xlsx or .xls files'}), 400
+        return jsonify({'error': 'Invalid file type. Please upload .xlsx, .xls, .csv, .tsv, .json, .jsonl, .xliff or .parquet files'}), 400
     
     try:
-        # Read the uploaded Excel file
-        df = pd.read_excel(file)
+        from stringZ.utils.file_utils import read_header
+        
+        # Keep the uploaded file in the store; only its header is parsed here,
+        # the needed columns are streamed once a target language is chosen
+        store = get_dataset_store()
+        temp_file = FileService.save_temp_upload(file, store, session_id(session))
+        store.replace([session.get('temp_file')], [temp_file], session_id(session))
+        session['temp_file'] = temp_file
+        columns, total_entries = read_header(store.path(temp_file))
         
         # Store original filename
         session['original_filename'] = secure_filename(file.filename)
         
         # Detect columns
-        str_id_col, source_col = FileService.detect_columns(df)
+        str_id_col, source_col = FileService.detect_columns(columns)
         
         if not str_id_col:
             return jsonify({'error': 'No string ID column found! Expected one of: KEY_NAME, strId, ID, strID, 字符串'}), 400
@@ -39,27 +52,23 @@ def upload_file():
             return jsonify({'error': 'No English source column found! Expected one of: EN, English, Source'}), 400
         
         # Find target language columns
-        lang_columns = [col for col in df.columns if col not in [str_id_col, source_col]]
+        lang_columns = [col for col in columns if col not in [str_id_col, source_col]]
         
         if not lang_columns:
             return jsonify({'error': f'No target language columns found! Make sure your file has columns other than {str_id_col} and {source_col}'}), 400
         
-        # Store the dataframe and column info in session (temporarily)
-        session['df_columns'] = df.columns.tolist()
+        # Store the column info and the uploaded file path in session
+        session['df_columns'] = columns
         session['str_id_col'] = str_id_col
         session['source_col'] = source_col
         session['lang_columns'] = lang_columns
         
-        # Save the dataframe temporarily  
-        temp_file = FileService.save_temp_file(df, id(session), current_app.config['UPLOAD_FOLDER'])
-        session['temp_file'] = temp_file
-        
         return jsonify({
             'success': True,
             'str_id_col': str_id_col,
             'source_col': source_col,
             'lang_columns': lang_columns,
-            'total_entries': len(df)
+            'total_entries': total_entries
         })
         
     except Exception as e:
@@ -67,40 +76,51 @@ def upload_file():
 
 @upload_bp.route('/load_data', methods=['POST'])
 def load_data():
-    """Load data with selected target language and show preview"""
+    """Load data with selected target language(s) and show preview"""
     try:
-        from stringZ.models.data_models import TranslationDataset
+        from stringZ.utils.file_utils import read_datasets
 
         target_language = request.json.get('targetLanguage')
         if not target_language:
             return jsonify({'error': 'No target language selected'}), 400
         
-        # Load the temporary dataframe
-        temp_file = session.get('temp_file')
-        if not temp_file or not os.path.exists(temp_file):
-            return jsonify({'error': 'No uploaded file found. Please upload again.'}), 400
+        # Either one language or all of them, processed together in one run
+        target_languages = session.get('lang_columns', []) if target_language == ALL_LANGUAGES else [target_language]
+        if not target_languages:
+            return jsonify({'error': 'No target language columns found. Please upload again.'}), 400
         
-        df = FileService.load_temp_file(temp_file)
+        # The uploaded file
+        store = get_dataset_store()
+        temp_file = store.path(session.get('temp_file'))
+        if temp_file is None:
+            return jsonify({'error': 'No uploaded file found. Please upload again.'}), 400
         
         # Get column info from session
         str_id_col = session.get('str_id_col')
         source_col = session.get('source_col')
         
-        # Create filtered dataframe with only needed columns
-        columns_to_keep = [str_id_col, source_col, target_language]
-        df_filtered = df[columns_to_keep].copy()
-        
-        # Create TranslationDataset
-        dataset = TranslationDataset.from_dataframe(
-            df_filtered,
+        # Stream only the needed columns of the uploaded file into the datasets, one per language
+        datasets = read_datasets(
+            temp_file,
+            str_id_col=str_id_col,
             source_col=source_col,
-            target_col=target_language,
-            str_id_col=str_id_col
+            target_cols=target_languages
         )
-        
-        # Store dataset info in session
+        dataset_file = FileService.save_temp_dataset(datasets, store, session_id(session))
+        
+        # Whatever was cached for the previous data of this session is stale now
+        cache = get_dataset_cache()
+        cache.invalidate(session_id(session))
+        new_dataset_version(session)
+        store.replace([session.get('dataset_file')], [dataset_file], session_id(session))
+        session['dataset_file'] = dataset_file
+        
+        # Store dataset info in session; the first language is the one shown in the results
+        target_language = target_languages[0]
+        dataset = datasets[target_language]
         session['dataset_loaded'] = True
         session['target_language'] = target_language
+        session['target_languages'] = target_languages
         session['total_entries'] = len(dataset)
         
         # Calculate some preview stats
@@ -127,7 +147,8 @@ def load_data():
             },
             'preview_data': preview_data,
             'source_lang': source_col,
-            'target_lang': target_language
+            'target_lang': target_language,
+            'target_languages': target_languages
         })
         
     except Exception as e:
@@ -136,88 +157,131 @@ def load_data():
 
 @upload_bp.route('/process', methods=['POST'])
 def process_file():
-    """Process the loaded dataset with selected options"""
+    """Queue processing of the loaded dataset with selected options; returns a job id to poll"""
     from flask import current_app
     try:
-        from stringZ.models.data_models import TranslationDataset
-        from stringZ.core.processor import TranslationProcessor, ProcessingConfig
+        from app.services.job_service import JobQueueFull
+        from app.services.processing_service import run_processing
         
         # Get processing options from request
         data = request.json
-        remove_duplicates = data.get('removeDuplicates', True)
-        sort_by_correlation = data.get('sortByCorrelation', True)
-        correlation_strategy = data.get('correlationStrategy', 'hybrid')
-        similarity_threshold = float(data.get('similarityThreshold', 0.7))
-        max_cluster_size = int(data.get('maxClusterSize', 15))
-        min_substring_length = int(data.get('minSubstringLength', 5))
-        
-        # Load the temporary dataframe and recreate dataset
-        temp_file = session.get('temp_file')
-        if not temp_file or not os.path.exists(temp_file):
+        options = {
+            'remove_duplicates': data.get('removeDuplicates', True),
+            'deduplication_strategy': "keep_first_with_occurrences",
+            'sort_by_correlation': data.get('sortByCorrelation', True),
+            'correlation_strategy': data.get('correlationStrategy', 'hybrid'),
+            'similarity_threshold': float(data.get('similarityThreshold', 0.7)),
+            'max_cluster_size': int(data.get('maxClusterSize', 15)),
+            'min_substring_length': int(data.get('minSubstringLength', 5)),
+            'similarity_mode': current_app.config.get('SIMILARITY_MODE', 'dense'),
+            'similarity_top_k': current_app.config.get('SIMILARITY_TOP_K', 20),
+            'workers': current_app.config.get('SIMILARITY_WORKERS', 1),
+            'vectorizer_cache_dir': current_app.config.get('VECTORIZER_CACHE_DIR'),
+            'vectorizer_cache_max_mb': current_app.config.get('VECTORIZER_CACHE_MAX_MB', 512)
+        }
+        
+        store = get_dataset_store()
+        dataset_file = store.path(session.get('dataset_file'))
+        if dataset_file is None:
             return jsonify({'error': 'No uploaded file found. Please upload again.'}), 400
         
-        df = FileService.load_temp_file(temp_file)
-        
-        # Get stored info
-        str_id_col = session.get('str_id_col')
-        source_col = session.get('source_col')
-        target_language = session.get('target_language')
-        
-        # Create filtered dataframe
-        columns_to_keep = [str_id_col, source_col, target_language]
-        df_filtered = df[columns_to_keep].copy()
-        
-        # Create dataset
-        dataset = TranslationDataset.from_dataframe(
-            df_filtered,
-            source_col=source_col,
-            target_col=target_language,
-            str_id_col=str_id_col
-        )
-        
-        # Create processing configuration
-        config = ProcessingConfig(
-            remove_duplicates=remove_duplicates,
-            deduplication_strategy="keep_first_with_occurrences",
-            sort_by_correlation=sort_by_correlation,
-            correlation_strategy=correlation_strategy,
-            similarity_threshold=similarity_threshold,
-            max_cluster_size=max_cluster_size,
-            min_substring_length=min_substring_length
-        )
-        
-        # Process the dataset
-        processor = TranslationProcessor(config)
-        processed_dataset = processor.process(dataset)
-        
-        processed_df = processed_dataset.to_dataframe()
-        processed_file = os.path.join(current_app.config['UPLOAD_FOLDER'], f"processed_{id(session)}.pkl")
-        processed_df.to_pickle(processed_file)
-        
-        # Store everything in session
-        session['processed_dataset'] = processed_dataset
-        session['processed_file'] = processed_file 
-        session['processing_stats'] = processor.get_processing_stats(processed_dataset)
-        
-        # Calculate final stats for metrics
-        target_word_count = 0
-        if target_language in processed_df.columns:
-            target_word_count = processed_df[target_language].dropna().astype(str).apply(lambda x: len(x.split())).sum()
-        
-        stats = session['processing_stats']['processing_summary']
-        
+        # One job per session at a time
+        jobs = get_job_manager()
+        owner = session_id(session)
+        if jobs.active_job(owner) is not None:
+            return jsonify({'error': 'A processing job is already running', 'job_id': jobs.active_job(owner).id}), 409
+        
+        # The pipeline runs in a worker process; this request only queues it
+        try:
+            job = jobs.submit(
+                owner, run_processing,
+                dataset_file, options, session.get('target_language'), store, uuid.uuid4().hex
+            )
+        except JobQueueFull as e:
+            response = jsonify({'error': f'The server is busy: {str(e)}'})
+            response.headers['Retry-After'] = str(current_app.config.get('PROCESS_RETRY_AFTER', 10))
+            return response, 429
+        
+        session['process_job'] = job.id
         return jsonify({
             'success': True,
-            'stats': {
-                'original_count': stats['original_count'],
-                'final_count': stats['final_count'],
-                'duplicates_removed': stats['duplicates_removed'],
-                'clusters_created': stats['clusters_created'],
-                'word_count': f"{target_word_count:,}",
-                'processing_time': stats['processing_time']
-            }
-        })
+            'job_id': job.id,
+            'status': job.status,
+            'status_url': url_for('upload.process_status', job_id=job.id),
+            'events_url': url_for('upload.process_events', job_id=job.id)
+        }), 202
         
     except Exception as e:
         return jsonify({'error': f'Processing failed: {str(e)}'}), 400
 
+
+@upload_bp.route('/process/<job_id>', methods=['GET'])
+def process_status(job_id):
+    """Status of a processing job; once it is done the results become the session's processed data"""
+    job = get_job_manager().get(job_id, owner=session_id(session))
+    if job is None:
+        return jsonify({'error': 'Processing job not found'}), 404
+    
+    status = job.to_dict()
+    if job.status == FAILED:
+        return jsonify({'error': f'Processing failed: {job.error}', 'job': status}), 400
+    if job.status != DONE:
+        return jsonify({'success': True, 'job': status})
+    
+    if session.get('finished_job') != job.id:
+        _store_results(job.result)
+        session['finished_job'] = job.id
+    
+    return jsonify({'success': True, 'job': status, **job.result['summary']})
+
+
+@upload_bp.route('/process/<job_id>/events', methods=['GET'])
+def process_events(job_id):
+    """Server-sent events with the job status on every change, until the job ends.
+    The results are stored in the session by the next status request."""
+    jobs = get_job_manager()
+    job = jobs.get(job_id, owner=session_id(session))
+    if job is None:
+        return jsonify({'error': 'Processing job not found'}), 404
+    
+    def events():
+        revision = None
+        while True:
+            revision = jobs.wait(job, revision, timeout=15)
+            yield f"data: {json.dumps(job.to_dict())}\n\n"
+            if job.is_final:
+                return
+    
+    return Response(events(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+
+@upload_bp.route('/process/<job_id>', methods=['DELETE'])
+def cancel_process(job_id):
+    """Cancel a queued or running processing job"""
+    jobs = get_job_manager()
+    job = jobs.get(job_id, owner=session_id(session))
+    if job is None:
+        return jsonify({'error': 'Processing job not found'}), 404
+    
+    return jsonify({'success': jobs.cancel(job.id), 'job': job.to_dict()})
+
+
+def _store_results(result):
+    """Make the results of a finished job the processed data of the session"""
+    # Results derived from an earlier run are stale (and hold the files open)
+    cache = get_dataset_cache()
+    cache.invalidate(session_id(session))
+    new_dataset_version(session)
+    
+    # The session keeps handles to the stored files and the summary, never the data itself
+    # Exports of the previous run (e.g. the Visualizer) are released with its processed files
+    old_files = list((session.get('processed_files') or {}).values())
+    old_files.extend((session.pop('export_files', None) or {}).values())
+    store = get_dataset_store()
+    store.replace(old_files, result['processed_files'].values(), session_id(session))
+    # The session holds the references now; drop the ones the job took while writing the files
+    for handle in result['processed_files'].values():
+        store.release(handle, result['owner'])
+    session['processed_file'] = result['processed_files'][result['target_language']]
+    session['processed_files'] = result['processed_files']
+    session['processing_stats'] = {'processing_summary': result['processing_stats']['processing_summary']}
@@ -0,0 +1,201 @@
+import logging
+import sys
+import threading
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetCache:
+    """Process-level cache of loaded datasets and everything derived from them.
+    Entries are keyed by (session, dataset version, name, ...), so a new upload or
+    processing run never sees stale values. The least recently used entries are
+    evicted once the estimated size of all entries exceeds max_bytes; hit, miss and
+    eviction counters are kept for the stats endpoint. Safe to share between threads."""
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        """
+        Args:
+            max_bytes: Memory budget for all cached values (estimated, see estimate_size)
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Cached value, or None when missing (counts a hit or a miss)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size=None):
+        """
+        Store a value, evicting least recently used entries to stay within the budget.
+        Values larger than the whole budget are returned without being stored.
+
+        Args:
+            key: Key from cache_key()
+            value: Value to cache (not None)
+            size: Size in bytes (default: estimate_size(value))
+
+        Returns:
+            value
+        """
+        size = estimate_size(value) if size is None else size
+        if size > self.max_bytes:
+            logger.info(f"Not caching {key[2:]}: {size} bytes exceed the {self.max_bytes} byte budget")
+            return value
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                evicted_key, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+                logger.info(f"Evicted {evicted_key[2:]} ({evicted_size} bytes) from the dataset cache")
+        return value
+
+    def get_or_create(self, key, factory, size=None):
+        """Cached value, or the result of factory() stored under key (unless it is None).
+        factory runs outside the lock; concurrent misses may both compute it."""
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            if value is not None:
+                self.put(key, value, size)
+        return value
+
+    def invalidate(self, session_id):
+        """Drop every entry of a session (all dataset versions)"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == session_id]:
+                self._bytes -= self._entries.pop(key)[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @property
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes
+            }
+
+
+def get_dataset_cache():
+    """The DatasetCache of the current Flask app"""
+    from flask import current_app
+    return current_app.extensions['dataset_cache']
+
+
+def session_id(session):
+    """Stable id of a Flask session: the server-side session id, or a random id kept in the session"""
+    sid = getattr(session, 'sid', None)
+    if sid:
+        return sid
+    if 'owner_id' not in session:
+        session['owner_id'] = uuid.uuid4().hex
+    return session['owner_id']
+
+
+def new_dataset_version(session):
+    """Start a new dataset version for the session, so earlier cache entries are no longer used"""
+    session['dataset_version'] = uuid.uuid4().hex
+    return session['dataset_version']
+
+
+def cache_key(session, *parts):
+    """Key of a cached value of the session's current dataset version"""
+    return (session_id(session), session.get('dataset_version')) + parts
+
+
+def estimate_size(value, _depth=0):
+    """Approximate memory footprint in bytes of a cached value"""
+    from stringZ.models.data_models import TranslationDataset
+    from stringZ.utils.storage_utils import ColumnarFile
+
+    if isinstance(value, TranslationDataset):
+        size = int(value.columns.memory_usage(deep=True).sum())
+        if value._entries is not None:
+            # Slotted entry views, roughly
+            size += len(value._entries) * 120
+        return size
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, ColumnarFile):
+        # Memory-mapped pages the process may touch
+        return int(value.table.nbytes) if value.table is not None else 0
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, bytearray, str)):
+        return sys.getsizeof(value)
+    if _depth < 4 and isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in value.items()
+        )
+    if _depth < 4 and isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item, _depth + 1) for item in value)
+    return sys.getsizeof(value)
+
+
+def processed_files(session):
+    """DatasetStore handle of the processed file per language of the session's last processing run"""
+    return session.get('processed_files') or {session.get('target_language'): session.get('processed_file')}
+
+
+def load_processed_frame(session, language):
+    """Processed DataFrame of a language, read from its file once per dataset version"""
+    from app.services.dataset_store import get_dataset_store
+    from app.services.file_services import FileService
+
+    path = get_dataset_store().path(processed_files(session).get(language))
+    return get_dataset_cache().get_or_create(
+        cache_key(session, 'processed_frame', language),
+        lambda: FileService.load_processed_file(path)
+    )
+
+
+def load_processed_dataset(session, language):
+    """Processed TranslationDataset of a language, rebuilt from its file once per dataset version"""
+    from stringZ.models.data_models import TranslationDataset
+
+    def build():
+        df_processed = load_processed_frame(session, language)
+        if language not in df_processed.columns:
+            # to_dataframe leaves out a language without any translation
+            df_processed = df_processed.assign(**{language: None})
+        return TranslationDataset.from_dataframe(
+            df_processed,
+            source_col=session.get('source_col'),
+            target_col=language,
+            str_id_col=session.get('str_id_col')
+        )
+
+    return get_dataset_cache().get_or_create(cache_key(session, 'processed_dataset', language), build)
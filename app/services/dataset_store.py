@@ -0,0 +1,226 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+# Handles are "<sha256>.<extension>"; anything else is rejected before touching the disk
+HANDLE_PATTERN = re.compile(r'^[0-9a-f]{64}\.[a-z0-9]{1,10}$')
+
+# Unreferenced objects younger than this are kept (a job may have just written them)
+ORPHAN_GRACE_SECONDS = 3600
+
+# References of sessions that were never reset expire after this long
+REF_TTL_SECONDS = 7 * 24 * 3600
+
+
+class DatasetStore:
+    """Content-addressed store for uploads, datasets and derived artefacts.
+    Files are immutable and named by the SHA-256 of their content, so identical data
+    written by different sessions or jobs is stored once and files can be shared
+    without copying. Sessions only keep the small handles returned by put_file()/write().
+    Every owner (session) that holds a handle takes a reference, with acquire() or
+    directly when storing the object; an object is deleted when its last reference is
+    released. References are marker files (refs/<hash>/<owner>), so they survive
+    restarts and worker processes can write objects into the same store; changes to
+    objects and references are serialised by a lock file shared by all processes."""
+
+    def __init__(self, root):
+        """
+        Args:
+            root: Store directory (objects/, refs/ and tmp/ are created inside)
+        """
+        self.root = root
+        self._lock = threading.Lock()
+        self._lock_path = os.path.join(root, 'lock')
+        for name in ('objects', 'refs', 'tmp'):
+            os.makedirs(os.path.join(root, name), exist_ok=True)
+
+    def __getstate__(self):
+        # Sent to job workers, which only need the directory
+        return {'root': self.root}
+
+    def __setstate__(self, state):
+        self.__init__(state['root'])
+
+    def temp_path(self, extension):
+        """Fresh path in the store's temp directory (same file system as the objects)"""
+        return os.path.join(self.root, 'tmp', f"{uuid.uuid4().hex}.{extension}")
+
+    def put_file(self, path, extension, owner=None):
+        """
+        Move a finished file into the store
+
+        Args:
+            path: File to add (moved, or deleted when the content is already stored)
+            extension: File extension the readers rely on (e.g. "arrow", "xlsx")
+            owner: Owner whose reference is added in the same step, so the object
+                   cannot be deleted by another owner's release() before it is acquired
+
+        Returns:
+            str: Handle of the stored object
+        """
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+
+        handle = f"{digest.hexdigest()}.{extension.lower()}"
+        target = self._object_path(handle)
+        with self._locked():
+            if os.path.exists(target):
+                os.remove(path)
+                # Fresh again, so collect() leaves it alone until someone acquires it
+                os.utime(target)
+            else:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(path, target)
+                logger.info(f"Stored {handle} ({os.path.getsize(target)} bytes)")
+            if owner is not None:
+                self._add_ref(handle, owner)
+        return handle
+
+    def write(self, writer, extension, owner=None):
+        """Store what writer(path) writes to a temp path and return its handle (see put_file)"""
+        path = self.temp_path(extension)
+        try:
+            writer(path)
+        except Exception:
+            if os.path.exists(path):
+                os.remove(path)
+            raise
+        return self.put_file(path, extension, owner)
+
+    def path(self, handle):
+        """File path of a stored object, or None for an invalid handle or a missing object"""
+        if not handle or not HANDLE_PATTERN.match(handle):
+            return None
+        path = self._object_path(handle)
+        return path if os.path.exists(path) else None
+
+    def acquire(self, handle, owner):
+        """Add a reference of owner to an object (idempotent)"""
+        with self._locked():
+            if self.path(handle) is None:
+                raise KeyError(f"Unknown dataset store object {handle}")
+            self._add_ref(handle, owner)
+
+    def release(self, handle, owner):
+        """Drop owner's reference to an object; the object is deleted with its last reference"""
+        if not handle or not HANDLE_PATTERN.match(handle):
+            return
+        with self._locked():
+            refs = self._refs_dir(handle)
+            ref = os.path.join(refs, _owner_name(owner))
+            if os.path.exists(ref):
+                os.remove(ref)
+            if os.path.isdir(refs) and not os.listdir(refs):
+                os.rmdir(refs)
+                self._delete(handle)
+
+    def replace(self, old_handles, new_handles, owner):
+        """Acquire new_handles and release old_handles for owner (shared handles are kept)"""
+        new_handles = [handle for handle in new_handles if handle]
+        for handle in new_handles:
+            self.acquire(handle, owner)
+        for handle in old_handles:
+            if handle and handle not in new_handles:
+                self.release(handle, owner)
+
+    def refcount(self, handle):
+        refs = self._refs_dir(handle)
+        return len(os.listdir(refs)) if os.path.isdir(refs) else 0
+
+    def collect(self, grace=ORPHAN_GRACE_SECONDS, ref_ttl=REF_TTL_SECONDS):
+        """Expire references older than ref_ttl, then delete objects without references
+        older than grace seconds and stale temp files"""
+        now = time.time()
+        limit = now - grace
+        removed = 0
+        with self._locked():
+            refs_root = os.path.join(self.root, 'refs')
+            for handle in os.listdir(refs_root):
+                refs = os.path.join(refs_root, handle)
+                for name in os.listdir(refs):
+                    if os.path.getmtime(os.path.join(refs, name)) < now - ref_ttl:
+                        os.remove(os.path.join(refs, name))
+                if not os.listdir(refs):
+                    os.rmdir(refs)
+
+            objects = os.path.join(self.root, 'objects')
+            for prefix in os.listdir(objects):
+                for name in os.listdir(os.path.join(objects, prefix)):
+                    path = os.path.join(objects, prefix, name)
+                    if self.refcount(name) == 0 and os.path.getmtime(path) < limit:
+                        self._delete(name)
+                        removed += 1
+
+            temp = os.path.join(self.root, 'tmp')
+            for name in os.listdir(temp):
+                path = os.path.join(temp, name)
+                if os.path.getmtime(path) < limit:
+                    os.remove(path)
+        if removed:
+            logger.info(f"Removed {removed} unreferenced objects from the dataset store")
+        return removed
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive access to the objects and references, across threads and processes"""
+        with self._lock, open(self._lock_path, 'a+b') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _add_ref(self, handle, owner):
+        refs = self._refs_dir(handle)
+        os.makedirs(refs, exist_ok=True)
+        open(os.path.join(refs, _owner_name(owner)), 'w').close()
+
+    def _object_path(self, handle):
+        return os.path.join(self.root, 'objects', handle[:2], handle)
+
+    def _refs_dir(self, handle):
+        return os.path.join(self.root, 'refs', handle)
+
+    def _delete(self, handle):
+        path = self._object_path(handle)
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+                logger.info(f"Deleted {handle} from the dataset store")
+        except OSError as e:
+            # Still mapped somewhere (Windows); collect() removes it later
+            logger.warning(f"Could not delete {handle}: {str(e)}")
+
+
+def get_dataset_store():
+    """The DatasetStore of the current Flask app"""
+    from flask import current_app
+    return current_app.extensions['dataset_store']
+
+
+def _owner_name(owner):
+    """File-name-safe reference name of an owner id"""
+    return hashlib.sha1(str(owner).encode('utf-8')).hexdigest()
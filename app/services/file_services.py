@@ -1,6 +1,8 @@
-import pandas as pd
 import os
 
+# Cluster columns stored after the text columns of a processed file (exported on request)
+CLUSTER_COLUMNS = ['Cluster ID', 'Cluster Type', 'Cluster Score']
+
 class FileService:
     @staticmethod
     def allowed_file(filename, allowed_extensions):
@@ -9,35 +11,82 @@ class FileService:
 
     @staticmethod
     def detect_columns(df):
-        """Detect string ID and source columns, return both"""
-        # String ID column detection
-        str_id_names = ['strId', 'ID', 'strID', '字符串', 'id', 'StringID', 'string_id', 'KEY_NAME', "SOURCE"]
-        str_id_col = None
-        for col in df.columns:
-            if col in str_id_names:
-                str_id_col = col
-                break
-
-        # Source column detection  
-        source_names = ['EN', 'English', 'Source', 'en', 'english', 'source']
-        source_col = None
-        for col in df.columns:
-            if col in source_names:
-                source_col = col
-                break
-
-        return str_id_col, source_col
-
-    @staticmethod
-    def save_temp_file(df, session_id, upload_folder):
-        """Save dataframe temporarily and return file path"""
-        temp_file = os.path.join(upload_folder, f"temp_{session_id}.pkl")
-        df.to_pickle(temp_file)
-        return temp_file
-
-    @staticmethod
-    def load_temp_file(temp_file_path):
-        """Load dataframe from temporary file"""
+        """Detect string ID and source columns, return both (df may also be a list of header names)"""
+        from stringZ.utils.file_utils import detect_columns
+
+        columns = df.columns if hasattr(df, 'columns') else df
+        return detect_columns(columns)
+
+    @staticmethod
+    def save_temp_upload(file, store, owner=None):
+        """Save the uploaded file as-is (streamed to disk, not parsed) in the DatasetStore and return its handle
+        (referenced by owner)"""
+        extension = file.filename.rsplit('.', 1)[1].lower() if '.' in file.filename else 'xlsx'
+        return store.write(file.save, extension, owner)
+
+    @staticmethod
+    def save_temp_dataset(datasets, store, owner=None):
+        """Save loaded TranslationDatasets (one, or a dict per target language) as a
+        memory-mappable Arrow file in the DatasetStore and return its handle (referenced by owner)"""
+        from stringZ.utils.storage_utils import DatasetFile
+
+        if not isinstance(datasets, dict):
+            datasets = {datasets.target_lang: datasets}
+        return store.write(lambda path: DatasetFile.write(path, datasets), 'arrow', owner)
+
+    @staticmethod
+    def open_temp_dataset(temp_file_path):
+        """Memory-mapped DatasetFile saved by save_temp_dataset (None when missing); close it when done"""
+        from stringZ.utils.storage_utils import DatasetFile
+
         if not temp_file_path or not os.path.exists(temp_file_path):
             return None
-        return pd.read_pickle(temp_file_path)
+        return DatasetFile(temp_file_path)
+
+    @staticmethod
+    def load_temp_datasets(temp_file_path):
+        """Load the dict of TranslationDatasets per target language saved by save_temp_dataset"""
+        dataset_file = FileService.open_temp_dataset(temp_file_path)
+        if dataset_file is None:
+            return None
+        with dataset_file:
+            return dataset_file.load_all()
+
+    @staticmethod
+    def load_temp_dataset(temp_file_path, language=None):
+        """Load the TranslationDataset of one target language (default: the first) saved by save_temp_dataset"""
+        dataset_file = FileService.open_temp_dataset(temp_file_path)
+        if dataset_file is None:
+            return None
+        with dataset_file:
+            if language is not None and language not in dataset_file.languages:
+                return None
+            return dataset_file.load(language)
+
+    @staticmethod
+    def save_processed_file(df, store, owner=None):
+        """Save a processed DataFrame as a memory-mappable Arrow file in the DatasetStore and return its handle
+        (referenced by owner)"""
+        from stringZ.utils.storage_utils import write_table
+
+        return store.write(lambda path: write_table(path, df), 'arrow', owner)
+
+    @staticmethod
+    def open_processed_file(processed_file_path):
+        """Memory-mapped ColumnarFile saved by save_processed_file (None when missing); close it when done"""
+        from stringZ.utils.storage_utils import ColumnarFile
+
+        if not processed_file_path or not os.path.exists(processed_file_path):
+            return None
+        return ColumnarFile(processed_file_path)
+
+    @staticmethod
+    def load_processed_file(processed_file_path, columns=None):
+        """Load (some columns of) a processed DataFrame saved by save_processed_file"""
+        processed = FileService.open_processed_file(processed_file_path)
+        if processed is None:
+            return None
+        with processed:
+            if columns is not None:
+                columns = [column for column in columns if column in processed.column_names]
+            return processed.read(columns)
@@ -0,0 +1,317 @@
+import logging
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, CancelledError
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+# Job states; the last three are final
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINAL_STATES = (DONE, FAILED, CANCELLED)
+
+# Progress queue of the worker process (set by _init_worker)
+_progress_queue = None
+
+
+class JobQueueFull(Exception):
+    """Raised by JobManager.submit when every worker is busy and the queue is full"""
+
+
+class Job:
+    """State of a background job as seen by the web process"""
+
+    def __init__(self, job_id, owner):
+        self.id = job_id
+        self.owner = owner
+        self.status = QUEUED
+        self.stage = None
+        self.done = 0
+        self.total = 0
+        self.eta = None
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.future = None
+        # Bumped on every change, so subscribers can wait for the next one
+        self.revision = 0
+
+    @property
+    def is_final(self):
+        return self.status in FINAL_STATES
+
+    def to_dict(self):
+        """JSON-serialisable status (without the result)"""
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'stage': self.stage,
+            'done': self.done,
+            'total': self.total,
+            'percent': round(self.done / self.total * 100, 1) if self.total else (100.0 if self.status == DONE else 0.0),
+            'eta_seconds': round(self.eta, 1) if self.eta is not None else None,
+            'error': self.error,
+            'queued_seconds': round((self.started or self.finished or time.time()) - self.created, 2),
+            'elapsed_seconds': round((self.finished or time.time()) - self.started, 2) if self.started else None
+        }
+
+
+class JobManager:
+    """Runs long jobs in a bounded pool of worker processes.
+    Workers are spawned up front and import the processing stack once (warm_up), so a
+    job starts without paying for interpreter start-up or imports. At most
+    `workers` jobs run at a time and at most `max_queued` more wait for a worker;
+    submit() raises JobQueueFull beyond that instead of letting work pile up. Progress
+    reported by a job's ProgressReporter is forwarded to the web process over a queue,
+    and cancel() asks a running job to stop at its next progress check."""
+
+    def __init__(self, workers=1, max_queued=4, retention=3600, warm_up=None, work_dir=None):
+        """
+        Args:
+            workers: Number of worker processes
+            max_queued: Jobs that may wait for a free worker
+            retention: Seconds a finished job stays available for status requests
+            warm_up: Picklable callable run once in every worker when the pool starts
+            work_dir: Directory for cancellation flags (default: a temp directory)
+        """
+        self.workers = max(1, int(workers))
+        self.max_queued = max(0, int(max_queued))
+        self.retention = retention
+        self.warm_up = warm_up
+        self.work_dir = work_dir or os.path.join(tempfile.gettempdir(), 'stringz_jobs')
+
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._executor = None
+        self._progress_queue = None
+        self._listener = None
+
+    def start(self):
+        """Spawn and warm up the worker processes (called by submit() when needed)"""
+        with self._lock:
+            if self._executor is not None:
+                return
+            os.makedirs(self.work_dir, exist_ok=True)
+
+            # Spawned workers: forking a threaded web server is unsafe
+            context = multiprocessing.get_context('spawn')
+            self._progress_queue = context.Queue()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self._progress_queue, self.warm_up)
+            )
+            # One no-op per worker makes the pool start all of them now
+            for _ in range(self.workers):
+                self._executor.submit(_ping)
+
+            # Every pool reports on its own queue, read by its own listener
+            self._listener = threading.Thread(
+                target=self._listen, args=(self._progress_queue,), name='job-progress', daemon=True
+            )
+            self._listener.start()
+        logger.info(f"Started job pool with {self.workers} workers (queue of {self.max_queued})")
+
+    def shutdown(self, cancel=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            progress_queue, self._progress_queue = self._progress_queue, None
+            self._listener = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=cancel)
+        if progress_queue is not None:
+            # Stops the listener of this pool
+            progress_queue.put(None)
+
+    def submit(self, owner, fn, *args, **kwargs):
+        """
+        Run fn(*args, progress=<ProgressReporter>, **kwargs) in a worker process
+
+        Args:
+            owner: Id of whoever may see the job (a session id)
+            fn: Picklable module-level function
+
+        Returns:
+            Job
+
+        Raises:
+            JobQueueFull: When all workers are busy and max_queued jobs are waiting
+        """
+        self.start()
+        self._purge()
+
+        with self._lock:
+            active = sum(1 for job in self._jobs.values() if not job.is_final)
+            if active >= self.workers + self.max_queued:
+                raise JobQueueFull(f"{active} jobs are running or waiting, try again later")
+
+            job = Job(uuid.uuid4().hex, owner)
+            self._jobs[job.id] = job
+
+        try:
+            try:
+                job.future = self._submit(job, fn, args, kwargs)
+            except BrokenProcessPool:
+                # A worker died (e.g. out of memory); start a fresh pool and retry once
+                logger.warning("Job pool is broken, restarting it")
+                self.shutdown(cancel=False)
+                self.start()
+                job.future = self._submit(job, fn, args, kwargs)
+        except Exception as e:
+            # The job never reached a worker; don't let it hold a queue slot
+            logger.error(f"Could not queue job {job.id}: {str(e)}")
+            self._update(job, status=FAILED, error=str(e), finished=time.time())
+            raise
+
+        logger.info(f"Queued job {job.id}")
+        return job
+
+    def get(self, job_id, owner=None):
+        """Job by id, or None when unknown, expired or owned by someone else"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or (owner is not None and job.owner != owner):
+            return None
+        return job
+
+    def active_job(self, owner):
+        """The owner's queued or running job, if any"""
+        with self._lock:
+            return next((job for job in self._jobs.values() if job.owner == owner and not job.is_final), None)
+
+    def cancel(self, job_id):
+        """Cancel a job: queued jobs never start, running jobs stop at their next progress check"""
+        job = self.get(job_id)
+        if job is None or job.is_final:
+            return False
+
+        if job.future is not None and job.future.cancel():
+            self._update(job, status=CANCELLED, finished=time.time())
+        else:
+            open(self._cancel_flag(job.id), 'w').close()
+        return True
+
+    def wait(self, job, revision, timeout):
+        """Block until the job changes after `revision` (or timeout); returns the new revision"""
+        with self._changed:
+            self._changed.wait_for(lambda: job.revision != revision, timeout)
+            return job.revision
+
+    @property
+    def stats(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return {
+            'workers': self.workers,
+            'max_queued': self.max_queued,
+            'running': sum(1 for job in jobs if job.status == RUNNING),
+            'queued': sum(1 for job in jobs if job.status == QUEUED),
+            'capacity': self.workers + self.max_queued - sum(1 for job in jobs if not job.is_final)
+        }
+
+    def _submit(self, job, fn, args, kwargs):
+        future = self._executor.submit(_run_job, job.id, self._cancel_flag(job.id), fn, args, kwargs)
+        future.add_done_callback(lambda future: self._finish(job, future))
+        return future
+
+    def _finish(self, job, future):
+        """Done callback of a job's future (runs in a pool thread of this process)"""
+        try:
+            result = future.result()
+        except CancelledError:
+            self._update(job, status=CANCELLED, finished=time.time())
+            return
+        except Exception as e:
+            from stringZ.utils.progress_utils import ProcessingCancelled
+
+            if isinstance(e, ProcessingCancelled):
+                self._update(job, status=CANCELLED, finished=time.time())
+            else:
+                logger.error(f"Job {job.id} failed: {str(e)}")
+                self._update(job, status=FAILED, error=str(e), finished=time.time())
+            return
+        finally:
+            flag = self._cancel_flag(job.id)
+            if os.path.exists(flag):
+                os.remove(flag)
+
+        self._update(job, status=DONE, result=result, finished=time.time())
+        logger.info(f"Job {job.id} finished in {job.finished - (job.started or job.created):.2f}s")
+
+    def _listen(self, progress_queue):
+        """Apply progress messages from the workers of one pool to their jobs, until shutdown() sends None"""
+        while True:
+            try:
+                message = progress_queue.get()
+            except (EOFError, OSError, queue.Empty):
+                return
+            if message is None:
+                return
+            job_id, changes = message
+            job = self.get(job_id)
+            if job is not None:
+                self._update(job, **changes)
+
+    def _update(self, job, **changes):
+        """Apply changes to a job, unless it is final already: progress arrives on another pipe
+        than the result, so a late RUNNING or progress message must not reopen a finished job"""
+        with self._changed:
+            if job.is_final:
+                return
+            for name, value in changes.items():
+                setattr(job, name, value)
+            job.revision += 1
+            self._changed.notify_all()
+
+    def _purge(self):
+        """Forget finished jobs older than the retention period"""
+        limit = time.time() - self.retention
+        with self._lock:
+            for job_id in [job_id for job_id, job in self._jobs.items()
+                           if job.is_final and job.finished is not None and job.finished < limit]:
+                del self._jobs[job_id]
+
+    def _cancel_flag(self, job_id):
+        return os.path.join(self.work_dir, f"{job_id}.cancel")
+
+
+def get_job_manager():
+    """The JobManager of the current Flask app"""
+    from flask import current_app
+    return current_app.extensions['job_manager']
+
+
+def _init_worker(progress_queue, warm_up):
+    global _progress_queue
+    _progress_queue = progress_queue
+    if warm_up is not None:
+        warm_up()
+
+
+def _ping():
+    return os.getpid()
+
+
+def _run_job(job_id, cancel_flag, fn, args, kwargs):
+    """Worker side of a job: report start and progress, stop when the cancel flag appears"""
+    from stringZ.utils.progress_utils import ProgressReporter
+
+    def report(stage, done, total, eta):
+        _progress_queue.put((job_id, {'stage': stage, 'done': done, 'total': total, 'eta': eta}))
+
+    _progress_queue.put((job_id, {'status': RUNNING, 'started': time.time()}))
+    progress = ProgressReporter(report, should_cancel=lambda: os.path.exists(cancel_flag), interval=0.5)
+    return fn(*args, progress=progress, **kwargs)
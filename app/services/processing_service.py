@@ -0,0 +1,125 @@
+import logging
+
+import numpy as np
+
+from app.services.file_services import FileService, CLUSTER_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up():
+    """Import the processing stack once per worker process, before the first job arrives"""
+    from stringZ.core.processor import TranslationProcessor  # noqa: F401 (pandas, numpy, sklearn, scipy)
+    from stringZ.utils.storage_utils import DatasetFile  # noqa: F401 (pyarrow)
+
+
+def run_processing(dataset_file, options, target_language, store, owner=None, progress=None):
+    """
+    Process the datasets stored by /load_data and store the processed data (runs in a job worker)
+
+    Args:
+        dataset_file: Arrow dataset file written by FileService.save_temp_dataset
+        options: ProcessingConfig keyword arguments
+        target_language: Language shown in the results (default: the first one)
+        store: DatasetStore receiving the processed files
+        owner: Reference owner of the processed files for this run; the session takes the
+               references over when it stores the results (released again when the run fails)
+        progress: Optional ProgressReporter; every stage reports to it and it can cancel the run
+
+    Returns:
+        dict: processed_files (DatasetStore handles referenced by owner), processing_stats
+              of the shown language and the summary returned to the client
+    """
+    from stringZ.core.processor import TranslationProcessor, ProcessingConfig
+
+    # The datasets streamed in by load_data
+    datasets = FileService.load_temp_datasets(dataset_file)
+    if not datasets:
+        raise ValueError("No uploaded file found. Please upload again.")
+
+    if target_language not in datasets:
+        target_language = next(iter(datasets))
+
+    # Process the dataset; several languages share one pass over the source texts
+    processor = TranslationProcessor(ProcessingConfig(**options))
+    if len(datasets) > 1:
+        processed_datasets = processor.process_languages(datasets, progress)
+    else:
+        processed_datasets = {language: processor.process(dataset, progress) for language, dataset in datasets.items()}
+
+    # Written one language at a time: this already runs in a job worker, and turning the
+    # text columns into Arrow arrays holds the GIL, so threads would not overlap the work
+    # and a process pool would pickle every DataFrame to write it once
+    processed_files = {}
+    try:
+        for language, language_dataset in processed_datasets.items():
+            language_df = language_dataset.to_dataframe()
+            processed_files[language] = FileService.save_processed_file(
+                language_df.assign(**_cluster_columns(language_dataset)), store, owner
+            )
+            if language == target_language:
+                processed_df = language_df
+    except Exception:
+        # Nobody will take over the references of a failed run
+        if owner is not None:
+            for handle in processed_files.values():
+                store.release(handle, owner)
+        raise
+
+    processed_dataset = processed_datasets[target_language]
+    processing_stats = processor.get_processing_stats(processed_dataset)
+
+    # Calculate final stats for metrics
+    target_word_count = 0
+    if target_language in processed_df.columns:
+        target_word_count = processed_df[target_language].dropna().astype(str).apply(lambda x: len(x.split())).sum()
+
+    stats = processing_stats['processing_summary']
+    languages = {
+        language: {
+            'final_count': len(language_dataset),
+            'duplicates_removed': language_dataset.result.duplicates_removed,
+            'clusters_created': language_dataset.result.clusters_found
+        }
+        for language, language_dataset in processed_datasets.items()
+    }
+
+    return {
+        'target_language': target_language,
+        'owner': owner,
+        'processed_files': processed_files,
+        'processing_stats': processing_stats,
+        'summary': {
+            'stats': {
+                'original_count': stats['original_count'],
+                'final_count': stats['final_count'],
+                'duplicates_removed': stats['duplicates_removed'],
+                'clusters_created': stats['clusters_created'],
+                'word_count': f"{target_word_count:,}",
+                'processing_time': stats['processing_time']
+            },
+            'languages': languages
+        }
+    }
+
+
+def _cluster_columns(dataset):
+    """Cluster id, type and score of every row of a processed dataset (empty for unclustered rows)"""
+    result = dataset.result
+    labels = result.cluster_labels if result is not None else None
+    if labels is None or len(labels) != len(dataset) or len(dataset) == 0:
+        return {}
+
+    clusters = sorted(result.correlation_clusters, key=lambda cluster: cluster.cluster_id)
+    cluster_ids = np.array([cluster.cluster_id for cluster in clusters], dtype=np.int64)
+    cluster_types = np.array([cluster.cluster_type for cluster in clusters] + [None], dtype=object)
+    cluster_scores = np.array([cluster.similarity_score for cluster in clusters] + [np.nan], dtype=float)
+
+    # Position of every row's cluster in the sorted clusters (len(clusters) when there is none)
+    positions = np.minimum(np.searchsorted(cluster_ids, labels), len(clusters))
+    found = positions < len(clusters)
+    found[found] = cluster_ids[positions[found]] == labels[found]
+    positions[~found] = len(clusters)
+
+    ids = np.where(found, labels, np.nan)
+    return dict(zip(CLUSTER_COLUMNS, (ids, cluster_types[positions], cluster_scores[positions])))
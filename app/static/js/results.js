@@ -61,15 +61,18 @@ function updateSidebar(stats) {
 
 // Download handlers
 document.getElementById('downloadVisualizer').addEventListener('click', function() {
-  window.location.href = '/download/visualizer';
+  const compact = document.getElementById('compactVisualizer').checked ? '?compact=1' : '';
+  window.location.href = `/download/visualizer${compact}`;
 });
 
 document.getElementById('downloadSpreadsheet').addEventListener('click', function() {
-  window.location.href = '/download/spreadsheet';
+  const clusters = document.getElementById('includeClusters').checked ? '?clusters=1' : '';
+  window.location.href = `/download/spreadsheet${clusters}`;
 });
 
 // Review tab functionality
 let reviewTable;
+let reviewPage = { page: 1, totalPages: 1 };
 
 function loadReviewData(search = '', filter = 'all', page = 1, perPage = '100') {
   const params = new URLSearchParams({
@@ -84,6 +87,7 @@ function loadReviewData(search = '', filter = 'all', page = 1, perPage = '100')
       .then(data => {
           if (data.success) {
               updateReviewTable(data);
+              updateReviewPagination(data.pagination);
               updateReviewStats(data.stats);
           } else {
               console.error('Error loading review data:', data.error);
@@ -139,6 +143,25 @@ function updateReviewTable(data) {
   });   
 }
 
+function updateReviewPagination(pagination) {
+  reviewPage = { page: pagination.page, totalPages: pagination.total_pages };
+  const first = pagination.total_entries ? (pagination.page - 1) * pagination.per_page + 1 : 0;
+  const last = first ? first + pagination.showing - 1 : 0;
+  document.getElementById('reviewPageInfo').textContent =
+      `Showing ${first}-${last} of ${pagination.total_entries} entries (page ${pagination.page} of ${pagination.total_pages})`;
+  document.getElementById('reviewPrevPage').disabled = pagination.page <= 1;
+  document.getElementById('reviewNextPage').disabled = pagination.page >= pagination.total_pages;
+}
+
+function loadReviewPage(page) {
+  loadReviewData(
+      document.getElementById('reviewSearch').value,
+      document.getElementById('reviewFilter').value,
+      page,
+      document.getElementById('reviewPerPage').value
+  );
+}
+
 function updateReviewStats(stats) {
   // For future self: use this for debugs on the reviews
   console.log('Review stats:', stats);
@@ -147,22 +170,24 @@ function updateReviewStats(stats) {
 // Event handlers for review controls
 document.getElementById('reviewSearch').addEventListener('input', function(e) {
   clearTimeout(this.searchTimeout);
-  this.searchTimeout = setTimeout(() => {
-      loadReviewData(e.target.value, document.getElementById('reviewFilter').value);
-  }, 500);
+  // The search is indexed server-side, a short debounce is enough
+  this.searchTimeout = setTimeout(() => loadReviewPage(1), 200);
 });
 
-document.getElementById('reviewFilter').addEventListener('change', function(e) {
-  loadReviewData(document.getElementById('reviewSearch').value, e.target.value);
+document.getElementById('reviewFilter').addEventListener('change', function() {
+  loadReviewPage(1);
 });
 
-document.getElementById('reviewPerPage').addEventListener('change', function(e) {
-  loadReviewData(
-      document.getElementById('reviewSearch').value,
-      document.getElementById('reviewFilter').value,
-      1,
-      e.target.value
-  );
+document.getElementById('reviewPerPage').addEventListener('change', function() {
+  loadReviewPage(1);
+});
+
+document.getElementById('reviewPrevPage').addEventListener('click', function() {
+  loadReviewPage(reviewPage.page - 1);
+});
+
+document.getElementById('reviewNextPage').addEventListener('click', function() {
+  loadReviewPage(reviewPage.page + 1);
 });
 
 // Load review data when tab is shown
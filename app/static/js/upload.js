@@ -82,6 +82,14 @@ function showLanguageSelection(data) {
           option.textContent = lang;
           select.appendChild(option);
       });
+
+      // All language columns can be processed together in a single run
+      if (data.lang_columns.length > 1) {
+          const option = document.createElement('option');
+          option.value = '__all__';
+          option.textContent = `All languages (${data.lang_columns.length})`;
+          select.appendChild(option);
+      }
   }
 }
 
@@ -235,19 +243,22 @@ document.getElementById('uploadForm').addEventListener('submit', function(e) {
       body: JSON.stringify(processData)
   })
   .then(response => response.json())
+  .then(data => {
+      if (!data.success) {
+          throw new Error(data.error);
+      }
+      // Processing runs in the background; poll the job until it is done
+      return waitForJob(data.status_url);
+  })
   .then(data => {
       updateProgressBar(100);
       setTimeout(() => {
           hideProgress();
-          if (data.success) {
-              showProcessingResults(data.stats);
-              // Redirect to results page after showing success
-              setTimeout(() => {
-                  window.location.href = '/results';
-              }, 2000);
-          } else {
-              alert('Error: ' + data.error);
-          }
+          showProcessingResults(data.stats);
+          // Redirect to results page after showing success
+          setTimeout(() => {
+              window.location.href = '/results';
+          }, 2000);
       }, 500);
   })
   .catch(error => {
@@ -256,6 +267,29 @@ document.getElementById('uploadForm').addEventListener('submit', function(e) {
   });
 });
 
+function waitForJob(statusUrl) {
+  return fetch(statusUrl)
+      .then(response => response.json())
+      .then(data => {
+          if (!data.success) {
+              throw new Error(data.error);
+          }
+          const job = data.job;
+          if (job.status === 'done') {
+              return data;
+          }
+          if (job.status === 'cancelled') {
+              throw new Error('Processing was cancelled');
+          }
+          // 20% when queued, up to 95% while the stages run
+          updateProgressBar(20 + Math.round(job.percent * 0.75));
+          if (job.stage) {
+              document.getElementById('statusText').textContent = `🚀 Processing file... (${job.stage})`;
+          }
+          return new Promise(resolve => setTimeout(resolve, 1000)).then(() => waitForJob(statusUrl));
+      });
+}
+
 function updateProgressBar(percentage) {
   document.getElementById('progressBar').style.width = percentage + '%';
 }
@@ -0,0 +1,143 @@
+"""
+Ingest throughput per input format.
+
+Writes one synthetic corpus as XLSX, CSV, TSV, JSON, JSON Lines, XLIFF and Parquet,
+then times stringZ.utils.file_utils.read_dataset on each file.
+
+Usage: python benchmarks/ingest_benchmark.py [--rows 50000] [--languages 4] [--repeat 3]
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from xml.sax.saxutils import escape, quoteattr
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from stringZ.utils.file_utils import read_dataset
+
+WORDS = ("damage attack enemy ally shield heal poison chance critical skill level bonus "
+         "duration effect stun burn freeze armor speed mana energy").split()
+LANGUAGES = ['German', 'French', 'Spanish', 'Italian', 'Japanese', 'Korean', 'Russian', 'Polish']
+
+
+def make_corpus(rows, languages, seed=7):
+    """Rows of (strId, EN, target per language); about one in five sources repeats"""
+    rng = random.Random(seed)
+    sources = []
+    for i in range(rows):
+        if sources and rng.random() < 0.2:
+            source = rng.choice(sources)
+        else:
+            words = rng.choices(WORDS, k=rng.randint(3, 12))
+            if rng.random() < 0.3:
+                words.insert(1, f'<color="#ff0025">{rng.randint(1, 500)}%</color>')
+            source = " ".join(words)
+        sources.append(source)
+
+    header = ['strId', 'EN'] + LANGUAGES[:languages]
+    data = [
+        [f"str_{i}", source] + [f"[{lang[:2]}] {source}" if rng.random() < 0.9 else "" for lang in header[2:]]
+        for i, source in enumerate(sources)
+    ]
+    return header, data
+
+
+def write_xlsx(path, header, data):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(header)
+    for row in data:
+        sheet.append([value or None for value in row])
+    workbook.save(path)
+
+
+def write_delimited(path, header, data, delimiter):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f, delimiter=delimiter)
+        writer.writerow(header)
+        writer.writerows(data)
+
+
+def write_json(path, header, data, lines=False):
+    with open(path, 'w', encoding='utf-8') as f:
+        records = (dict(zip(header, row)) for row in data)
+        if lines:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        else:
+            json.dump(list(records), f, ensure_ascii=False)
+
+
+def write_xliff(path, header, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<xliff version="1.2" xmlns="urn:oasis:names:tc:xliff:document:1.2">\n')
+        f.write(f'<file source-language="en" target-language="{header[2]}" datatype="plaintext" original="corpus"><body>\n')
+        for row in data:
+            f.write(f'<trans-unit id={quoteattr(row[0])}><source>{escape(row[1])}</source>'
+                    f'<target>{escape(row[2])}</target></trans-unit>\n')
+        f.write('</body></file></xliff>\n')
+
+
+def write_parquet(path, header, data):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    columns = {name: [row[i] or None for row in data] for i, name in enumerate(header)}
+    pq.write_table(pa.table(columns), path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--languages', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    header, data = make_corpus(args.rows, min(args.languages, len(LANGUAGES)))
+    target = header[2]
+
+    writers = {
+        'xlsx': write_xlsx,
+        'csv': lambda path, h, d: write_delimited(path, h, d, ','),
+        'tsv': lambda path, h, d: write_delimited(path, h, d, '\t'),
+        'json': write_json,
+        'jsonl': lambda path, h, d: write_json(path, h, d, lines=True),
+        'xliff': write_xliff,
+        'parquet': write_parquet,
+    }
+
+    print(f"{args.rows} rows, {len(header)} columns, best of {args.repeat}")
+    print(f"{'format':<8} {'size MB':>9} {'seconds':>9} {'rows/s':>11} {'MB/s':>8}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for extension, write in writers.items():
+            path = os.path.join(directory, f"corpus.{extension}")
+            try:
+                write(path, header, data)
+            except ImportError as e:
+                print(f"{extension:<8} skipped ({e})")
+                continue
+
+            # XLIFF carries one target language, named after the file's target-language
+            source_col = 'EN'
+            best, rows = float('inf'), 0
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                dataset = read_dataset(path, 'strId', source_col, target)
+                best = min(best, time.perf_counter() - start)
+                rows = len(dataset)
+
+            size = os.path.getsize(path) / 1024 / 1024
+            print(f"{extension:<8} {size:>9.1f} {best:>9.2f} {rows / best:>11,.0f} {size / best:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
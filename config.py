@@ -1,6 +1,8 @@
 import os
 import tempfile
 
+from stringZ.utils.model_cache import default_cache_dir
+
 class Config:
     # FLask settings
 
@@ -8,7 +10,37 @@ class Config:
     MAX_CONTENT_LENGTH = 500 * 1024 * 1024 # 500MB
     UPLOAD_FOLDER = tempfile.gettempdir()
 
-    ALLOWED_EXTENSIONS = {'xlsx', 'xls'}
+    ALLOWED_EXTENSIONS = {'xlsx', 'xls', 'csv', 'tsv', 'json', 'jsonl', 'xliff', 'xlf', 'parquet'}
+
+    # Fitted TF-IDF models are reused across runs and target languages. Entries are
+    # unpickled, so the folder is private to the user (0700) and refused otherwise
+    VECTORIZER_CACHE_DIR = default_cache_dir()
+    VECTORIZER_CACHE_MAX_MB = 512
+
+    # Semantic similarity: "dense" keeps every pair above the threshold, "sparse" the
+    # SIMILARITY_TOP_K best neighbours per string. SIMILARITY_WORKERS processes search
+    # neighbours in each /process job (on top of PROCESS_WORKERS, so 1 by default)
+    SIMILARITY_MODE = 'dense'
+    SIMILARITY_TOP_K = 20
+    SIMILARITY_WORKERS = 1
+
+    # /run_validation checks the languages of a multi-language run in this many processes
+    VALIDATION_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+
+    # Loaded/processed datasets and results derived from them are kept in memory
+    # between requests, least recently used first out above this budget
+    DATASET_CACHE_MAX_MB = 256
+
+    # Uploads, datasets and processed files, stored by content hash; sessions only hold handles
+    DATASET_STORE_DIR = os.path.join(UPLOAD_FOLDER, 'stringz_store')
+
+    # /process runs in a pool of worker processes; beyond PROCESS_QUEUE_SIZE waiting
+    # jobs it answers 429 (retry after PROCESS_RETRY_AFTER seconds)
+    PROCESS_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+    PROCESS_QUEUE_SIZE = 4
+    PROCESS_RETRY_AFTER = 10
+    PROCESS_JOB_RETENTION = 3600
+    PROCESS_PREWARM = True
 
 class DevelopmentConfig(Config):
     DEBUG = True
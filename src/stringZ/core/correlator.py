@@ -1,330 +1,584 @@
 import logging
 from typing import List, Optional, Tuple, Dict
 import numpy as np
+from scipy import sparse
 
 from ..models.data_models import TranslationDataset, TranslationEntry, CorrelationCluster
-from ..utils.similarity_utils import SimilarityCalculator
+from ..utils.similarity_utils import (
+    SimilarityCalculator, upper_triangular_graph, cluster_similarity_graph, label_groups
+)
+from ..utils.containment_utils import find_containment_groups
+from ..utils.cluster_metrics import ClusterMetrics
+from ..utils.minhash_utils import MinHashLSH
+from ..utils.progress_utils import ProgressReporter, ProcessingCancelled
 
 logger = logging.getLogger(__name__)
 
 
+def greedy_graph_clusters(graph, max_cluster_size: int) -> List[List[int]]:
+    """
+    Greedy clustering over an upper-triangular neighbour graph.
+    Each unused row starts a cluster with its unused neighbours in index order,
+    the same walk the dense similarity-matrix loops did.
+    
+    Args:
+        graph: CSR graph where row i holds the neighbours j > i, sorted by j
+        max_cluster_size: Maximum entries per cluster
+        
+    Returns:
+        List of clusters as lists of row indices (only clusters with 2+ members)
+    """
+    indptr, indices = graph.indptr, graph.indices
+    used = np.zeros(graph.shape[0], dtype=bool)
+    clusters = []
+    
+    for i in range(graph.shape[0]):
+        if used[i]:
+            continue
+        
+        members = [i]
+        used[i] = True
+        
+        for j in indices[indptr[i]:indptr[i + 1]].tolist():
+            if used[j]:
+                continue
+            
+            members.append(j)
+            used[j] = True
+            
+            # Limit cluster size
+            if len(members) >= max_cluster_size:
+                break
+        
+        if len(members) > 1:
+            clusters.append(members)
+    
+    return clusters
+
+
+def build_semantic_clusters(
+    texts: List[str],
+    similarity_calc: SimilarityCalculator,
+    similarity_threshold: float,
+    max_cluster_size: int,
+    similarity_mode: str = "dense",
+    top_k: int = 20,
+    first_cluster_id: int = 0,
+    progress: Optional[ProgressReporter] = None,
+    rows: Optional[np.ndarray] = None
+) -> List[CorrelationCluster]:
+    """
+    Greedy semantic clusters over a dense similarity matrix or a sparse top-k graph
+    
+    Args:
+        texts: Cleaned source texts to cluster (see NormalizedColumn.cleaned)
+        similarity_calc: Calculator used to vectorize the source texts
+        similarity_threshold: Minimum similarity to join a cluster
+        max_cluster_size: Maximum entries per cluster
+        similarity_mode: "dense" (every pair above the threshold) or "sparse" (top-k neighbour graph);
+                         with several workers the dense pairs are found in parallel row blocks
+        top_k: Neighbours kept per entry in sparse mode
+        first_cluster_id: Id given to the first cluster
+        progress: Optional progress/cancellation reporter (stage "semantic")
+        rows: Dataset row of every text (defaults to the text positions)
+        
+    Returns:
+        List of semantic clusters scored by ClusterMetrics, member rows in `rows`
+    """
+    progress = ProgressReporter.ensure(progress)
+    progress.start("semantic", len(texts))
+    vectors = similarity_calc.vectorize(texts, cleaned=True)
+    
+    if similarity_mode == "sparse":
+        similarity = similarity_calc.similarity_graph(vectors, similarity_threshold, top_k, progress=progress)
+    elif similarity_calc.workers > 1:
+        # Every edge of the dense matrix (no top-k cut), computed in row blocks across the workers
+        similarity = similarity_calc.similarity_graph(vectors, similarity_threshold, top_k=None, progress=progress)
+    else:
+        progress.check_cancelled()
+        similarity = similarity_calc.similarity_matrix(vectors)
+    
+    graph = upper_triangular_graph(similarity, similarity_threshold)
+    progress.finish()
+    rows = np.arange(len(texts), dtype=np.int64) if rows is None else np.asarray(rows, dtype=np.int64)
+    clusters = []
+    
+    for offset, members in enumerate(greedy_graph_clusters(graph, max_cluster_size)):
+        clusters.append(CorrelationCluster(
+            similarity_score=0.0,
+            cluster_id=first_cluster_id + offset,
+            cluster_type="semantic",
+            member_indices=members,
+            rows=rows[members]
+        ))
+    
+    return ClusterMetrics(vectors).apply(clusters)
+
+
+def score_substring_clusters(
+    clusters: List[CorrelationCluster],
+    texts: np.ndarray,
+    similarity_calc: SimilarityCalculator
+) -> List[CorrelationCluster]:
+    """
+    Score substring clusters by the similarity of their members' source texts.
+    Only the clustered rows are vectorized; containment alone says nothing about
+    how close a short text and the long texts containing it are.
+    
+    Args:
+        clusters: Substring clusters with member_indices into texts
+        texts: Cleaned source text of every row
+        similarity_calc: Calculator used to vectorize the source texts
+        
+    Returns:
+        The same clusters, scored by ClusterMetrics
+    """
+    if not clusters:
+        return clusters
+    
+    rows = np.unique(np.concatenate([np.asarray(cluster.member_indices, dtype=np.int64) for cluster in clusters]))
+    vectors = similarity_calc.vectorize(texts[rows].tolist(), cleaned=True)
+    
+    # Put each vector at its row, so member_indices address them directly
+    placement = sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, np.arange(len(rows)))),
+        shape=(len(texts), len(rows))
+    )
+    return ClusterMetrics(placement @ vectors).apply(clusters)
+
+
+def attach_clusters(dataset: TranslationDataset, order: np.ndarray,
+                    clusters: List[CorrelationCluster]) -> np.ndarray:
+    """
+    Point clusters found on the rows of a dataset at the rows of its sorted copy
+    
+    Args:
+        dataset: The sorted dataset (the clustered dataset's take(order))
+        order: Permutation of the clustered rows that was applied
+        clusters: Clusters with member rows of the clustered dataset, updated in place
+        
+    Returns:
+        np.ndarray: Cluster id per sorted row (-1 for unclustered rows)
+    """
+    positions = np.empty(len(order), dtype=np.int64)
+    positions[order] = np.arange(len(order))
+    labels = np.full(len(order), -1, dtype=np.int64)
+    
+    for cluster in clusters:
+        cluster.rows = positions[cluster.rows]
+        cluster.dataset = dataset
+        labels[cluster.rows] = cluster.cluster_id
+    
+    return labels
+
+
+def _sorted_rows(rows, key) -> np.ndarray:
+    """Rows sorted by key(row); stable, so ties keep their order in rows"""
+    rows = rows.tolist() if isinstance(rows, np.ndarray) else list(rows)
+    return np.array(sorted(rows, key=key), dtype=np.int64)
+
+
+def _text_lengths(dataset: TranslationDataset) -> np.ndarray:
+    return np.fromiter(map(len, dataset.columns['source_text'].tolist()), dtype=np.int64, count=len(dataset))
+
+
 class CorrelationStrategy:
-    """Base class for different correlation strategies"""
+    """Base class for different correlation strategies.
+    Strategies order rows with sort_rows(), which reads the dataset columns and its
+    normalised source texts and returns index arrays; sort_entries() is the
+    entry-list form of the same result."""
+    
+    # Normalised source variants (see NormalizedColumn) the strategy reads
+    text_keys = ('lowered',)
+    
+    # The order depends on the source texts alone, so one run can be shared by every target language
+    source_only = True
     
-    def sort_entries(self, entries: List[TranslationEntry]) -> Tuple[List[TranslationEntry], List[CorrelationCluster]]:
+    def sort_rows(self, dataset: TranslationDataset,
+                  progress: Optional[ProgressReporter] = None) -> Tuple[np.ndarray, List[CorrelationCluster]]:
+        """
+        Order the rows of a dataset
+        
+        Args:
+            dataset: Input translation dataset
+            progress: Optional progress/cancellation reporter
+            
+        Returns:
+            tuple: (permutation of the rows, clusters with their member rows in `rows`)
+        """
         raise NotImplementedError
+    
+    def sort_entries(self, entries: List[TranslationEntry],
+                     progress: Optional[ProgressReporter] = None) -> Tuple[List[TranslationEntry], List[CorrelationCluster]]:
+        """Entry-list wrapper around sort_rows()"""
+        dataset = TranslationDataset(entries=entries)
+        order, clusters = self.sort_rows(dataset, progress)
+        
+        # Cluster members are the given entries
+        for cluster in clusters:
+            cluster.dataset = dataset
+        
+        return [entries[i] for i in order.tolist()], clusters
 
 
 class AlphabeticalStrategy(CorrelationStrategy):
     """Simple alphabetical sorting"""
     
-    def sort_entries(self, entries: List[TranslationEntry]) -> Tuple[List[TranslationEntry], List[CorrelationCluster]]:
-        sorted_entries = sorted(entries, key=lambda e: e.source_text.lower())
-        return sorted_entries, []
+    def sort_rows(self, dataset: TranslationDataset,
+                  progress: Optional[ProgressReporter] = None) -> Tuple[np.ndarray, List[CorrelationCluster]]:
+        lowered = dataset.normalized.source.get('lowered').tolist()
+        return _sorted_rows(range(len(dataset)), key=lowered.__getitem__), []
 
 
 class OccurrenceBasedStrategy(CorrelationStrategy):
     """Sort by occurrences (highest first) then alphabetically"""
     
-    def sort_entries(self, entries: List[TranslationEntry]) -> Tuple[List[TranslationEntry], List[CorrelationCluster]]:
-        sorted_entries = sorted(entries, key=lambda e: (-e.occurrences, e.source_text.lower()))
-        return sorted_entries, []
+    # Occurrence counts come from the (EN, target) deduplication of each language
+    source_only = False
+    
+    def sort_rows(self, dataset: TranslationDataset,
+                  progress: Optional[ProgressReporter] = None) -> Tuple[np.ndarray, List[CorrelationCluster]]:
+        lowered = dataset.normalized.source.get('lowered').tolist()
+        occurrences = dataset.columns['occurrences'].tolist()
+        return _sorted_rows(range(len(dataset)), key=lambda i: (-occurrences[i], lowered[i])), []
 
 
 class SubstringCorrelationStrategy(CorrelationStrategy):
     """Sort strings by substring relationships"""
     
-    def __init__(self, min_substring_length: int = 5):
+    text_keys = ('stripped', 'lowered', 'folded', 'cleaned')
+    
+    def __init__(self, min_substring_length: int = 5,
+                 similarity_calc: Optional[SimilarityCalculator] = None):
         self.min_substring_length = min_substring_length
+        self.similarity_calc = similarity_calc or SimilarityCalculator()
     
-    def sort_entries(self, entries: List[TranslationEntry]) -> Tuple[List[TranslationEntry], List[CorrelationCluster]]:
-        if len(entries) <= 1:
-            return entries, []
-        
-        logger.info(f"Computing substring correlation for {len(entries)} entries")
+    def sort_rows(self, dataset: TranslationDataset,
+                  progress: Optional[ProgressReporter] = None) -> Tuple[np.ndarray, List[CorrelationCluster]]:
+        n = len(dataset)
+        if n <= 1:
+            return np.arange(n, dtype=np.int64), []
+        
+        logger.info(f"Computing substring correlation for {n} entries")
+        
+        # Sort rows by length (shortest first)
+        lengths = _text_lengths(dataset)
+        by_length = np.argsort(lengths, kind='stable')
+        source = dataset.normalized.source
+        
+        # Find all rows that contain each short text in one pass over the texts
+        progress = ProgressReporter.ensure(progress)
+        progress.start("substring", n)
+        groups = find_containment_groups(
+            source.get('folded')[by_length].tolist(),
+            self.min_substring_length,
+            identities=source.get('stripped')[by_length].tolist(),
+            group_keys=dataset.columns['str_id'].to_numpy()[by_length].tolist(),
+            progress=progress
+        )
+        progress.finish()
         
-        # Sort entries by length (shortest first)
-        sorted_entries = sorted(entries, key=lambda e: len(e.source_text))
         clusters = []
-        used_entries = set()
-        cluster_id = 0
+        clustered = np.zeros(n, dtype=bool)
         
-        for i, short_entry in enumerate(sorted_entries):
-            if short_entry.str_id in used_entries:
-                continue
-                
-            short_text = short_entry.source_text.strip()
+        for cluster_id, group in enumerate(groups):
+            rows = by_length[group]
+            clustered[rows] = True
             
-            # Skip very short strings
-            if len(short_text) < self.min_substring_length:
-                continue
-            
-            # Find all entries that contain this short text
-            related_entries = [short_entry]
-            
-            for long_entry in sorted_entries[i+1:]:
-                if long_entry.str_id in used_entries:
-                    continue
-                    
-                long_text = long_entry.source_text.strip()
-                
-                # Check if short text appears in long text
-                if short_text.lower() in long_text.lower() and short_text != long_text:
-                    related_entries.append(long_entry)
-            
-            # Create cluster if we found related entries
-            if len(related_entries) > 1:
-                for entry in related_entries:
-                    used_entries.add(entry.str_id)
-                
-                clusters.append(CorrelationCluster(
-                    entries=related_entries,
-                    similarity_score=1.0,
-                    cluster_id=cluster_id,
-                    cluster_type="substring"
-                ))
-                cluster_id += 1
-        
-        # Create final sorted order
-        result = []
-        
-        # Add clustered entries first
-        for cluster in clusters:
-            cluster_sorted = sorted(cluster.entries, key=lambda e: len(e.source_text))
-            result.extend(cluster_sorted)
-        
-        # Add non-clustered entries
-        unclustered = [entry for entry in entries if entry.str_id not in used_entries]
-        unclustered_sorted = sorted(unclustered, key=lambda e: (len(e.source_text), e.source_text))
-        result.extend(unclustered_sorted)
+            clusters.append(CorrelationCluster(
+                similarity_score=0.0,
+                cluster_id=cluster_id,
+                cluster_type="substring",
+                member_indices=rows.tolist(),
+                rows=rows
+            ))
+        score_substring_clusters(clusters, source.get('cleaned'), self.similarity_calc)
+        
+        # Clustered rows first, shortest first within each cluster
+        parts = [cluster.rows[np.argsort(lengths[cluster.rows], kind='stable')] for cluster in clusters]
+        
+        # Then the non-clustered rows by length and text
+        texts = dataset.columns['source_text'].tolist()
+        parts.append(_sorted_rows(np.flatnonzero(~clustered), key=lambda i: (lengths[i], texts[i])))
         
         logger.info(f"Created {len(clusters)} substring clusters")
-        return result, clusters
+        return np.concatenate(parts), clusters
 
 
 class SemanticCorrelationStrategy(CorrelationStrategy):
     """Sort strings by semantic similarity"""
     
-    def __init__(self, similarity_threshold: float = 0.7, max_cluster_size: int = 15):
+    text_keys = ('lowered', 'cleaned')
+    
+    def __init__(self, similarity_threshold: float = 0.7, max_cluster_size: int = 15,
+                 similarity_mode: str = "dense", top_k: int = 20,
+                 similarity_calc: Optional[SimilarityCalculator] = None):
         self.similarity_threshold = similarity_threshold
         self.max_cluster_size = max_cluster_size
-        self.similarity_calc = SimilarityCalculator()
+        self.similarity_mode = similarity_mode
+        self.top_k = top_k
+        self.similarity_calc = similarity_calc or SimilarityCalculator()
     
-    def sort_entries(self, entries: List[TranslationEntry]) -> Tuple[List[TranslationEntry], List[CorrelationCluster]]:
-        if len(entries) <= 1:
-            return entries, []
-        
-        logger.info(f"Computing semantic correlation for {len(entries)} entries")
+    def sort_rows(self, dataset: TranslationDataset,
+                  progress: Optional[ProgressReporter] = None) -> Tuple[np.ndarray, List[CorrelationCluster]]:
+        n = len(dataset)
+        if n <= 1:
+            return np.arange(n, dtype=np.int64), []
         
-        # Get source texts
-        texts = [entry.source_text for entry in entries]
-        
-        # Calculate similarity matrix
-        similarity_matrix = self.similarity_calc.calculate_similarity_matrix(texts)
+        logger.info(f"Computing semantic correlation for {n} entries ({self.similarity_mode} similarity)")
         
         # Simple clustering: find pairs with high similarity
-        clusters = []
-        used_indices = set()
-        cluster_id = 0
+        clusters = build_semantic_clusters(
+            dataset.normalized.source.get('cleaned').tolist(), self.similarity_calc, self.similarity_threshold,
+            self.max_cluster_size, self.similarity_mode, self.top_k,
+            progress=progress
+        )
+        
+        # Clustered rows first, biggest cluster first, members by text
+        texts = dataset.columns['source_text'].tolist()
+        parts = []
+        clustered = np.zeros(n, dtype=bool)
         
-        for i in range(len(entries)):
-            if i in used_indices:
-                continue
-                
-            cluster_entries = [entries[i]]
-            used_indices.add(i)
-            
-            # Find similar entries
-            for j in range(i + 1, len(entries)):
-                if j in used_indices:
-                    continue
-                    
-                if similarity_matrix[i][j] > self.similarity_threshold:
-                    cluster_entries.append(entries[j])
-                    used_indices.add(j)
-                    
-                    # Limit cluster size
-                    if len(cluster_entries) >= self.max_cluster_size:
-                        break
-            
-            # Only create cluster if we have multiple entries
-            if len(cluster_entries) > 1:
-                avg_similarity = np.mean([similarity_matrix[i][j] 
-                                        for i in range(len(cluster_entries))
-                                        for j in range(i + 1, len(cluster_entries))])
-                
-                clusters.append(CorrelationCluster(
-                    entries=cluster_entries,
-                    similarity_score=float(avg_similarity),
-                    cluster_id=cluster_id,
-                    cluster_type="semantic"
-                ))
-                cluster_id += 1
-        
-        # Create final sorted order
-        result = []
-        clustered_ids = set()
-        
-        # Add clustered entries
         for cluster in sorted(clusters, key=lambda c: c.size, reverse=True):
-            cluster_sorted = sorted(cluster.entries, key=lambda e: e.source_text)
-            result.extend(cluster_sorted)
-            clustered_ids.update(entry.str_id for entry in cluster.entries)
+            parts.append(_sorted_rows(cluster.rows, key=texts.__getitem__))
+            clustered[cluster.rows] = True
         
-        # Add non-clustered entries
-        unclustered = [entry for entry in entries if entry.str_id not in clustered_ids]
-        unclustered_sorted = sorted(unclustered, key=lambda e: e.source_text)
-        result.extend(unclustered_sorted)
+        # Add non-clustered rows
+        parts.append(_sorted_rows(np.flatnonzero(~clustered), key=texts.__getitem__))
         
         logger.info(f"Created {len(clusters)} semantic clusters")
-        return result, clusters
+        return np.concatenate(parts), clusters
+
+
+class GraphCorrelationStrategy(CorrelationStrategy):
+    """Sort strings by connected components of the thresholded similarity graph"""
+    
+    text_keys = ('lowered', 'cleaned')
+    
+    def __init__(self, similarity_threshold: float = 0.7, max_cluster_size: int = 15, top_k: int = 20,
+                 similarity_calc: Optional[SimilarityCalculator] = None):
+        self.similarity_threshold = similarity_threshold
+        self.max_cluster_size = max_cluster_size
+        self.top_k = top_k
+        self.similarity_calc = similarity_calc or SimilarityCalculator()
+    
+    def sort_rows(self, dataset: TranslationDataset,
+                  progress: Optional[ProgressReporter] = None) -> Tuple[np.ndarray, List[CorrelationCluster]]:
+        n = len(dataset)
+        if n <= 1:
+            return np.arange(n, dtype=np.int64), []
+        
+        logger.info(f"Computing graph correlation for {n} entries")
+        
+        # Canonical order first so ties and splits do not depend on input order
+        canonical = canonical_rows(dataset)
+        source = dataset.normalized.source
+        
+        # Sparse neighbour graph, then vectorised components (no pairwise Python loops)
+        progress = ProgressReporter.ensure(progress)
+        progress.start("graph", n)
+        vectors = self.similarity_calc.vectorize(source.get('cleaned')[canonical].tolist(), cleaned=True)
+        graph = self.similarity_calc.similarity_graph(vectors, self.similarity_threshold, self.top_k, progress=progress)
+        labels = cluster_similarity_graph(graph, self.similarity_threshold, self.max_cluster_size)
+        progress.finish()
+        
+        clusters, order = _component_clusters(labels, canonical, source.get('lowered'), "semantic")
+        ClusterMetrics(vectors).apply(clusters)
+        
+        logger.info(f"Created {len(clusters)} graph clusters")
+        return order, clusters
+
+
+class MinHashCorrelationStrategy(CorrelationStrategy):
+    """Sort near-duplicate strings together using MinHash signatures and LSH buckets"""
+    
+    def __init__(self, similarity_threshold: float = 0.5, max_cluster_size: int = 15,
+                 num_bands: int = 20, rows_per_band: int = 3, shingle_size: int = 3):
+        self.similarity_threshold = similarity_threshold
+        self.max_cluster_size = max_cluster_size
+        self.lsh = MinHashLSH(num_bands=num_bands, rows_per_band=rows_per_band, shingle_size=shingle_size)
+    
+    def sort_rows(self, dataset: TranslationDataset,
+                  progress: Optional[ProgressReporter] = None) -> Tuple[np.ndarray, List[CorrelationCluster]]:
+        n = len(dataset)
+        if n <= 1:
+            return np.arange(n, dtype=np.int64), []
+        
+        logger.info(f"Computing MinHash correlation for {n} entries")
+        
+        # Canonical order first so ties and splits do not depend on input order
+        canonical = canonical_rows(dataset)
+        
+        # Candidate pairs come from shared LSH buckets only (no all-pairs comparison)
+        progress = ProgressReporter.ensure(progress)
+        progress.start("minhash", n)
+        graph, signatures = self.lsh.similarity_graph(
+            dataset.columns['source_text'].to_numpy()[canonical].tolist(), self.similarity_threshold, progress
+        )
+        labels = cluster_similarity_graph(graph, self.similarity_threshold, self.max_cluster_size)
+        progress.finish()
+        
+        clusters, order = _component_clusters(
+            labels, canonical, dataset.normalized.source.get('lowered'), "near_duplicate"
+        )
+        
+        # Scores are estimated Jaccard similarities from the signatures of clustered rows
+        if clusters:
+            clustered = np.unique(np.concatenate([cluster.member_indices for cluster in clusters]))
+            vectors = self.lsh.signature_vectors(signatures, clustered)
+            ClusterMetrics(vectors).apply(clusters)
+        
+        logger.info(f"Created {len(clusters)} near-duplicate clusters")
+        return order, clusters
+
+
+def canonical_rows(dataset: TranslationDataset) -> np.ndarray:
+    """Rows sorted by (source_text, str_id), an order that does not depend on the input order"""
+    texts = dataset.columns['source_text'].tolist()
+    str_ids = dataset.columns['str_id'].tolist()
+    return _sorted_rows(range(len(dataset)), key=lambda i: (texts[i], str_ids[i]))
+
+
+def _component_clusters(labels: np.ndarray, canonical: np.ndarray, lowered: np.ndarray,
+                        cluster_type: str) -> Tuple[List[CorrelationCluster], np.ndarray]:
+    """
+    Clusters and row order from graph component labels over canonically ordered rows
+    
+    Args:
+        labels: Component label per canonical position
+        canonical: Dataset row of every canonical position
+        lowered: Lowercased source text of every dataset row
+        cluster_type: Type given to the clusters
+        
+    Returns:
+        tuple: (clusters with member_indices as canonical positions, row order: clustered rows
+                first, then the rest alphabetically)
+    """
+    lowered = lowered[canonical].tolist()
+    
+    # Order members and clusters by text so the result does not depend on input order
+    groups = []
+    for members in label_groups(labels):
+        groups.append(sorted(members.tolist(), key=lowered.__getitem__))
+    groups.sort(key=lambda members: (-len(members), lowered[members[0]]))
+    
+    clusters = []
+    clustered = np.zeros(len(canonical), dtype=bool)
+    
+    for cluster_id, members in enumerate(groups):
+        clustered[members] = True
+        clusters.append(CorrelationCluster(
+            similarity_score=0.0,
+            cluster_id=cluster_id,
+            cluster_type=cluster_type,
+            member_indices=members,
+            rows=canonical[members]
+        ))
+    
+    # Clustered rows first, then the rest alphabetically
+    unclustered = _sorted_rows(np.flatnonzero(~clustered), key=lowered.__getitem__)
+    order = np.concatenate([cluster.rows for cluster in clusters] + [canonical[unclustered]])
+    return clusters, order
 
 
 class HybridCorrelationStrategy(CorrelationStrategy):
     """Simple hybrid strategy: substring clusters first, then semantic clusters"""
     
-    def __init__(self, similarity_threshold: float = 0.7, min_substring_length: int = 5, max_cluster_size: int = 15):
+    text_keys = ('stripped', 'lowered', 'folded', 'cleaned')
+    
+    def __init__(self, similarity_threshold: float = 0.7, min_substring_length: int = 5, max_cluster_size: int = 15,
+                 similarity_mode: str = "dense", top_k: int = 20,
+                 similarity_calc: Optional[SimilarityCalculator] = None):
         self.similarity_threshold = similarity_threshold
         self.min_substring_length = min_substring_length
         self.max_cluster_size = max_cluster_size
-        self.similarity_calc = SimilarityCalculator()
+        self.similarity_mode = similarity_mode
+        self.top_k = top_k
+        self.similarity_calc = similarity_calc or SimilarityCalculator()
     
-    def sort_entries(self, entries: List[TranslationEntry]) -> Tuple[List[TranslationEntry], List[CorrelationCluster]]:
-        if len(entries) <= 1:
-            return entries, []
+    def sort_rows(self, dataset: TranslationDataset,
+                  progress: Optional[ProgressReporter] = None) -> Tuple[np.ndarray, List[CorrelationCluster]]:
+        n = len(dataset)
+        if n <= 1:
+            return np.arange(n, dtype=np.int64), []
         
-        logger.info(f"Computing simple hybrid correlation for {len(entries)} entries")
+        logger.info(f"Computing simple hybrid correlation for {n} entries")
         
         # Step 1: Find substring clusters (fast)
-        substring_clusters, clustered_ids = self._create_substring_clusters(entries)
+        substring_clusters, clustered = self._create_substring_clusters(dataset, progress)
         logger.info(f"Found {len(substring_clusters)} substring clusters")
         
-        # Step 2: Find semantic clusters from remaining entries (slower)
-        unclustered_entries = [e for e in entries if e.str_id not in clustered_ids]
-        semantic_clusters = self._create_semantic_clusters(unclustered_entries)
+        # Step 2: Find semantic clusters from remaining rows (slower)
+        semantic_clusters = self._create_semantic_clusters(dataset, np.flatnonzero(~clustered), progress)
         logger.info(f"Found {len(semantic_clusters)} semantic clusters")
         
         # Step 3: Simple ordering - substring clusters first, then semantic
         all_clusters = substring_clusters + semantic_clusters
-        sorted_entries = self._create_simple_order(entries, all_clusters)
+        order = self._create_simple_order(dataset, all_clusters)
         
         logger.info(f"Final result: {len(all_clusters)} total clusters")
-        return sorted_entries, all_clusters
+        return order, all_clusters
     
-    def _create_substring_clusters(self, entries: List[TranslationEntry]) -> Tuple[List[CorrelationCluster], set]:
-        """Find substring relationships - SIMPLE approach"""
+    def _create_substring_clusters(self, dataset: TranslationDataset,
+                                   progress: Optional[ProgressReporter] = None) -> Tuple[List[CorrelationCluster], np.ndarray]:
+        """Find substring relationships with a single containment index (clusters, clustered row mask)"""
         clusters = []
-        used_ids = set()
-        cluster_id = 0
+        clustered = np.zeros(len(dataset), dtype=bool)
         
         # Sort by length (shortest first) 
-        entries_by_length = sorted(entries, key=lambda e: len(e.source_text))
-        
-        for i, short_entry in enumerate(entries_by_length):
-            if short_entry.str_id in used_ids:
-                continue
-                
-            short_text = short_entry.source_text.strip().lower()
-            
-            # Skip very short strings
-            if len(short_text) < self.min_substring_length:
-                continue
-            
-            # Find longer strings that contain this short string
-            related_entries = [short_entry]
-            
-            for long_entry in entries_by_length[i+1:]:
-                if long_entry.str_id in used_ids:
-                    continue
-                    
-                long_text = long_entry.source_text.strip().lower()
-                
-                # Simple substring check
-                if short_text in long_text and short_text != long_text:
-                    related_entries.append(long_entry)
-                    
-                    # Limit cluster size
-                    if len(related_entries) >= self.max_cluster_size:
-                        break
+        by_length = np.argsort(_text_lengths(dataset), kind='stable')
+        source = dataset.normalized.source
+        
+        progress = ProgressReporter.ensure(progress)
+        progress.start("substring", len(dataset))
+        groups = find_containment_groups(
+            source.get('folded')[by_length].tolist(),
+            self.min_substring_length,
+            max_group_size=self.max_cluster_size,
+            group_keys=dataset.columns['str_id'].to_numpy()[by_length].tolist(),
+            progress=progress
+        )
+        progress.finish()
+        
+        for cluster_id, group in enumerate(groups):
+            rows = by_length[group]
+            clustered[rows] = True
             
-            # Create cluster if we found relationships
-            if len(related_entries) > 1:
-                for entry in related_entries:
-                    used_ids.add(entry.str_id)
-                
-                cluster = CorrelationCluster(
-                    entries=related_entries,
-                    similarity_score=1.0,  # Perfect match for substrings
-                    cluster_id=cluster_id,
-                    cluster_type="substring"
-                )
-                clusters.append(cluster)
-                cluster_id += 1
-        
-        return clusters, used_ids
-    
-    def _create_semantic_clusters(self, entries: List[TranslationEntry]) -> List[CorrelationCluster]:
-        """Find semantic relationships - ONLY for unclustered entries"""
-        if len(entries) <= 1:
-            return []
-        
-        # This is the slow part - only run on remaining entries
-        texts = [entry.source_text for entry in entries]
-        similarity_matrix = self.similarity_calc.calculate_similarity_matrix(texts)
+            cluster = CorrelationCluster(
+                similarity_score=0.0,
+                cluster_id=cluster_id,
+                cluster_type="substring",
+                member_indices=rows.tolist(),
+                rows=rows
+            )
+            clusters.append(cluster)
         
-        clusters = []
-        used_indices = set()
-        cluster_id = 1000  # Different ID range
+        score_substring_clusters(clusters, source.get('cleaned'), self.similarity_calc)
+        return clusters, clustered
+    
+    def _create_semantic_clusters(self, dataset: TranslationDataset, rows: np.ndarray,
+                                  progress: Optional[ProgressReporter] = None) -> List[CorrelationCluster]:
+        """Find semantic relationships - ONLY for unclustered rows"""
+        if len(rows) <= 1:
+            return []
         
-        for i in range(len(entries)):
-            if i in used_indices:
-                continue
-                
-            # Start new cluster
-            cluster_entries = [entries[i]]
-            used_indices.add(i)
-            
-            # Find similar entries
-            for j in range(i + 1, len(entries)):
-                if j in used_indices:
-                    continue
-                    
-                # Check if similar enough
-                if similarity_matrix[i][j] > self.similarity_threshold:
-                    cluster_entries.append(entries[j])
-                    used_indices.add(j)
-                    
-                    # Limit cluster size
-                    if len(cluster_entries) >= self.max_cluster_size:
-                        break
-            
-            # Only create cluster if multiple entries
-            if len(cluster_entries) > 1:
-                # Calculate average similarity for this cluster
-                similarities = []
-                for x in range(len(cluster_entries)):
-                    for y in range(x + 1, len(cluster_entries)):
-                        idx_x = entries.index(cluster_entries[x])
-                        idx_y = entries.index(cluster_entries[y])
-                        similarities.append(similarity_matrix[idx_x][idx_y])
-                
-                avg_similarity = sum(similarities) / len(similarities) if similarities else 0.0
-                
-                cluster = CorrelationCluster(
-                    entries=cluster_entries,
-                    similarity_score=avg_similarity,
-                    cluster_id=cluster_id,
-                    cluster_type="semantic"
-                )
-                clusters.append(cluster)
-                cluster_id += 1
+        # This is the slow part - only run on remaining rows
+        clusters = build_semantic_clusters(
+            dataset.normalized.source.get('cleaned')[rows].tolist(), self.similarity_calc, self.similarity_threshold,
+            self.max_cluster_size, self.similarity_mode, self.top_k,
+            first_cluster_id=1000,  # Different ID range
+            progress=progress,
+            rows=rows
+        )
         
         return clusters
     
-    def _create_simple_order(self, all_entries: List[TranslationEntry], clusters: List[CorrelationCluster]) -> List[TranslationEntry]:
-        """Simple ordering: clusters first, then remaining entries"""
-        result = []
-        clustered_ids = set()
+    def _create_simple_order(self, dataset: TranslationDataset, clusters: List[CorrelationCluster]) -> np.ndarray:
+        """Simple ordering: clusters first, then remaining rows"""
+        lengths = _text_lengths(dataset)
+        lowered = dataset.normalized.source.get('lowered').tolist()
+        parts = []
+        clustered = np.zeros(len(dataset), dtype=bool)
         
         # Sort clusters by size (biggest first) and type (substring first)
         def cluster_sort_key(cluster):
@@ -333,23 +587,20 @@ class HybridCorrelationStrategy(CorrelationStrategy):
         
         sorted_clusters = sorted(clusters, key=cluster_sort_key)
         
-        # Add all clustered entries
+        # Add all clustered rows
         for cluster in sorted_clusters:
             # Within each cluster: sort by length for substring, alphabetically for semantic
             if cluster.cluster_type == "substring":
-                cluster_entries = sorted(cluster.entries, key=lambda e: len(e.source_text))
+                parts.append(cluster.rows[np.argsort(lengths[cluster.rows], kind='stable')])
             else:
-                cluster_entries = sorted(cluster.entries, key=lambda e: e.source_text.lower())
+                parts.append(_sorted_rows(cluster.rows, key=lowered.__getitem__))
             
-            result.extend(cluster_entries)
-            clustered_ids.update(e.str_id for e in cluster.entries)
+            clustered[cluster.rows] = True
         
-        # Add remaining unclustered entries at the end
-        unclustered = [e for e in all_entries if e.str_id not in clustered_ids]
-        unclustered_sorted = sorted(unclustered, key=lambda e: e.source_text.lower())
-        result.extend(unclustered_sorted)
+        # Add remaining unclustered rows at the end
+        parts.append(_sorted_rows(np.flatnonzero(~clustered), key=lowered.__getitem__))
         
-        return result
+        return np.concatenate(parts)
 
 class StringCorrelator:
     """Main string correlation engine"""
@@ -358,45 +609,50 @@ class StringCorrelator:
         self.strategy = strategy or HybridCorrelationStrategy()
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
     
-    def process(self, dataset: TranslationDataset) -> TranslationDataset:
-        """Apply correlation sorting to dataset"""
+    def process(self, dataset: TranslationDataset, progress: Optional[ProgressReporter] = None) -> TranslationDataset:
+        """Apply correlation sorting to dataset (progress is passed to the strategy's stages)"""
         self.logger.info(f"Starting correlation sorting for {len(dataset)} entries")
         
         try:
+            # Normalise the texts once for the whole dataset; strategies read the columns
+            dataset.normalized.source.compute(*self.strategy.text_keys)
+            
             # Apply correlation strategy
-            sorted_entries, clusters = self.strategy.sort_entries(dataset.entries)
+            order, clusters = self.strategy.sort_rows(dataset, progress)
             
-            # Create new dataset with sorted entries
-            result_dataset = TranslationDataset(
-                entries=sorted_entries,
-                source_lang=dataset.source_lang,
-                target_lang=dataset.target_lang
-            )
+            # Reorder the rows by permutation; cluster members become rows of the result
+            result_dataset = dataset.take(order)
+            labels = attach_clusters(result_dataset, order, clusters)
             
             # Update processing result
             if dataset.result:
                 dataset.result.clusters_found = len(clusters)
                 dataset.result.correlation_clusters = clusters
+                dataset.result.order = order
+                dataset.result.cluster_labels = labels
                 result_dataset.result = dataset.result
             
             self.logger.info(f"Correlation sorting completed: {len(clusters)} clusters found")
             return result_dataset
             
+        except ProcessingCancelled:
+            raise
         except Exception as e:
             self.logger.error(f"Correlation sorting failed: {str(e)}")
             raise
     
     def analyze_correlations(self, dataset: TranslationDataset) -> Dict[str, any]:
         """Analyze correlation patterns without sorting"""
-        if len(dataset.entries) <= 1:
+        if len(dataset) <= 1:
             return {"message": "Not enough entries for correlation analysis"}
         
         # Simple analysis
+        lengths = _text_lengths(dataset)
         analysis = {
-            'total_entries': len(dataset.entries),
-            'avg_text_length': np.mean([len(entry.source_text) for entry in dataset.entries]),
-            'max_text_length': max(len(entry.source_text) for entry in dataset.entries),
-            'min_text_length': min(len(entry.source_text) for entry in dataset.entries)
+            'total_entries': len(dataset),
+            'avg_text_length': np.mean(lengths),
+            'max_text_length': int(lengths.max()),
+            'min_text_length': int(lengths.min())
         }
         
         return analysis
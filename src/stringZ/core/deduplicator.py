@@ -1,170 +1,153 @@
 import logging
-from typing import List, Tuple, Dict
-from collections import defaultdict
+from typing import List, Tuple, Dict, Optional
+import numpy as np
+import pandas as pd
 
 from ..models.data_models import TranslationDataset, TranslationEntry, DuplicateGroup, ProcessingResult
+from ..utils.progress_utils import ProgressReporter, ProcessingCancelled
 
 logger = logging.getLogger(__name__)
 
 
 class DeduplicationStrategy:
-    """Base class for deduplication strategies"""
+    """Base class for deduplication strategies.
+    Strategies select rows with select(), which works on the dataset columns and
+    returns index arrays; deduplicate() is the entry-list form of the same result."""
     
-    def deduplicate(self, entries: List[TranslationEntry]) -> Tuple[List[TranslationEntry], List[DuplicateGroup]]:
+    def select(self, dataset: TranslationDataset,
+               progress: Optional[ProgressReporter] = None) -> Tuple[np.ndarray, Optional[np.ndarray], List[np.ndarray]]:
+        """
+        Choose the rows to keep
+        
+        Args:
+            dataset: Input translation dataset
+            progress: Optional progress/cancellation reporter
+            
+        Returns:
+            tuple: (kept row indices in output order,
+                    new occurrence counts for the kept rows or None to keep them,
+                    row index arrays of every duplicate group, aligned with the kept rows they produced)
+        """
         raise NotImplementedError
+    
+    def deduplicate(self, entries: List[TranslationEntry],
+                    progress: Optional[ProgressReporter] = None) -> Tuple[List[TranslationEntry], List[DuplicateGroup]]:
+        """Entry-list wrapper around select()"""
+        dataset = TranslationDataset(entries=entries)
+        kept, occurrences, groups = self.select(dataset, progress)
+        result = dataset.take(kept, occurrences)
+        return result.entries, _duplicate_groups(dataset, result, kept, groups, self.group_texts)
+    
+    def group_texts(self, dataset: TranslationDataset, rows: np.ndarray) -> List[str]:
+        """Texts shown as the source_text of the duplicate groups starting at rows"""
+        return dataset.columns['source_text'].take(rows).tolist()
 
 
 class KeepFirstWithOccurrencesStrategy(DeduplicationStrategy):
     """Keep first occurrence and add occurrences count - following your original logic exactly"""
     
-    def deduplicate(self, entries: List[TranslationEntry]) -> Tuple[List[TranslationEntry], List[DuplicateGroup]]:
-        # Group by EN + target language combination (your original logic)
-        groups = defaultdict(list)
-        
-        for entry in entries:
-            # Create key from EN + target text (like your original script)
-            en_text = entry.source_text.strip() if entry.source_text else ""
-            target_text = entry.target_text.strip() if entry.target_text else ""
-            
-            # Handle null/empty values like your original script
-            if not target_text:
-                target_text = ""  # Treat None/empty as empty string
-            
-            key = (en_text, target_text)
-            groups[key].append(entry)
+    def select(self, dataset: TranslationDataset,
+               progress: Optional[ProgressReporter] = None) -> Tuple[np.ndarray, Optional[np.ndarray], List[np.ndarray]]:
+        # Group by EN + target language combination (your original logic), None/empty target counts as ""
+        texts = dataset.normalized
+        codes = _group_codes(texts.source.stripped, texts.target.stripped)
         
-        unique_entries = []
-        duplicate_groups = []
+        logger.info(f"Found {codes.max() + 1 if len(codes) else 0} unique EN+target combinations from {len(codes)} entries")
         
-        logger.info(f"Found {len(groups)} unique EN+target combinations from {len(entries)} entries")
+        # Keep the first row of every combination with the group size as occurrences count,
+        # then sort by occurrences (descending) like your original script
+        first_rows, counts, groups = _first_rows(codes)
+        order = np.argsort(-counts, kind='stable')
         
-        # Process each unique EN+target combination
-        for (en_text, target_text), group_entries in groups.items():
-            # Keep first entry but create a NEW entry with occurrences count
-            first_entry = group_entries[0]
-            occurrences_count = len(group_entries)
-            
-            # CRITICAL: Create new entry with occurrences count (don't modify existing dataclass)
-            new_entry = TranslationEntry(
-                str_id=first_entry.str_id,
-                source_text=first_entry.source_text,
-                target_text=first_entry.target_text,
-                source_lang=first_entry.source_lang,
-                target_lang=first_entry.target_lang,
-                occurrences=occurrences_count  # This is the key difference!
-            )
-            
-            unique_entries.append(new_entry)
-            
-            # Log what we're doing
-            if occurrences_count > 1:
-                logger.info(f"Duplicate found: '{en_text[:30]}...' + '{target_text[:20]}...' appears {occurrences_count} times")
-            
-            # Record duplicate group if there are multiple occurrences
-            if len(group_entries) > 1:
-                duplicate_group = DuplicateGroup(
-                    source_text=en_text,
-                    entries=group_entries,
-                    kept_entry=new_entry
-                )
-                duplicate_groups.append(duplicate_group)
+        duplicates = [group for group in groups if len(group) > 1]
+        logger.info(f"Deduplication results: {len(codes)} entries, {len(first_rows)} unique EN+target combinations, "
+                    f"{len(duplicates)} duplicate groups")
         
-        # Sort by occurrences (descending) like your original script
-        unique_entries.sort(key=lambda e: e.occurrences, reverse=True)
-        
-        duplicates_removed = len(entries) - len(unique_entries)
-        logger.info(f"Deduplication results:")
-        logger.info(f"  Original entries: {len(entries)}")
-        logger.info(f"  Unique EN+target combinations: {len(unique_entries)}")
-        logger.info(f"  Duplicates removed: {duplicates_removed}")
-        logger.info(f"  Duplicate groups found: {len(duplicate_groups)}")
-        
-        # Log sample with occurrences
-        if unique_entries:
-            sample = unique_entries[0]
-            logger.info(f"  Sample entry with occurrences: {sample.str_id} has {sample.occurrences} occurrences")
-        
-        return unique_entries, duplicate_groups
+        return first_rows[order], counts[order], duplicates
+    
+    def group_texts(self, dataset: TranslationDataset, rows: np.ndarray) -> List[str]:
+        return dataset.normalized.source.stripped[rows].tolist()
 
 
 class KeepFirstStrategy(DeduplicationStrategy):
     """Keep the first occurrence of duplicate entries (by EN text only)"""
     
-    def deduplicate(self, entries: List[TranslationEntry]) -> Tuple[List[TranslationEntry], List[DuplicateGroup]]:
+    def select(self, dataset: TranslationDataset,
+               progress: Optional[ProgressReporter] = None) -> Tuple[np.ndarray, Optional[np.ndarray], List[np.ndarray]]:
         # Group entries by source text only
-        text_groups = defaultdict(list)
-        for entry in entries:
-            text_groups[entry.source_text].append(entry)
-        
-        unique_entries = []
-        duplicate_groups = []
+        codes = _group_codes(dataset.columns['source_text'])
+        first_rows, counts, groups = _first_rows(codes)
         
-        # Process each group
-        for source_text, group_entries in text_groups.items():
-            if len(group_entries) == 1:
-                # No duplicates, keep the entry
-                unique_entries.append(group_entries[0])
-            else:
-                # Duplicates found, keep first and record the group
-                kept_entry = group_entries[0]
-                unique_entries.append(kept_entry)
-                
-                duplicate_group = DuplicateGroup(
-                    source_text=source_text,
-                    entries=group_entries,
-                    kept_entry=kept_entry
-                )
-                duplicate_groups.append(duplicate_group)
-        
-        return unique_entries, duplicate_groups
+        duplicates = [group for group in groups if len(group) > 1]
+        return first_rows, None, duplicates
 
 
 class KeepBestStrategy(DeduplicationStrategy):
     """Keep the entry with the best quality (longest translation, non-empty)"""
     
-    def deduplicate(self, entries: List[TranslationEntry]) -> Tuple[List[TranslationEntry], List[DuplicateGroup]]:
+    def select(self, dataset: TranslationDataset,
+               progress: Optional[ProgressReporter] = None) -> Tuple[np.ndarray, Optional[np.ndarray], List[np.ndarray]]:
         # Group entries by source text
-        text_groups = defaultdict(list)
-        for entry in entries:
-            text_groups[entry.source_text].append(entry)
-        
-        unique_entries = []
-        duplicate_groups = []
+        codes = _group_codes(dataset.columns['source_text'])
+        first_rows, counts, groups = _first_rows(codes)
         
-        # Process each group
-        for source_text, group_entries in text_groups.items():
-            if len(group_entries) == 1:
-                # No duplicates, keep the entry
-                unique_entries.append(group_entries[0])
-            else:
-                # Choose best entry based on translation quality
-                best_entry = self._choose_best_entry(group_entries)
-                unique_entries.append(best_entry)
-                
-                duplicate_group = DuplicateGroup(
-                    source_text=source_text,
-                    entries=group_entries,
-                    kept_entry=best_entry
-                )
-                duplicate_groups.append(duplicate_group)
+        # Priority: has translation > longer translation > first occurrence
+        target = dataset.normalized.target.stripped
+        translation_length = np.fromiter(map(len, target), dtype=np.int64, count=len(target))
+        rows = np.arange(len(codes))
+        best = np.lexsort((rows, -translation_length, codes))
+        is_first = np.ones(len(best), dtype=bool)
+        is_first[1:] = codes[best[1:]] != codes[best[:-1]]
+        kept = best[is_first]
         
-        return unique_entries, duplicate_groups
+        duplicates = [group for group in groups if len(group) > 1]
+        return kept, None, duplicates
+
+
+def _group_codes(*columns) -> np.ndarray:
+    """Group code per row, numbered in order of first appearance"""
+    codes = np.zeros(len(columns[0]), dtype=np.int64)
     
-    def _choose_best_entry(self, entries: List[TranslationEntry]) -> TranslationEntry:
-        """Choose the best entry from a group of duplicates"""
-        
-        def quality_score(entry: TranslationEntry) -> tuple:
-            """Calculate quality score for an entry"""
-            target_text = entry.target_text or ""
-            
-            # Priority: has translation > longer translation > first occurrence
-            has_translation = bool(target_text.strip())
-            translation_length = len(target_text.strip())
-            
-            return (has_translation, translation_length)
-        
-        # Sort by quality score (descending) and return the best
-        return max(entries, key=quality_score)
+    # Combine the per-column codes pairwise, renumbering after each step to avoid overflow
+    for column in columns:
+        column_codes, uniques = pd.factorize(column)
+        codes, _ = pd.factorize(codes * (len(uniques) + 1) + column_codes)
+    
+    return codes.astype(np.int64)
+
+
+def _first_rows(codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, List[np.ndarray]]:
+    """First row, size and rows (ascending) of every group, groups in code order"""
+    if len(codes) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), []
+    
+    order = np.argsort(codes, kind='stable')
+    boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+    groups = np.split(order, boundaries)
+    counts = np.bincount(codes)
+    first_rows = order[np.concatenate([[0], boundaries])]
+    return first_rows, counts, groups
+
+
+def _duplicate_groups(dataset: TranslationDataset, result: TranslationDataset, kept: np.ndarray,
+                      groups: List[np.ndarray], group_texts) -> List[DuplicateGroup]:
+    """DuplicateGroup records (entry views) for the duplicate row groups of a selection"""
+    if not groups:
+        return []
+    
+    # Position of every input row in the result (-1 when it was dropped)
+    result_positions = np.full(len(dataset), -1, dtype=np.int64)
+    result_positions[kept] = np.arange(len(kept))
+    kept_positions = [int(result_positions[rows][result_positions[rows] >= 0][0]) for rows in groups]
+    
+    # Kept entries are built in bulk, group members only when a caller reads them
+    kept_views = result.entries_at(kept_positions)
+    texts = group_texts(dataset, np.array([rows[0] for rows in groups], dtype=np.int64))
+    
+    return [
+        DuplicateGroup(source_text=text, kept_entry=kept_entry, rows=rows, dataset=dataset)
+        for rows, text, kept_entry in zip(groups, texts, kept_views)
+    ]
 
 
 class Deduplicator:
@@ -174,51 +157,53 @@ class Deduplicator:
         self.strategy = strategy or KeepFirstWithOccurrencesStrategy()  # Default to your original logic
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
     
-    def process(self, dataset: TranslationDataset) -> TranslationDataset:
+    def process(self, dataset: TranslationDataset, progress: Optional[ProgressReporter] = None) -> TranslationDataset:
         """
         Process dataset to remove duplicates
         
         Args:
             dataset: Input translation dataset
+            progress: Optional progress/cancellation reporter (stage "deduplication")
             
         Returns:
-            New dataset with duplicates removed
+            New dataset with duplicates removed (rows selected by index, see result.kept_indices)
         """
         self.logger.info(f"Starting deduplication of {len(dataset)} entries")
+        progress = ProgressReporter.ensure(progress)
         
         try:
             # Apply deduplication strategy
-            unique_entries, duplicate_groups = self.strategy.deduplicate(dataset.entries)
+            progress.start("deduplication", len(dataset))
+            kept, occurrences, groups = self.strategy.select(dataset, progress)
+            result_dataset = dataset.take(kept, occurrences)
+            duplicate_groups = _duplicate_groups(dataset, result_dataset, kept, groups, self.strategy.group_texts)
+            progress.finish()
             
             # Calculate statistics
-            duplicates_removed = len(dataset.entries) - len(unique_entries)
-            
-            # Create new dataset with results
-            result_dataset = TranslationDataset(
-                entries=unique_entries,
-                source_lang=dataset.source_lang,
-                target_lang=dataset.target_lang
-            )
+            duplicates_removed = len(dataset) - len(result_dataset)
             
             # Create processing result
             result = ProcessingResult(
-                original_count=len(dataset.entries),
-                final_count=len(unique_entries),
+                original_count=len(dataset),
+                final_count=len(result_dataset),
                 duplicates_removed=duplicates_removed,
                 clusters_found=0,  # Will be updated by correlator
                 processing_time=0.0,  # Will be updated by main processor
-                duplicate_groups=duplicate_groups
+                duplicate_groups=duplicate_groups,
+                kept_indices=kept
             )
             
             result_dataset.result = result
             
             self.logger.info(
-                f"Deduplication completed: {len(dataset.entries)} → {len(unique_entries)} "
+                f"Deduplication completed: {len(dataset)} → {len(result_dataset)} "
                 f"({duplicates_removed} duplicates removed)"
             )
             
             return result_dataset
             
+        except ProcessingCancelled:
+            raise
         except Exception as e:
             self.logger.error(f"Deduplication failed: {str(e)}")
             raise
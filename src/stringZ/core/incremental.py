@@ -0,0 +1,323 @@
+import logging
+import os
+import pickle
+import tempfile
+from collections import defaultdict
+from typing import List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from ..models.data_models import TranslationDataset, CorrelationCluster
+from ..utils.similarity_utils import SimilarityCalculator, cluster_similarity_graph, label_groups
+from ..utils.cluster_metrics import ClusterMetrics
+from .correlator import attach_clusters, canonical_rows
+
+logger = logging.getLogger(__name__)
+
+
+class CorrelationState:
+    """Persisted result of a correlation run: the fitted vectorizer, the vectors of every
+    row (the neighbour index new rows are searched against) and the cluster assignments"""
+
+    def __init__(self, vectorizer, keys: List[Tuple[str, str]], vectors, labels, next_label: int):
+        """
+        Args:
+            vectorizer: Fitted vectorizer of the SimilarityCalculator
+            keys: (str_id, source_text) of every row
+            vectors: CSR matrix with one row vector per key
+            labels: Cluster label per row (-1 for unclustered rows)
+            next_label: First label not used yet
+        """
+        self.vectorizer = vectorizer
+        self.keys = keys
+        self.vectors = sparse.csr_matrix(vectors)
+        self.labels = np.asarray(labels, dtype=np.int64)
+        self.next_label = next_label
+
+    def __len__(self):
+        return len(self.keys)
+
+    def save(self, path: str) -> None:
+        """Write the state to path (atomically, readers never see a partial file)"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        with tempfile.NamedTemporaryFile(dir=directory, suffix=".tmp", delete=False) as f:
+            temp_path = f.name
+            try:
+                pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                f.close()
+                os.remove(temp_path)
+                raise
+
+        os.replace(temp_path, path)
+        logger.info(f"Saved correlation state ({len(self)} rows) to {path}")
+
+    @classmethod
+    def load(cls, path: str) -> Optional["CorrelationState"]:
+        """Load a saved state, or None when the file is missing or unreadable"""
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'rb') as f:
+                state = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable correlation state {path}: {str(e)}")
+            return None
+
+        logger.info(f"Loaded correlation state ({len(state)} rows) from {path}")
+        return state
+
+
+class IncrementalCorrelator:
+    """Graph correlation that can be updated with a patch instead of a full rerun.
+    A full build clusters the connected components of the top-k neighbour graph, like
+    GraphCorrelationStrategy. An update keeps the fitted vectorizer, vectorizes only
+    new or changed rows, attaches each to the cluster of its best existing neighbour
+    when that cluster has room, and groups the rest into new clusters."""
+
+    def __init__(self, similarity_threshold: float = 0.7, max_cluster_size: int = 15, top_k: int = 20,
+                 similarity_calc: Optional[SimilarityCalculator] = None):
+        self.similarity_threshold = similarity_threshold
+        self.max_cluster_size = max_cluster_size
+        self.top_k = top_k
+        self.similarity_calc = similarity_calc or SimilarityCalculator()
+
+    def process(self, dataset: TranslationDataset,
+                state: Optional[CorrelationState] = None) -> Tuple[TranslationDataset, CorrelationState]:
+        """
+        Correlate a dataset, incrementally when a previous state is given
+
+        Args:
+            dataset: Full dataset (previous rows plus the patch)
+            state: State from an earlier run, or None for a full build
+
+        Returns:
+            tuple: (sorted dataset with correlation clusters in its result, new state)
+        """
+        dataset.normalized.source.compute('lowered', 'cleaned')
+        
+        if state is None:
+            order, clusters, state = self.build(dataset)
+        else:
+            order, clusters, state = self.update(dataset, state)
+
+        result_dataset = dataset.take(order)
+        labels = attach_clusters(result_dataset, order, clusters)
+
+        if dataset.result:
+            dataset.result.clusters_found = len(clusters)
+            dataset.result.correlation_clusters = clusters
+            dataset.result.order = order
+            dataset.result.cluster_labels = labels
+            result_dataset.result = dataset.result
+
+        return result_dataset, state
+
+    def build(self, dataset: TranslationDataset) -> Tuple[np.ndarray, List[CorrelationCluster], CorrelationState]:
+        """Cluster all rows from scratch and create the state for later updates (row order, clusters, state)"""
+        logger.info(f"Building incremental correlation state for {len(dataset)} entries")
+
+        rows = canonical_rows(dataset)
+        vectors = self.similarity_calc.vectorize(dataset.normalized.source.get('cleaned')[rows].tolist(), cleaned=True)
+        graph = self.similarity_calc.similarity_graph(vectors, self.similarity_threshold, self.top_k)
+
+        labels = np.full(len(rows), -1, dtype=np.int64)
+        for label, members in enumerate(label_groups(cluster_similarity_graph(
+                graph, self.similarity_threshold, self.max_cluster_size))):
+            labels[members] = label
+
+        state = CorrelationState(
+            vectorizer=self.similarity_calc.vectorizer,
+            keys=_row_keys(dataset, rows),
+            vectors=vectors,
+            labels=labels,
+            next_label=int(labels.max()) + 1 if len(labels) else 0
+        )
+
+        order, clusters = self._order(dataset, rows, state)
+        return order, clusters, state
+
+    def update(self, dataset: TranslationDataset,
+               state: CorrelationState) -> Tuple[np.ndarray, List[CorrelationCluster], CorrelationState]:
+        """
+        Bring a state up to date with the current rows
+
+        Args:
+            dataset: All current rows; rows are matched to the state by (str_id, source_text)
+            state: State from an earlier build() or update()
+
+        Returns:
+            tuple: (row order, clusters, updated state)
+        """
+        # Reuse the fitted model, so new rows land in the same vector space as the index
+        self.similarity_calc.vectorizer = state.vectorizer
+        self.similarity_calc.fitted = True
+
+        # Match current rows to state rows; anything unmatched is new (or changed)
+        rows_by_key = defaultdict(list)
+        for row, key in enumerate(state.keys):
+            rows_by_key[key].append(row)
+
+        kept_rows, kept_positions, new_positions = [], [], []
+        for position, key in enumerate(_row_keys(dataset, range(len(dataset)))):
+            rows = rows_by_key.get(key)
+            if rows:
+                kept_rows.append(rows.pop())
+                kept_positions.append(position)
+            else:
+                new_positions.append(position)
+
+        removed = len(state) - len(kept_rows)
+        logger.info(
+            f"Incremental correlation: {len(kept_rows)} unchanged, {len(new_positions)} new or changed, "
+            f"{removed} removed"
+        )
+
+        # Drop removed rows from the index, in state order
+        kept_rows = np.array(kept_rows, dtype=np.int64)
+        order = np.argsort(kept_rows, kind='stable')
+        kept_rows = kept_rows[order]
+        kept_positions = np.array(kept_positions, dtype=np.int64)[order]
+
+        vectors = state.vectors[kept_rows]
+        labels = state.labels[kept_rows]
+
+        texts = dataset.columns['source_text'].tolist()
+        str_ids = dataset.columns['str_id'].tolist()
+        new_positions = np.array(sorted(new_positions, key=lambda i: (texts[i], str_ids[i])), dtype=np.int64)
+        if len(new_positions):
+            new_vectors = self.similarity_calc.transform(
+                dataset.normalized.source.get('cleaned')[new_positions].tolist(), cleaned=True
+            )
+            new_labels = self._assign(vectors, labels, new_vectors, state)
+            vectors = sparse.vstack([vectors, new_vectors], format='csr')
+            labels = np.concatenate([labels, new_labels])
+
+        # Removals can leave single-member clusters behind
+        clustered = labels >= 0
+        counts = np.bincount(labels[clustered], minlength=state.next_label)
+        labels[clustered & (counts[np.maximum(labels, 0)] < 2)] = -1
+
+        rows = np.concatenate([kept_positions, new_positions])
+        new_state = CorrelationState(
+            vectorizer=state.vectorizer,
+            keys=_row_keys(dataset, rows),
+            vectors=vectors,
+            labels=labels,
+            next_label=state.next_label
+        )
+
+        order, clusters = self._order(dataset, rows, new_state)
+        return order, clusters, new_state
+
+    def _assign(self, vectors, labels, new_vectors, state: CorrelationState) -> np.ndarray:
+        """
+        Labels for new rows: join the cluster of the best existing neighbour when it has
+        room, otherwise cluster with other new rows and unclustered existing neighbours.
+        New labels are taken from state.next_label, which is advanced.
+        """
+        n_old, n_new = vectors.shape[0], new_vectors.shape[0]
+        new_labels = np.full(n_new, -1, dtype=np.int64)
+        sizes = np.bincount(labels[labels >= 0], minlength=state.next_label)
+
+        # Only the new rows are multiplied against the index
+        to_old = (new_vectors @ vectors.T).tocsr() if n_old else sparse.csr_matrix((n_new, 0))
+        to_old.data[to_old.data <= self.similarity_threshold] = 0
+        to_old.eliminate_zeros()
+
+        # Best clustered neighbour first; strongest matches claim cluster room first
+        best_label = np.full(n_new, -1, dtype=np.int64)
+        best_score = np.zeros(n_new)
+        for i in range(n_new):
+            row = to_old.getrow(i)
+            candidates = labels[row.indices] >= 0
+            if candidates.any():
+                position = np.argmax(np.where(candidates, row.data, -1.0))
+                best_label[i] = labels[row.indices[position]]
+                best_score[i] = row.data[position]
+
+        for i in np.argsort(-best_score, kind='stable'):
+            label = best_label[i]
+            if label >= 0 and sizes[label] < self.max_cluster_size:
+                new_labels[i] = label
+                sizes[label] += 1
+
+        # Remaining new rows form clusters among themselves and with unclustered old rows
+        pending = np.flatnonzero(new_labels < 0)
+        if len(pending) == 0:
+            return new_labels
+
+        old_candidates = np.unique(to_old[pending].indices)
+        old_candidates = old_candidates[labels[old_candidates] < 0]
+
+        local_vectors = sparse.vstack([new_vectors[pending], vectors[old_candidates]], format='csr')
+        graph = self.similarity_calc.similarity_graph(local_vectors, self.similarity_threshold, self.top_k)
+        local_labels = cluster_similarity_graph(graph, self.similarity_threshold, self.max_cluster_size)
+
+        for members in label_groups(local_labels):
+            # Groups made only of old rows were already unclustered before, leave them be
+            new_members = members[members < len(pending)]
+            if len(new_members) == 0:
+                continue
+
+            label = state.next_label
+            state.next_label += 1
+            new_labels[pending[new_members]] = label
+            labels[old_candidates[members[members >= len(pending)] - len(pending)]] = label
+
+        return new_labels
+
+    def _order(self, dataset: TranslationDataset, rows: np.ndarray,
+               state: CorrelationState) -> Tuple[np.ndarray, List[CorrelationCluster]]:
+        """
+        Clusters by size then text, members by text, unclustered rows alphabetically
+
+        Args:
+            dataset: Dataset being correlated
+            rows: Dataset row of every state row
+            state: State whose labels are ordered
+
+        Returns:
+            tuple: (row order of the dataset, clusters with member_indices as state rows)
+        """
+        labels = state.labels
+        clustered = labels >= 0
+        lowered = dataset.normalized.source.get('lowered')[rows].tolist()
+
+        groups = []
+        for members in label_groups(np.where(clustered, labels, -1)):
+            if labels[members[0]] < 0:
+                continue
+            groups.append(sorted(members.tolist(), key=lowered.__getitem__))
+        groups.sort(key=lambda members: (-len(members), lowered[members[0]]))
+
+        clusters = [
+            CorrelationCluster(
+                similarity_score=0.0,
+                cluster_id=int(labels[members[0]]),
+                cluster_type="semantic",
+                member_indices=members,
+                rows=rows[members]
+            )
+            for members in groups
+        ]
+        ClusterMetrics(state.vectors).apply(clusters)
+
+        unclustered = sorted(np.flatnonzero(~clustered).tolist(), key=lowered.__getitem__)
+        order = np.concatenate([cluster.rows for cluster in clusters] + [rows[unclustered]])
+
+        logger.info(f"Incremental correlation ordered {len(rows)} entries into {len(clusters)} clusters")
+        return order.astype(np.int64), clusters
+
+
+def _row_keys(dataset: TranslationDataset, rows) -> List[Tuple[str, str]]:
+    """(str_id, source_text) of the given rows, the key rows are matched to a state by"""
+    rows = np.asarray(rows, dtype=np.int64)
+    return list(zip(
+        dataset.columns['str_id'].to_numpy()[rows].tolist(),
+        dataset.columns['source_text'].to_numpy()[rows].tolist()
+    ))
@@ -2,11 +2,16 @@
 
 import logging
 import time
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
-from ..models.data_models import TranslationDataset, ProcessingResult
+import numpy as np
+
+from ..models.data_models import TranslationDataset, ProcessingResult, CorrelationCluster
 from .deduplicator import Deduplicator, KeepFirstStrategy, KeepBestStrategy, KeepFirstWithOccurrencesStrategy
-from .correlator import StringCorrelator, SemanticCorrelationStrategy, AlphabeticalStrategy, HybridCorrelationStrategy, SubstringCorrelationStrategy, OccurrenceBasedStrategy
+from ..utils.similarity_utils import create_similarity_calculator
+from ..utils.progress_utils import ProgressReporter, ProcessingCancelled
+from .incremental import IncrementalCorrelator, CorrelationState
+from .correlator import attach_clusters, StringCorrelator, SemanticCorrelationStrategy, AlphabeticalStrategy, HybridCorrelationStrategy, SubstringCorrelationStrategy, OccurrenceBasedStrategy, GraphCorrelationStrategy, MinHashCorrelationStrategy
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +27,17 @@ class ProcessingConfig:
         correlation_strategy: str = "hybrid",
         similarity_threshold: float = 0.7,
         max_cluster_size: int = 15,
-        min_substring_length: int = 5
+        min_substring_length: int = 5,
+        similarity_mode: str = "dense",
+        similarity_top_k: int = 20,
+        minhash_threshold: float = 0.5,
+        minhash_bands: int = 20,
+        minhash_rows: int = 3,
+        minhash_shingle_size: int = 3,
+        vectorizer_cache_dir: Optional[str] = None,
+        vectorizer_cache_max_mb: int = 512,
+        vectorizer_backend: str = "tfidf",
+        workers: int = 1
     ):
         self.remove_duplicates = remove_duplicates
         self.deduplication_strategy = deduplication_strategy
@@ -31,6 +46,16 @@ class ProcessingConfig:
         self.similarity_threshold = similarity_threshold
         self.max_cluster_size = max_cluster_size
         self.min_substring_length = min_substring_length
+        self.similarity_mode = similarity_mode
+        self.similarity_top_k = similarity_top_k
+        self.minhash_threshold = minhash_threshold
+        self.minhash_bands = minhash_bands
+        self.minhash_rows = minhash_rows
+        self.minhash_shingle_size = minhash_shingle_size
+        self.vectorizer_cache_dir = vectorizer_cache_dir
+        self.vectorizer_cache_max_mb = vectorizer_cache_max_mb
+        self.vectorizer_backend = vectorizer_backend
+        self.workers = workers
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -40,15 +65,28 @@ class ProcessingConfig:
             'correlation_strategy': self.correlation_strategy,
             'similarity_threshold': self.similarity_threshold,
             'max_cluster_size': self.max_cluster_size,
-            'min_substring_length': self.min_substring_length
+            'min_substring_length': self.min_substring_length,
+            'similarity_mode': self.similarity_mode,
+            'similarity_top_k': self.similarity_top_k,
+            'minhash_threshold': self.minhash_threshold,
+            'minhash_bands': self.minhash_bands,
+            'minhash_rows': self.minhash_rows,
+            'minhash_shingle_size': self.minhash_shingle_size,
+            'vectorizer_cache_dir': self.vectorizer_cache_dir,
+            'vectorizer_cache_max_mb': self.vectorizer_cache_max_mb,
+            'vectorizer_backend': self.vectorizer_backend,
+            'workers': self.workers
         }
 
 
 class TranslationProcessor:
     """Main processor that orchestrates deduplication and correlation sorting"""
     
-    def __init__(self, config: Optional[ProcessingConfig] = None):
+    def __init__(self, config: Optional[ProcessingConfig] = None, workers: Optional[int] = None):
         self.config = config or ProcessingConfig()
+        # Explicit worker count overrides the configured one
+        if workers is not None:
+            self.config.workers = workers
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
         
         # Initialize processors
@@ -66,22 +104,53 @@ class TranslationProcessor:
         
         return Deduplicator(strategy)
     
+    def _create_similarity_calculator(self):
+        """Create similarity calculator, backed by the vectorizer cache when configured"""
+        return create_similarity_calculator(
+            cache_dir=self.config.vectorizer_cache_dir,
+            cache_max_bytes=self.config.vectorizer_cache_max_mb * 1024 * 1024,
+            backend=self.config.vectorizer_backend,
+            workers=self.config.workers
+        )
+    
     def _create_correlator(self) -> StringCorrelator:
         """Create correlator with configured strategy"""
         if self.config.correlation_strategy == "semantic":
             strategy = SemanticCorrelationStrategy(
                 similarity_threshold=self.config.similarity_threshold,
-                max_cluster_size=self.config.max_cluster_size
+                max_cluster_size=self.config.max_cluster_size,
+                similarity_mode=self.config.similarity_mode,
+                top_k=self.config.similarity_top_k,
+                similarity_calc=self._create_similarity_calculator()
             )
         elif self.config.correlation_strategy == "substring":
             strategy = SubstringCorrelationStrategy(
-                min_substring_length=self.config.min_substring_length
+                min_substring_length=self.config.min_substring_length,
+                similarity_calc=self._create_similarity_calculator()
             )
         elif self.config.correlation_strategy == "hybrid":
             strategy = HybridCorrelationStrategy(
                 similarity_threshold=self.config.similarity_threshold,
                 min_substring_length=self.config.min_substring_length,
-                max_cluster_size=self.config.max_cluster_size
+                max_cluster_size=self.config.max_cluster_size,
+                similarity_mode=self.config.similarity_mode,
+                top_k=self.config.similarity_top_k,
+                similarity_calc=self._create_similarity_calculator()
+            )
+        elif self.config.correlation_strategy == "graph":
+            strategy = GraphCorrelationStrategy(
+                similarity_threshold=self.config.similarity_threshold,
+                max_cluster_size=self.config.max_cluster_size,
+                top_k=self.config.similarity_top_k,
+                similarity_calc=self._create_similarity_calculator()
+            )
+        elif self.config.correlation_strategy == "minhash":
+            strategy = MinHashCorrelationStrategy(
+                similarity_threshold=self.config.minhash_threshold,
+                max_cluster_size=self.config.max_cluster_size,
+                num_bands=self.config.minhash_bands,
+                rows_per_band=self.config.minhash_rows,
+                shingle_size=self.config.minhash_shingle_size
             )
         elif self.config.correlation_strategy == "occurrences":
             strategy = OccurrenceBasedStrategy()
@@ -92,9 +161,13 @@ class TranslationProcessor:
         
         return StringCorrelator(strategy)
     
-    def process(self, dataset: TranslationDataset) -> TranslationDataset:
+    def process(self, dataset: TranslationDataset, progress: Optional[ProgressReporter] = None) -> TranslationDataset:
         """
         Main processing pipeline: deduplication + correlation sorting
+        
+        Args:
+            dataset: Input translation dataset
+            progress: Optional ProgressReporter; every stage reports to it and it can cancel the run
         """
         start_time = time.time()
         original_count = len(dataset)
@@ -108,7 +181,7 @@ class TranslationProcessor:
             clusters_found = 0
             
             # DEBUG: Log initial state
-            self.logger.info(f"Initial dataset has {len(processed_dataset.entries)} entries")
+            self.logger.info(f"Initial dataset has {len(processed_dataset)} entries")
             
             # Step 1: Deduplication
             if self.config.remove_duplicates:
@@ -119,7 +192,7 @@ class TranslationProcessor:
                 self.logger.info(f"Before deduplication: {before_dedup} entries")
                 
                 # Apply deduplication
-                processed_dataset = self.deduplicator.process(processed_dataset)
+                processed_dataset = self.deduplicator.process(processed_dataset, progress)
                 
                 after_dedup = len(processed_dataset)
                 duplicates_removed = before_dedup - after_dedup
@@ -136,8 +209,8 @@ class TranslationProcessor:
                     self.logger.warning("3. Data format issue")
                     
                     # Let's check some sample data
-                    if len(processed_dataset.entries) > 0:
-                        sample_entry = processed_dataset.entries[0]
+                    if len(processed_dataset) > 0:
+                        sample_entry = processed_dataset.entry(0)
                         self.logger.warning(f"Sample entry: {sample_entry.str_id} | '{sample_entry.source_text}' | '{sample_entry.target_text}'")
             else:
                 self.logger.info("Step 1: Skipping deduplication (disabled)")
@@ -145,7 +218,7 @@ class TranslationProcessor:
             # Step 2: Correlation Sorting
             if self.config.sort_by_correlation:
                 self.logger.info(f"Step 2: Applying {self.config.correlation_strategy} correlation sorting...")
-                processed_dataset = self.correlator.process(processed_dataset)
+                processed_dataset = self.correlator.process(processed_dataset, progress)
                 if processed_dataset.result and processed_dataset.result.correlation_clusters:
                     clusters_found = len(processed_dataset.result.correlation_clusters)
                 self.logger.info(f"Correlation clusters created: {clusters_found}")
@@ -166,6 +239,9 @@ class TranslationProcessor:
             if processed_dataset.result:
                 result.duplicate_groups = processed_dataset.result.duplicate_groups
                 result.correlation_clusters = processed_dataset.result.correlation_clusters
+                result.kept_indices = processed_dataset.result.kept_indices
+                result.order = processed_dataset.result.order
+                result.cluster_labels = processed_dataset.result.cluster_labels
                 if hasattr(processed_dataset.result, 'substring_matches'):
                     result.substring_matches = processed_dataset.result.substring_matches
             
@@ -179,12 +255,195 @@ class TranslationProcessor:
             
             return processed_dataset
             
+        except ProcessingCancelled:
+            self.logger.info("Processing cancelled")
+            raise
         except Exception as e:
             self.logger.error(f"Processing failed: {str(e)}")
             import traceback
             self.logger.error(f"Full traceback: {traceback.format_exc()}")
             raise
     
+    def process_languages(self, datasets: Dict[str, TranslationDataset],
+                          progress: Optional[ProgressReporter] = None) -> Dict[str, TranslationDataset]:
+        """
+        Process several target languages of the same rows in one run.
+        The source-side work is done once: the normalised source keys are computed for all
+        rows, and correlation sorting runs a single time over every row kept by at least one
+        language. Each language is then deduplicated on its own (EN, target) pairs and gets
+        the shared order and clusters restricted to its kept rows. Strategies whose order
+        depends on per-language data (occurrence sorting) are run once per language instead.
+        
+        Args:
+            datasets: Dataset per target language, all over the same rows (see file_utils.read_datasets)
+            progress: Optional ProgressReporter; every stage reports to it and it can cancel the run
+            
+        Returns:
+            dict: Processed dataset per target language, in the input order
+        """
+        start_time = time.time()
+        languages = list(datasets)
+        if not languages:
+            return {}
+        
+        base = datasets[languages[0]]
+        self.logger.info(f"Starting multi-language processing of {len(base)} entries for {len(languages)} languages")
+        
+        try:
+            # Source keys are normalised once and shared by every language
+            for dataset in datasets.values():
+                if dataset is not base:
+                    dataset.share_source(base)
+            base.normalized.source.compute('stripped', *self.correlator.strategy.text_keys)
+            
+            # Step 1: Deduplication per language, on (EN, target)
+            # The languages run one after another: they share the normalised source keys
+            # computed above, which worker processes would each have to receive or recompute,
+            # and deduplication and the projection in _correlate_shared are vectorised
+            # passes over index arrays. The workers go to the similarity search, which is
+            # run once for all languages and is where the time is spent.
+            deduplicated = {}
+            for language in languages:
+                if self.config.remove_duplicates:
+                    deduplicated[language] = self.deduplicator.process(datasets[language], progress)
+                else:
+                    deduplicated[language] = datasets[language].take(np.arange(len(base)))
+                    deduplicated[language].result = ProcessingResult(
+                        original_count=len(base), final_count=len(base), duplicates_removed=0,
+                        clusters_found=0, processing_time=0.0, kept_indices=np.arange(len(base))
+                    )
+            
+            # Step 2: Correlation sorting, once for all languages when the order only depends on EN
+            if not self.config.sort_by_correlation:
+                processed = deduplicated
+            elif self.correlator.strategy.source_only:
+                processed = self._correlate_shared(base, deduplicated, progress)
+            else:
+                processed = {language: self.correlator.process(dataset, progress)
+                             for language, dataset in deduplicated.items()}
+            
+            processing_time = time.time() - start_time
+            for language in languages:
+                result = processed[language].result
+                result.original_count = len(base)
+                result.final_count = len(processed[language])
+                result.duplicates_removed = len(base) - len(processed[language])
+                result.clusters_found = len(result.correlation_clusters)
+                result.processing_time = processing_time
+            
+            self.logger.info(
+                f"Multi-language processing completed in {processing_time:.2f}s: " +
+                ", ".join(f"{language} {len(base)} → {len(processed[language])}" for language in languages)
+            )
+            return {language: processed[language] for language in languages}
+            
+        except ProcessingCancelled:
+            self.logger.info("Processing cancelled")
+            raise
+        except Exception as e:
+            self.logger.error(f"Multi-language processing failed: {str(e)}")
+            raise
+    
+    def _correlate_shared(self, base: TranslationDataset, deduplicated: Dict[str, TranslationDataset],
+                          progress: Optional[ProgressReporter] = None) -> Dict[str, TranslationDataset]:
+        """Correlate the union of the kept rows once and project the order and clusters onto each language"""
+        # Union of the kept rows: the first language's rows in its order, then rows only other languages kept
+        seen = np.zeros(len(base), dtype=bool)
+        union_parts = []
+        for dataset in deduplicated.values():
+            kept = dataset.result.kept_indices
+            new_rows = kept[~seen[kept]]
+            seen[new_rows] = True
+            union_parts.append(new_rows)
+        union_rows = np.concatenate(union_parts) if union_parts else np.zeros(0, dtype=np.int64)
+        
+        shared = base.take(union_rows)
+        shared.result = ProcessingResult(
+            original_count=len(base), final_count=len(shared), duplicates_removed=0,
+            clusters_found=0, processing_time=0.0
+        )
+        self.logger.info(f"Correlating {len(shared)} rows kept by any of {len(deduplicated)} languages")
+        correlated = self.correlator.process(shared, progress)
+        
+        # Input row of every correlated position, and of every cluster member
+        sorted_rows = union_rows[correlated.result.order]
+        cluster_rows = [sorted_rows[cluster.rows] for cluster in correlated.result.correlation_clusters]
+        
+        processed = {}
+        for language, dataset in deduplicated.items():
+            # Position of every input row in this language's deduplicated dataset
+            kept_position = np.full(len(base), -1, dtype=np.int64)
+            kept_position[dataset.result.kept_indices] = np.arange(len(dataset))
+            
+            order = kept_position[sorted_rows]
+            order = order[order >= 0]
+            result_dataset = dataset.take(order)
+            
+            final_position = np.full(len(base), -1, dtype=np.int64)
+            final_position[dataset.result.kept_indices[order]] = np.arange(len(order))
+            clusters, labels = _project_clusters(result_dataset, correlated.result.correlation_clusters,
+                                                 cluster_rows, final_position)
+            
+            result = dataset.result
+            result.correlation_clusters = clusters
+            result.order = order
+            result.cluster_labels = labels
+            result_dataset.result = result
+            processed[language] = result_dataset
+        
+        return processed
+    
+    def process_incremental(self, dataset: TranslationDataset, state_path: str) -> TranslationDataset:
+        """
+        Deduplicate and correlate a dataset, reusing the correlation state saved at state_path.
+        Only new or changed entries are vectorized and clustered; the first run (no state yet)
+        does a full build. The updated state is written back to state_path.
+        """
+        start_time = time.time()
+        original_count = len(dataset)
+        
+        processed_dataset = dataset
+        duplicates_removed = 0
+        if self.config.remove_duplicates:
+            processed_dataset = self.deduplicator.process(processed_dataset)
+            duplicates_removed = original_count - len(processed_dataset)
+        
+        correlator = IncrementalCorrelator(
+            similarity_threshold=self.config.similarity_threshold,
+            max_cluster_size=self.config.max_cluster_size,
+            top_k=self.config.similarity_top_k,
+            similarity_calc=self._create_similarity_calculator()
+        )
+        state = CorrelationState.load(state_path)
+        if state is None:
+            order, clusters, state = correlator.build(processed_dataset)
+        else:
+            order, clusters, state = correlator.update(processed_dataset, state)
+        state.save(state_path)
+        
+        dedup_result = processed_dataset.result
+        processed_dataset = processed_dataset.take(order)
+        labels = attach_clusters(processed_dataset, order, clusters)
+        result = ProcessingResult(
+            original_count=original_count,
+            final_count=len(order),
+            duplicates_removed=duplicates_removed,
+            clusters_found=len(clusters),
+            processing_time=time.time() - start_time,
+            duplicate_groups=dedup_result.duplicate_groups if dedup_result else [],
+            correlation_clusters=clusters,
+            kept_indices=dedup_result.kept_indices if dedup_result else None,
+            order=order,
+            cluster_labels=labels
+        )
+        processed_dataset.result = result
+        
+        self.logger.info(
+            f"Incremental processing completed in {result.processing_time:.2f}s: "
+            f"{original_count} → {len(processed_dataset)} entries ({len(clusters)} clusters)"
+        )
+        return processed_dataset
+    
     def analyze_dataset(self, dataset: TranslationDataset) -> Dict[str, Any]:
         """Analyze dataset without processing it"""
         self.logger.info(f"Analyzing dataset with {len(dataset)} entries")
@@ -256,6 +515,9 @@ class TranslationProcessor:
                     'cluster_type': cluster.cluster_type,
                     'size': cluster.size,
                     'similarity_score': f"{cluster.similarity_score:.3f}",
+                    'min_similarity': f"{cluster.min_similarity:.3f}" if cluster.min_similarity is not None else "N/A",
+                    'max_similarity': f"{cluster.max_similarity:.3f}" if cluster.max_similarity is not None else "N/A",
+                    'cohesion': f"{cluster.cohesion:.3f}" if cluster.cohesion is not None else "N/A",
                     'sample_texts': sample_texts,
                     'str_ids': [entry.str_id for entry in cluster.entries]
                 })
@@ -319,3 +581,48 @@ def correlate_only(dataset: TranslationDataset, strategy: str = "hybrid", simila
     )
     processor = TranslationProcessor(config)
     return processor.process(dataset)
+
+
+def _project_clusters(dataset: TranslationDataset, clusters: List[CorrelationCluster], cluster_rows: List[np.ndarray],
+                      final_position: np.ndarray):
+    """
+    Restrict clusters found on shared rows to the rows of one language's result
+    
+    Args:
+        dataset: The language's processed dataset
+        clusters: Clusters of the shared correlation run
+        cluster_rows: Input rows of every cluster's members
+        final_position: Position of every input row in dataset (-1 when the language dropped it)
+        
+    Returns:
+        tuple: (clusters with at least two remaining members, cluster id per row of dataset)
+    """
+    labels = np.full(len(dataset), -1, dtype=np.int64)
+    projected = []
+    
+    for cluster, rows in zip(clusters, cluster_rows):
+        positions = final_position[rows]
+        present = positions >= 0
+        if present.sum() < 2:
+            continue
+        
+        positions = positions[present]
+        member_indices = cluster.member_indices
+        if len(member_indices) == len(rows):
+            member_indices = [index for index, keep in zip(member_indices, present.tolist()) if keep]
+        
+        labels[positions] = cluster.cluster_id
+        # Members are rows of the language's dataset, like after a single-language run
+        projected.append(CorrelationCluster(
+            similarity_score=cluster.similarity_score,
+            cluster_id=cluster.cluster_id,
+            cluster_type=cluster.cluster_type,
+            member_indices=member_indices,
+            min_similarity=cluster.min_similarity,
+            max_similarity=cluster.max_similarity,
+            cohesion=cluster.cohesion,
+            rows=positions,
+            dataset=dataset
+        ))
+    
+    return projected, labels
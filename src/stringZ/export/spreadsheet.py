@@ -0,0 +1,240 @@
+import math
+import re
+import zipfile
+from typing import Iterable, Iterator, List, Sequence, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+# Rows converted and written per step; bounds the memory of a stream
+CHUNK_ROWS = 5000
+
+# Excel's limits
+MAX_ROWS = 1048576
+MAX_COLUMNS = 16384
+MAX_SHEET_NAME = 31
+
+# Characters XML 1.0 does not allow (Excel refuses files containing them)
+ILLEGAL_CHARACTERS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+# A sheet: name, header, and an iterable of row chunks (each a list of column value lists)
+Sheet = Tuple[str, Sequence[str], Iterable[List[List]]]
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '{sheets}'
+    '</Types>'
+)
+_SHEET_CONTENT_TYPE = (
+    '<Override PartName="/xl/worksheets/sheet{index}.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets>{sheets}</sheets>'
+    '</workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '{sheets}'
+    '<Relationship Id="rIdStyles" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+# Style 1 is the bold header, like pandas' to_excel
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetData>'
+)
+_SHEET_END = '</sheetData></worksheet>'
+
+
+def stream_xlsx(sheets: Sequence[Sheet], compresslevel: int = 1) -> Iterator[bytes]:
+    """
+    Generate an .xlsx workbook piece by piece, e.g. as the body of an HTTP response.
+    Rows are written as they come in (inline strings, no shared string table), and the
+    zip archive is produced with data descriptors, so nothing is ever seeked or kept
+    whole: memory stays constant with the number of rows and the first bytes are
+    available right away.
+
+    Args:
+        sheets: (name, header, row chunks) per sheet; a chunk is a list of column value
+                lists (str, int, float, bool or None/NaN for an empty cell)
+        compresslevel: Deflate level of the worksheets (1 is fastest)
+
+    Yields:
+        bytes: Consecutive parts of the file
+    """
+    sheets = list(sheets)
+    names = _sheet_names(name for name, _, _ in sheets)
+
+    sink = _Sink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as archive:
+        archive.writestr('[Content_Types].xml', _CONTENT_TYPES.format(sheets=''.join(
+            _SHEET_CONTENT_TYPE.format(index=index) for index in range(1, len(sheets) + 1)
+        )))
+        archive.writestr('_rels/.rels', _ROOT_RELS)
+        archive.writestr('xl/workbook.xml', _WORKBOOK.format(sheets=''.join(
+            f'<sheet name={quoteattr(name)} sheetId="{index}" r:id="rId{index}"/>'
+            for index, name in enumerate(names, 1)
+        )))
+        archive.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS.format(sheets=''.join(
+            f'<Relationship Id="rId{index}" '
+            f'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            f'Target="worksheets/sheet{index}.xml"/>'
+            for index in range(1, len(sheets) + 1)
+        )))
+        archive.writestr('xl/styles.xml', _STYLES)
+        yield from sink.drain()
+
+        for index, (_, header, chunks) in enumerate(sheets, 1):
+            if len(header) > MAX_COLUMNS:
+                raise ValueError(f"{len(header)} columns exceed Excel's limit of {MAX_COLUMNS}")
+            letters = [_column_letter(column) for column in range(len(header))]
+
+            # The size of a worksheet is unknown until it is written: allow it to pass 4 GiB
+            with archive.open(f'xl/worksheets/sheet{index}.xml', 'w', force_zip64=True) as member:
+                member.write(_SHEET_START.encode('utf-8'))
+                member.write(_header_row(header, letters).encode('utf-8'))
+                row = 1
+                for columns in chunks:
+                    rows = len(columns[0]) if columns else 0
+                    if row + rows > MAX_ROWS:
+                        raise ValueError(f"More than {MAX_ROWS - 1} rows do not fit in an Excel sheet")
+                    member.write(_rows(columns, letters, row + 1).encode('utf-8'))
+                    row += rows
+                    yield from sink.drain()
+                member.write(_SHEET_END.encode('utf-8'))
+            yield from sink.drain()
+
+    # Central directory
+    yield from sink.drain()
+
+
+def _header_row(header: Sequence[str], letters: List[str]) -> str:
+    cells = ''.join(
+        f'<c r="{letter}1" s="1" t="inlineStr"><is><t xml:space="preserve">{_text(str(name))}</t></is></c>'
+        for letter, name in zip(letters, header)
+    )
+    return f'<row r="1">{cells}</row>'
+
+
+def _rows(columns: List[List], letters: List[str], first_row: int) -> str:
+    """XML of consecutive rows given column-wise"""
+    parts = []
+    for offset, values in enumerate(zip(*columns)):
+        number = first_row + offset
+        parts.append(f'<row r="{number}">')
+        for letter, value in zip(letters, values):
+            cell = _cell(value)
+            if cell:
+                parts.append(f'<c r="{letter}{number}"{cell}</c>')
+        parts.append('</row>')
+    return ''.join(parts)
+
+
+def _cell(value) -> str:
+    """Type attribute and content of a cell ('' for an empty cell)"""
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return f' t="inlineStr"><is><t xml:space="preserve">{_text(value)}</t></is>'
+    if isinstance(value, bool):
+        return f' t="b"><v>{int(value)}</v>'
+    if isinstance(value, int):
+        return f'><v>{value}</v>'
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            # NaN is pandas' missing value; Excel has no infinities either
+            return ''
+        return f'><v>{int(value) if value.is_integer() and abs(value) < 2 ** 53 else repr(value)}</v>'
+    return f' t="inlineStr"><is><t xml:space="preserve">{_text(str(value))}</t></is>'
+
+
+def _text(value: str) -> str:
+    return escape(ILLEGAL_CHARACTERS.sub('', value))
+
+
+def _column_letter(index: int) -> str:
+    """Excel column name of a 0-based column index (0 -> A, 26 -> AA)"""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _sheet_name(name) -> str:
+    """Valid sheet name (at most 31 characters, no []:*?/\\)"""
+    return re.sub(r'[\[\]:*?/\\]', '_', str(name))[:MAX_SHEET_NAME] or "Sheet"
+
+
+def _sheet_names(names) -> List[str]:
+    """Valid, distinct sheet names: Excel compares them case-insensitively, and names
+    cut to 31 characters may collide, so repeats get a " (2)", " (3)"... suffix"""
+    unique = []
+    used = set()
+    for name in map(_sheet_name, names):
+        candidate = name
+        number = 1
+        while candidate.casefold() in used:
+            number += 1
+            suffix = f" ({number})"
+            candidate = name[:MAX_SHEET_NAME - len(suffix)] + suffix
+        used.add(candidate.casefold())
+        unique.append(candidate)
+    return unique
+
+
+class _Sink:
+    """Write-only, unseekable file object collecting what ZipFile writes until drained"""
+
+    def __init__(self):
+        self._parts = []
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> Iterator[bytes]:
+        """Yield what was written since the last drain (nothing when nothing was)"""
+        if self._parts:
+            data = b''.join(self._parts)
+            self._parts.clear()
+            yield data
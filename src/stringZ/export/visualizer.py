@@ -1,49 +1,118 @@
+import base64
 import html
+import io
+import json
 import re
+import zlib
+from functools import lru_cache
 from pathlib import Path
 import pandas as pd
 
-def load_template():
-    template_path = Path(__file__).parent / "templates" / "visualizer_template.html"
+# Rows serialised per chunk of the streamed data arrays
+CHUNK_ROWS = 5000
+
+# Template placeholders, e.g. {{TITLE}}
+PLACEHOLDER_PATTERN = re.compile(r'(\{\{[A-Z_]+\}\})')
+
+# Color tags: <color="#eadca2">text</color> -> <span style="color: #eadca2;">text</span>
+COLOR_PATTERN = re.compile(r'<color[=]?"([^">]+)"?>([^<]*)</color>')
+
+# The inline script of the template, replaced by the compact script in compact mode
+DATA_SCRIPT_PATTERN = re.compile(r'<script>\n.*?</script>', re.DOTALL)
+
+# Compressed bytes base64-encoded at a time (a multiple of 3, so the parts concatenate)
+BASE64_BLOCK = 3 * 64 * 1024
+
+_ENCODER = json.JSONEncoder(ensure_ascii=False)
+
+def load_template(name="visualizer_template.html"):
+    template_path = Path(__file__).parent / "templates" / name
     with open(template_path, 'r', encoding='utf-8') as f:
         return f.read()
 
+@lru_cache(maxsize=2)
+def _template_segments(compact=False):
+    """The template split into literal text (even positions) and placeholders (odd positions)"""
+    template = load_template()
+    if compact:
+        # Same page, with the script that decompresses and renders the payload
+        script = load_template("visualizer_compact_script.html")
+        template = DATA_SCRIPT_PATTERN.sub(lambda match: script.rstrip('\n'), template, count=1)
+    return tuple(PLACEHOLDER_PATTERN.split(template))
+
 def format_text_for_visualizer(text):
     """
     Format text for visualizer display - converts game markup to HTML
-    
+
     Args:
         text: str - original text with game markup
-    
+
     Returns:
         tuple: (raw_text, formatted_text)
     """
     if not text or pd.isna(text) or text == 'nan':
         return '', ''
-    
+
     text = str(text)
-    
+
     # RAW DATA: HTML encode everything for debugging view
     raw_text = html.escape(text)
-    
+
     # FORMATTED DATA: Convert game markup to proper HTML
     formatted_text = text
-    
+
     # Convert color tags: <color="#eadca2">text</color> -> <span style="color: #eadca2;">text</span>
-    color_pattern = r'<color[=]?"([^">]+)"?>([^<]*)</color>'
-    formatted_text = re.sub(color_pattern, r'<span style="color: \1;">\2</span>', formatted_text)
-    
+    formatted_text = COLOR_PATTERN.sub(r'<span style="color: \1;">\2</span>', formatted_text)
+
     # Convert line breaks: \\n -> <br>
     formatted_text = formatted_text.replace('\\n', '<br>')
-    
+
     # Convert other common patterns
     formatted_text = formatted_text.replace('\\t', '&nbsp;&nbsp;&nbsp;&nbsp;')  # tabs to spaces
-    
+
     return raw_text, formatted_text
 
-def generate_visualizer_html(dataset, original_filename=None):
-    template = load_template()
+def generate_visualizer_html(dataset, original_filename=None, compact=False):
+    """The Visualizer HTML of a dataset as one string (see iter_visualizer_html)"""
+    output = io.StringIO()
+    write_visualizer_html(dataset, output, original_filename, compact)
+    return output.getvalue()
+
+def write_visualizer_html(dataset, output, original_filename=None, compact=False):
+    """
+    Write the Visualizer HTML of a dataset piece by piece
+
+    Args:
+        dataset: Processed TranslationDataset
+        output: File path, or text stream to write to
+        original_filename: Name of the uploaded file
+        compact: Embed the compressed payload instead of the data arrays
+    """
+    if isinstance(output, (str, Path)):
+        with open(output, 'w', encoding='utf-8') as f:
+            write_visualizer_html(dataset, f, original_filename, compact)
+        return
+    for part in iter_visualizer_html(dataset, original_filename, compact):
+        output.write(part)
 
+def iter_visualizer_html(dataset, original_filename=None, compact=False):
+    """
+    Generate the Visualizer HTML of a dataset as consecutive parts: the template
+    segments between the placeholders, and the data arrays in chunks of rows.
+
+    The compact document embeds the data once instead: the distinct texts and, per
+    row, the indexes of its strId, source and target texts, as gzip-compressed,
+    base64-encoded JSON. The page decompresses it with DecompressionStream and
+    formats (or escapes) a text only when a table page shows it.
+
+    Args:
+        dataset: Processed TranslationDataset
+        original_filename: Name of the uploaded file
+        compact: Embed the compressed payload instead of the data arrays
+
+    Yields:
+        str: Parts of the document
+    """
     # Extract data from the dataset
     df = dataset.to_dataframe()
     target_lang = dataset.target_lang or "Target"
@@ -51,7 +120,7 @@ def generate_visualizer_html(dataset, original_filename=None):
     # Words count
     target_word_count = 0
     if target_lang in df.columns:
-        target_word_count = df[target_lang].dropna().astype(str).apply(lambda x: len(x.split())).sum()
+        target_word_count = int(df[target_lang].dropna().astype(str).str.split().str.len().sum())
 
     # Generate title for the Visualizer
     if original_filename:
@@ -63,83 +132,122 @@ def generate_visualizer_html(dataset, original_filename=None):
 
     # Headers and Data from the Spreadsheet
     headers = ["strId", dataset.source_lang, target_lang, "Occurrences", "State", "Notes"]
-    raw_data_rows, formatted_data_rows = _prepare_data_rows(df, dataset, target_lang)
-
-    # Convert to JS arrays to be properly injected in the HTML template
-    headers_js = '[' + ', '.join(f'"{h}"' for h in headers) + ']'
-    raw_data_js = _python_list_to_js_array(raw_data_rows)
-    formatted_data_js = _python_list_to_js_array(formatted_data_rows)
-
-    # Replace all placeholders in the Visualizer template
-    replacements = {
-        '{{TITLE}}': html.escape(title),
-        '{{HEADERS_JS}}': headers_js,
-        '{{RAW_DATA_JS}}': raw_data_js,
-        '{{FORMATTED_DATA_JS}}': formatted_data_js,
-        '{{ENTRY_COUNT}}': str(len(df)),
-        '{{SOURCE_LANG}}': dataset.source_lang,
-        '{{TARGET_LANG}}': target_lang,
-        '{{WORD_COUNT}}': f"{target_word_count:,}",
-        '{{CLEAN_TITLE}}': html.escape(title.replace(' ', '_'))
+    if compact:
+        raw_data_rows = formatted_data_rows = None
+    else:
+        raw_data_rows, formatted_data_rows = _prepare_data_rows(df, dataset, target_lang)
+
+    # Values of the placeholders in the Visualizer template; the data arrays are generators
+    values = {
+        '{{TITLE}}': lambda: html.escape(title),
+        '{{HEADERS_JS}}': lambda: _js_value(headers),
+        '{{RAW_DATA_JS}}': lambda: _js_array(raw_data_rows),
+        '{{FORMATTED_DATA_JS}}': lambda: _js_array(formatted_data_rows),
+        '{{PAYLOAD}}': lambda: _compact_payload(df, dataset, target_lang),
+        '{{ENTRY_COUNT}}': lambda: str(len(df)),
+        '{{SOURCE_LANG}}': lambda: dataset.source_lang,
+        '{{TARGET_LANG}}': lambda: target_lang,
+        '{{WORD_COUNT}}': lambda: f"{target_word_count:,}",
+        '{{CLEAN_TITLE}}': lambda: html.escape(title.replace(' ', '_'))
     }
 
-    result = template
-    for placeholder, value in replacements.items():
-        result = result.replace(placeholder, value)
-    return result
+    for position, segment in enumerate(_template_segments(compact)):
+        if position % 2 == 0 or segment not in values:
+            yield segment
+            continue
+        value = values[segment]()
+        if isinstance(value, str):
+            yield value
+        else:
+            yield from value
 
 def _prepare_data_rows(df, dataset, target_lang):
-    """Prepare raw and formatted data rows for the visualizer"""
-    raw_data_rows = []
-    formatted_data_rows = []
-
-    # DEBUG
-    print("DataFrame columns:", df.columns.tolist())
-    
-    for idx, (_,row) in enumerate(df.iterrows()):
-        # Extract values
-        str_id = str(row.get('strId', ''))
-        en_text = str(row.get(dataset.source_lang, ''))
-        target_text = str(row.get(target_lang, '')) if target_lang in df.columns else ''
-
-        # DEBUG occurrences
-        occurrences_raw = row.get('Occurrences')
-        print(f"Row {idx}: Occurrences raw = {occurrences_raw}, type = {type(occurrences_raw)}")
-        # occurrences = int(row.get('Occurrences', 1))
-        occurrences = int(occurrences_raw) if occurrences_raw is not None else 1
-        
-        # Format text for both views
-        raw_en, formatted_en = format_text_for_visualizer(en_text)
-        raw_target, formatted_target = format_text_for_visualizer(target_text)
-        
-        # Create data rows
-        raw_row = [str_id, raw_en, raw_target, str(occurrences), "", ""]
-        formatted_row = [
-            html.escape(str_id),
-            formatted_en,
-            formatted_target,
-            str(occurrences),
-            "",
-            ""
-        ]
-        
-        raw_data_rows.append(raw_row)
-        formatted_data_rows.append(formatted_row)
-    
-    return raw_data_rows, formatted_data_rows
-
-def _python_list_to_js_array(data_rows):
-    """Convert Python list to JavaScript array format"""
-    js_rows = []
-    for row in data_rows:
-        escaped_row = []
-        for item in row:
-            if isinstance(item, str):
-                # Escape for JavaScript
-                escaped = item.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
-                escaped_row.append(f'"{escaped}"')
-            else:
-                escaped_row.append(f'"{str(item)}"')
-        js_rows.append('[' + ', '.join(escaped_row) + ']')
-    
-    return '[' + ', '.join(js_rows) + ']'
+    """Prepare raw and formatted data columns for the visualizer (rows are built while serialising)"""
+    num_rows = len(df)
+    str_ids = _text_column(df, 'strId', num_rows)
+    raw_en, formatted_en = _format_column(_text_column(df, dataset.source_lang, num_rows))
+    raw_target, formatted_target = _format_column(_text_column(df, target_lang, num_rows))
+
+    if 'Occurrences' in df.columns:
+        occurrences = pd.to_numeric(df['Occurrences']).fillna(1).astype('int64').astype(str).tolist()
+    else:
+        occurrences = ['1'] * num_rows
+
+    empty = [''] * num_rows
+    raw_columns = [str_ids, raw_en, raw_target, occurrences, empty, empty]
+    formatted_columns = [[html.escape(str_id) for str_id in str_ids], formatted_en, formatted_target,
+                         occurrences, empty, empty]
+    return raw_columns, formatted_columns
+
+def _compact_payload(df, dataset, target_lang):
+    """Base64 of the gzip-compressed JSON payload of the compact Visualizer, in parts"""
+    num_rows = len(df)
+    # Texts the Visualizer shows as empty are stored as ''
+    columns = [
+        _text_column(df, 'strId', num_rows),
+        [text if text and text != 'nan' else '' for text in _text_column(df, dataset.source_lang, num_rows)],
+        [text if text and text != 'nan' else '' for text in _text_column(df, target_lang, num_rows)]
+    ]
+    codes, texts = pd.factorize(pd.Series([text for column in columns for text in column], dtype=object))
+
+    if 'Occurrences' in df.columns:
+        occurrences = pd.to_numeric(df['Occurrences']).fillna(1).astype('int64').tolist()
+    else:
+        occurrences = [1] * num_rows
+
+    codes = codes.tolist()
+    rows = {
+        'strId': codes[:num_rows],
+        'source': codes[num_rows:2 * num_rows],
+        'target': codes[2 * num_rows:],
+        'occurrences': occurrences
+    }
+
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # gzip container, what DecompressionStream reads
+    pending = b''
+    for part in _json_parts(texts.tolist(), rows):
+        pending += compressor.compress(part.encode('utf-8'))
+        if len(pending) >= BASE64_BLOCK:
+            cut = len(pending) - len(pending) % 3
+            yield base64.b64encode(pending[:cut]).decode('ascii')
+            pending = pending[cut:]
+    yield base64.b64encode(pending + compressor.flush()).decode('ascii')
+
+def _json_parts(texts, rows):
+    """JSON of {"texts": [...], "rows": {...}}, with the texts serialised in chunks"""
+    yield '{"texts": ['
+    for start in range(0, len(texts), CHUNK_ROWS):
+        if start:
+            yield ', '
+        yield _ENCODER.encode(texts[start:start + CHUNK_ROWS])[1:-1]
+    yield '], "rows": '
+    yield _ENCODER.encode(rows)
+    yield '}'
+
+def _text_column(df, name, num_rows):
+    """Column as a list of strings ('' for a missing column)"""
+    if name not in df.columns:
+        return [''] * num_rows
+    return [value if isinstance(value, str) else str(value) for value in df[name].tolist()]
+
+def _format_column(texts):
+    """format_text_for_visualizer over a column, once per distinct text"""
+    codes, uniques = pd.factorize(pd.Series(texts, dtype=object), use_na_sentinel=False)
+    formatted = [format_text_for_visualizer(text) for text in uniques]
+    raw = [formatted[code][0] for code in codes]
+    return raw, [formatted[code][1] for code in codes]
+
+def _js_value(value):
+    """JSON literal that is safe inside a <script> element"""
+    return _ENCODER.encode(value).replace('</', '<\\/')
+
+def _js_array(columns):
+    """JavaScript array of the rows of columns, serialised CHUNK_ROWS rows at a time"""
+    num_rows = len(columns[0])
+    yield '['
+    for start in range(0, num_rows, CHUNK_ROWS):
+        rows = list(zip(*(column[start:start + CHUNK_ROWS] for column in columns)))
+        if start:
+            yield ', '
+        yield _js_value(rows)[1:-1]
+    yield ']'
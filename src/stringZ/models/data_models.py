@@ -1,49 +1,170 @@
 # src/zstringalign/models/data_models.py
 
+import sys
 from dataclasses import dataclass, field
-from typing import List, Optional 
+from typing import List, Optional, Sequence
+import numpy as np
 import pandas as pd
 
+from ..utils.text_utils import clean_text, NormalizedColumn, NormalizedTexts
 
-@dataclass
+
+@dataclass(slots=True)
 class TranslationEntry:
-    """Single translation string with metadata"""
+    """Single translation string with metadata.
+    Slotted to keep the per-entry footprint small; ids and language codes are interned.
+    The normalised forms of the source text used as dedup, matching and sort keys are
+    computed on first use and cached until source_text is replaced."""
     str_id: str
     source_text: str
     target_text: Optional[str] = None
     source_lang: str = "EN"
     target_lang: Optional[str] = None
     occurrences: int = 1
+    # [source_text, stripped, lowered, match key, cleaned], allocated on first key access
+    _keys: Optional[list] = field(default=None, init=False, repr=False, compare=False)
     
     def __post_init__(self):
         # Clean data
         self.source_text = str(self.source_text) if self.source_text else ""
         self.target_text = str(self.target_text) if self.target_text else None
+        self.str_id = sys.intern(str(self.str_id))
+        if self.source_lang is not None:
+            self.source_lang = sys.intern(str(self.source_lang))
+        if self.target_lang is not None:
+            self.target_lang = sys.intern(str(self.target_lang))
+    
+    @property
+    def stripped_source(self) -> str:
+        """Source text without surrounding whitespace (deduplication key)"""
+        keys = self._keys
+        if keys is None or keys[0] is not self.source_text:
+            keys = self._current_keys()
+        value = keys[1]
+        if value is None:
+            value = keys[1] = self.source_text.strip()
+        return value
+    
+    @property
+    def lowered_source(self) -> str:
+        """Lowercased source text (alphabetical sort key)"""
+        keys = self._keys
+        if keys is None or keys[0] is not self.source_text:
+            keys = self._current_keys()
+        value = keys[2]
+        if value is None:
+            value = keys[2] = self.source_text.lower()
+        return value
+    
+    @property
+    def match_key(self) -> str:
+        """Stripped, lowercased source text (substring matching key)"""
+        keys = self._keys
+        if keys is None or keys[0] is not self.source_text:
+            keys = self._current_keys()
+        value = keys[3]
+        if value is None:
+            stripped = self.stripped_source
+            # Most texts have no surrounding whitespace and share the lowercased string
+            value = keys[3] = self.lowered_source if stripped is self.source_text else stripped.lower()
+        return value
+    
+    @property
+    def cleaned_source(self) -> str:
+        """Source text with markup removed and whitespace collapsed (vectorizer input)"""
+        keys = self._keys
+        if keys is None or keys[0] is not self.source_text:
+            keys = self._current_keys()
+        value = keys[4]
+        if value is None:
+            value = keys[4] = clean_text(self.source_text)
+        return value
+    
+    def _current_keys(self) -> list:
+        # Cached keys are dropped when they belong to an older source text
+        self._keys = [self.source_text, None, None, None, None]
+        return self._keys
 
 
-@dataclass
 class DuplicateGroup:
-    """Group of duplicate entries"""
-    source_text: str
-    entries: List[TranslationEntry]
-    kept_entry: Optional[TranslationEntry] = None
+    """Group of duplicate entries.
+    Either holds the entries directly, or the row indices of a dataset whose entry
+    views are only built when `entries` is first read."""
+    
+    def __init__(
+        self,
+        source_text: str,
+        entries: Optional[List[TranslationEntry]] = None,
+        kept_entry: Optional[TranslationEntry] = None,
+        rows: Optional[np.ndarray] = None,
+        dataset: Optional["TranslationDataset"] = None
+    ):
+        self.source_text = source_text
+        self.kept_entry = kept_entry
+        self.rows = rows
+        self.dataset = dataset
+        self._entries = entries
+    
+    @property
+    def entries(self) -> List[TranslationEntry]:
+        if self._entries is None:
+            self._entries = self.dataset.entries_at(self.rows) if self.dataset is not None else []
+        return self._entries
     
     @property
     def count(self) -> int:
+        if self._entries is None and self.rows is not None:
+            return len(self.rows)
         return len(self.entries)
+    
+    def __repr__(self) -> str:
+        return f"DuplicateGroup(source_text={self.source_text!r}, count={self.count})"
 
 
-@dataclass
 class CorrelationCluster:
-    """Cluster of correlated/similar strings"""
-    entries: List[TranslationEntry]
-    similarity_score: float
-    cluster_id: int
-    cluster_type: str = "semantic"  # "semantic", "substring", "alphabetical"
+    """Cluster of correlated/similar strings.
+    Either holds the entries directly, or the row indices of a dataset whose entry
+    views are only built when `entries` is first read."""
+    
+    def __init__(
+        self,
+        entries: Optional[List[TranslationEntry]] = None,
+        similarity_score: float = 0.0,
+        cluster_id: int = 0,
+        cluster_type: str = "semantic",  # "semantic", "substring", "near_duplicate"
+        member_indices: Optional[List[int]] = None,  # Rows of the vectors the cluster was scored on
+        min_similarity: Optional[float] = None,
+        max_similarity: Optional[float] = None,
+        cohesion: Optional[float] = None,
+        rows: Optional[np.ndarray] = None,
+        dataset: Optional["TranslationDataset"] = None
+    ):
+        self.similarity_score = similarity_score
+        self.cluster_id = cluster_id
+        self.cluster_type = cluster_type
+        self.member_indices = member_indices if member_indices is not None else []
+        self.min_similarity = min_similarity
+        self.max_similarity = max_similarity
+        self.cohesion = cohesion
+        self.rows = rows
+        self.dataset = dataset
+        self._entries = entries
+    
+    @property
+    def entries(self) -> List[TranslationEntry]:
+        if self._entries is None:
+            self._entries = self.dataset.entries_at(self.rows) if self.dataset is not None else []
+        return self._entries
     
     @property
     def size(self) -> int:
+        if self._entries is None and self.rows is not None:
+            return len(self.rows)
         return len(self.entries)
+    
+    def __repr__(self) -> str:
+        return (f"CorrelationCluster(cluster_id={self.cluster_id}, cluster_type={self.cluster_type!r}, "
+                f"size={self.size}, similarity_score={self.similarity_score:.3f})")
 
 
 @dataclass
@@ -56,15 +177,192 @@ class ProcessingResult:
     processing_time: float
     duplicate_groups: List[DuplicateGroup] = field(default_factory=list)
     correlation_clusters: List[CorrelationCluster] = field(default_factory=list)
+    kept_indices: Optional[np.ndarray] = None  # Rows of the input kept by deduplication
+    order: Optional[np.ndarray] = None  # Permutation applied by correlation sorting
+    cluster_labels: Optional[np.ndarray] = None  # Cluster id per final row (-1 when unclustered)
 
 
-@dataclass
 class TranslationDataset:
-    """Main container for translation data"""
-    entries: List[TranslationEntry] = field(default_factory=list)
-    source_lang: str = "EN"
-    target_lang: Optional[str] = None
-    result: Optional[ProcessingResult] = None
+    """Main container for translation data.
+    Rows are stored column-wise in a DataFrame (interned string ids, object text
+    columns, categorical language columns) so stages can select and reorder rows
+    with index arrays. `entries` gives TranslationEntry views of the rows for
+    existing callers; they are built on first access and shared by take().
+    `normalized` holds the normalised text variants shared by all stages."""
+    
+    COLUMNS = ['str_id', 'source_text', 'target_text', 'source_lang', 'target_lang', 'occurrences']
+    
+    def __init__(
+        self,
+        entries: Optional[List[TranslationEntry]] = None,
+        source_lang: str = "EN",
+        target_lang: Optional[str] = None,
+        result: Optional[ProcessingResult] = None,
+        columns: Optional[pd.DataFrame] = None
+    ):
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        self.result = result
+        
+        self._normalized = None
+        if columns is not None:
+            self.columns = columns.reset_index(drop=True)
+            self._entries = None
+        else:
+            self.entries = entries if entries is not None else []
+    
+    @classmethod
+    def from_columns(
+        cls,
+        str_ids: Sequence,
+        source_texts: Sequence,
+        target_texts: Optional[Sequence] = None,
+        source_lang: str = "EN",
+        target_lang: Optional[str] = None,
+        occurrences: Optional[Sequence] = None
+    ) -> "TranslationDataset":
+        """
+        Create a dataset directly from column arrays (no entry objects are built)
+        
+        Args:
+            str_ids: String ids
+            source_texts: Source texts (missing values become "")
+            target_texts: Optional target texts (missing or empty values become None)
+            source_lang: Source language of every row
+            target_lang: Target language of every row
+            occurrences: Optional occurrence counts (default 1)
+        """
+        n = len(str_ids)
+        source = pd.Series(source_texts, dtype=object)
+        source = source.where(source.notna() & (source != ""), "").astype(str)
+        
+        columns = pd.DataFrame({
+            'str_id': _object_column(_intern_strings(str_ids)),
+            'source_text': _object_column(_share_strings(source)),
+            'target_text': _target_column(target_texts, n),
+            'source_lang': pd.Categorical([source_lang] * n),
+            'target_lang': pd.Categorical([target_lang] * n),
+            'occurrences': np.ones(n, dtype=np.int64) if occurrences is None else np.asarray(occurrences, dtype=np.int64)
+        })
+        return cls(source_lang=source_lang, target_lang=target_lang, columns=columns)
+    
+    def with_target(self, target_texts: Optional[Sequence], target_lang: Optional[str]) -> "TranslationDataset":
+        """
+        Dataset over the same rows with another target language column
+        
+        Args:
+            target_texts: Target texts, one per row (missing or empty values become None)
+            target_lang: Target language of the new column
+            
+        Returns:
+            TranslationDataset sharing this dataset's ids, source texts and normalised source variants
+        """
+        columns = self.columns.assign(
+            target_text=_target_column(target_texts, len(self)),
+            target_lang=pd.Categorical([target_lang] * len(self))
+        )
+        dataset = TranslationDataset(source_lang=self.source_lang, target_lang=target_lang, columns=columns)
+        dataset.share_source(self)
+        return dataset
+    
+    def share_source(self, other: "TranslationDataset") -> None:
+        """
+        Use the normalised source variants of another dataset over the same rows, so
+        variants computed through either dataset are computed once for both
+        
+        Args:
+            other: Dataset with the same source texts in the same order
+        """
+        if len(other) != len(self):
+            raise ValueError(f"Cannot share source texts of {len(other)} rows with {len(self)} rows")
+        
+        target = self._normalized.target if self._normalized is not None else NormalizedColumn(
+            self.columns['target_text'].to_numpy()
+        )
+        self._normalized = NormalizedTexts(other.normalized.source, target)
+    
+    @property
+    def entries(self) -> List[TranslationEntry]:
+        """TranslationEntry views of the rows, built once on first access"""
+        if self._entries is None:
+            self._entries = self._build_entries(self.columns)
+        return self._entries
+    
+    @entries.setter
+    def entries(self, entries: List[TranslationEntry]) -> None:
+        self._entries = list(entries)
+        self.columns = self._entries_to_columns(self._entries)
+        self._normalized = None
+    
+    @property
+    def normalized(self) -> NormalizedTexts:
+        """Normalised source/target text variants, each computed once for all rows on first use"""
+        if self._normalized is None:
+            self._normalized = NormalizedTexts.from_columns(
+                self.columns['source_text'].to_numpy(), self.columns['target_text'].to_numpy()
+            )
+        return self._normalized
+    
+    def prepare_text_keys(self, variants=('stripped', 'lowered', 'folded', 'cleaned')) -> None:
+        """
+        Compute normalised source variants for all rows at once and hand them to the
+        entry views, so per-entry keys (lowered_source, cleaned_source, ...) are lookups
+        
+        Args:
+            variants: NormalizedColumn variants the caller is going to use
+        """
+        source = self.normalized.source.compute(*variants)
+        keys = [
+            source.computed(variant)
+            for variant in ('stripped', 'lowered', 'folded', 'cleaned')
+        ]
+        keys = [values.tolist() if values is not None else [None] * len(self) for values in keys]
+        
+        for entry, stripped, lowered, folded, cleaned in zip(self.entries, *keys):
+            entry._keys = [entry.source_text, stripped, lowered, folded, cleaned]
+    
+    def entry(self, index: int) -> TranslationEntry:
+        """View of a single row (without building views for every row)"""
+        return self.entries_at([index])[0]
+    
+    def entries_at(self, indices) -> List[TranslationEntry]:
+        """Views of the given rows (without building views for every row)"""
+        if self._entries is not None:
+            return [self._entries[i] for i in indices]
+        return self._build_entries(self.columns.take(np.asarray(indices, dtype=np.int64)))
+    
+    def take(self, indices, occurrences: Optional[np.ndarray] = None) -> "TranslationDataset":
+        """
+        New dataset with the given rows, in the given order
+        
+        Args:
+            indices: Row positions (index or permutation array)
+            occurrences: Optional new occurrence counts for the selected rows
+            
+        Returns:
+            TranslationDataset sharing this dataset's strings (and entry views, if built)
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        columns = self.columns.take(indices)
+        
+        if occurrences is not None:
+            columns = columns.assign(occurrences=np.asarray(occurrences, dtype=np.int64))
+        
+        dataset = TranslationDataset(
+            source_lang=self.source_lang,
+            target_lang=self.target_lang,
+            columns=columns
+        )
+        
+        # Texts are unchanged, so are their normalised variants
+        if self._normalized is not None:
+            dataset._normalized = self._normalized.take(indices)
+        
+        # Unchanged rows keep their existing views, so entry identities survive reordering
+        if self._entries is not None and occurrences is None:
+            dataset._entries = [self._entries[i] for i in indices.tolist()]
+        
+        return dataset
     
     @classmethod
     def from_dataframe(
@@ -83,83 +381,152 @@ class TranslationDataset:
             if possible_targets:
                 target_col = possible_targets[0]
         
-        entries = []
-        for _, row in df.iterrows():
-            if pd.notna(row[str_id_col]) and pd.notna(row[source_col]):
-                # CHECK FOR OCCURRENCES COLUMN PLEASEEEEEE
-                occurrences = 1
-                if 'Occurrences' in df.columns and pd.notna(row['Occurrences']):
-                    occurrences = int(row['Occurrences'])
-
-                entry = TranslationEntry(
-                    str_id=str(row[str_id_col]),
-                    source_text=str(row[source_col]),
-                    target_text=str(row[target_col]) if target_col and pd.notna(row[target_col]) else None,
-                    source_lang=source_col,
-                    target_lang=target_col,
-                    occurrences=occurrences
-                )
-                entries.append(entry)
-        
-        return cls(
-            entries=entries,
+        # Rows need both an id and a source text
+        rows = df[df[str_id_col].notna() & df[source_col].notna()]
+        
+        target_texts = None
+        if target_col:
+            target = rows[target_col]
+            target_texts = target.astype(str).where(target.notna(), None)
+        
+        # CHECK FOR OCCURRENCES COLUMN PLEASEEEEEE
+        occurrences = None
+        if 'Occurrences' in rows.columns:
+            occurrences = pd.to_numeric(rows['Occurrences']).fillna(1).astype(np.int64)
+        
+        return cls.from_columns(
+            str_ids=rows[str_id_col].astype(str).to_numpy(dtype=object),
+            source_texts=rows[source_col].astype(str).to_numpy(dtype=object),
+            target_texts=None if target_texts is None else target_texts.to_numpy(dtype=object),
             source_lang=source_col,
-            target_lang=target_col
+            target_lang=target_col,
+            occurrences=None if occurrences is None else occurrences.to_numpy()
         )
-    
+
     def to_dataframe(self) -> pd.DataFrame:
-        """Convert back to pandas DataFrame"""
-        data = []
-        for entry in self.entries:
-            row = {
-                'strId': entry.str_id,
-                entry.source_lang: entry.source_text,
-            }
-            if entry.target_lang and entry.target_text:
-                row[entry.target_lang] = entry.target_text
+        """Convert back to pandas DataFrame (strId, source language, target language, Occurrences)"""
+        if len(self) == 0:
+            return pd.DataFrame()
         
-            # ADD THIS LINE TO YOUR ACTUAL FILE:
-            row['Occurrences'] = getattr(entry, 'occurrences', 1)
+        columns = self.columns
+        data = {'strId': columns['str_id']}
         
-            data.append(row)
-    
-        df = pd.DataFrame(data)
-    
-        # ADD THIS SORTING TO YOUR ACTUAL FILE:
-        # if 'Occurrences' in df.columns:
-        #     df = df.sort_values('Occurrences', ascending=False).reset_index(drop=True)
-    
-        return df    
+        # One text column per language, normally a single source and a single target language
+        for lang in columns['source_lang'].dropna().unique().tolist():
+            data[lang] = columns['source_text'].where(columns['source_lang'] == lang)
+        
+        has_target = columns['target_text'].notna() & columns['target_lang'].notna()
+        for lang in columns.loc[has_target, 'target_lang'].unique().tolist():
+            data[lang] = columns['target_text'].where(has_target & (columns['target_lang'] == lang))
+        
+        data['Occurrences'] = columns['occurrences']
+        return pd.DataFrame(data)
 
     def get_duplicates(self) -> List[DuplicateGroup]:
         """Find groups of entries with duplicate source text"""
-        text_groups = {}
-        
-        for entry in self.entries:
-            if entry.source_text in text_groups:
-                text_groups[entry.source_text].append(entry)
-            else:
-                text_groups[entry.source_text] = [entry]
+        codes, texts = pd.factorize(self.columns['source_text'])
+        if len(codes) == 0:
+            return []
         
-        # Return only groups with duplicates
-        duplicate_groups = []
-        for source_text, entries in text_groups.items():
-            if len(entries) > 1:
-                duplicate_groups.append(DuplicateGroup(
-                    source_text=source_text,
-                    entries=entries
-                ))
+        # Rows grouped by source text, groups in order of first appearance
+        order = np.argsort(codes, kind='stable')
+        boundaries = np.flatnonzero(np.diff(codes[order])) + 1
         
-        return duplicate_groups
+        return [
+            DuplicateGroup(source_text=texts[codes[rows[0]]], rows=rows, dataset=self)
+            for rows in np.split(order, boundaries)
+            if len(rows) > 1
+        ]
     
     def get_completion_rate(self) -> float:
         """Calculate translation completion percentage"""
-        if not self.entries:
+        if len(self) == 0:
             return 0.0
         
-        completed = sum(1 for entry in self.entries 
-                       if entry.target_text and entry.target_text.strip())
-        return (completed / len(self.entries)) * 100
+        target = self.columns['target_text']
+        present = target.notna()
+        completed = int(target[present].str.strip().astype(bool).sum()) if present.any() else 0
+        return (completed / len(self)) * 100
     
     def __len__(self) -> int:
-        return len(self.entries)
+        return len(self.columns)
+    
+    def __repr__(self) -> str:
+        return (f"TranslationDataset({len(self)} entries, source_lang={self.source_lang!r}, "
+                f"target_lang={self.target_lang!r})")
+    
+    def __getstate__(self):
+        # Entry views and normalised texts are rebuilt from the columns after unpickling
+        state = self.__dict__.copy()
+        state['_entries'] = None
+        state['_normalized'] = None
+        return state
+    
+    @staticmethod
+    def _entries_to_columns(entries: List[TranslationEntry]) -> pd.DataFrame:
+        return pd.DataFrame({
+            'str_id': _object_column(_intern_strings([entry.str_id for entry in entries])),
+            'source_text': _object_column(_share_strings([entry.source_text for entry in entries])),
+            'target_text': _object_column([entry.target_text for entry in entries]),
+            'source_lang': pd.Categorical([entry.source_lang for entry in entries]),
+            'target_lang': pd.Categorical([entry.target_lang for entry in entries]),
+            'occurrences': np.array([entry.occurrences for entry in entries], dtype=np.int64)
+        })
+    
+    @staticmethod
+    def _build_entries(columns: pd.DataFrame) -> List[TranslationEntry]:
+        target_langs = columns['target_lang'].astype(object)
+        return [
+            TranslationEntry(
+                str_id=str_id,
+                source_text=source_text,
+                target_text=target_text,
+                source_lang=source_lang,
+                target_lang=target_lang,
+                occurrences=occurrences
+            )
+            for str_id, source_text, target_text, source_lang, target_lang, occurrences in zip(
+                columns['str_id'].tolist(),
+                columns['source_text'].tolist(),
+                columns['target_text'].tolist(),
+                columns['source_lang'].astype(object).tolist(),
+                target_langs.where(target_langs.notna(), None).tolist(),
+                columns['occurrences'].tolist()
+            )
+        ]
+
+
+def _object_column(values) -> pd.Series:
+    """Text column with object dtype, so missing values stay None and strings are not copied"""
+    return pd.Series(np.asarray(values, dtype=object), dtype=object)
+
+
+def _target_column(target_texts: Optional[Sequence], n: int) -> pd.Series:
+    """Target text column: strings, with missing or empty values as None"""
+    if target_texts is None:
+        return pd.Series([None] * n, dtype=object)
+    
+    target = pd.Series(target_texts, dtype=object)
+    target = target.where(target.notna() & (target != ""), None)
+    present = target.notna()
+    target[present] = target[present].astype(str)
+    return _object_column(target)
+
+
+def _intern_strings(values) -> np.ndarray:
+    """Object array of interned strings, so repeated ids share one string object"""
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    if len(codes) == 0:
+        return np.zeros(0, dtype=object)
+    
+    # Only the distinct values are converted and interned
+    interned = np.array([sys.intern(str(value)) for value in uniques], dtype=object)
+    return interned[codes]
+
+
+def _share_strings(values) -> np.ndarray:
+    """Object array where equal strings are one shared object (duplicate texts are common)"""
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    if len(codes) == 0:
+        return np.zeros(0, dtype=object)
+    return np.asarray(uniques, dtype=object)[codes]
@@ -4,8 +4,8 @@ def enhanced_file_upload():
     """Enhanced file upload that remembers original filename"""
     uploaded_file = st.file_uploader(
         "Upload Translation File",
-        type=['xlsx', 'xls'],
-        help="Upload Excel file with strId, EN, and target language columns"
+        type=['xlsx', 'xls', 'csv', 'tsv', 'json', 'jsonl', 'xliff', 'xlf', 'parquet'],
+        help="Upload an Excel, CSV/TSV, JSON, XLIFF or Parquet file with strId, EN, and target language columns"
     )
     
     if uploaded_file:
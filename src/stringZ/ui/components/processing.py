@@ -2,17 +2,25 @@ import time
 import streamlit as st
 
 from stringZ.core.processor import TranslationProcessor, ProcessingConfig
+from stringZ.utils.progress_utils import ProgressReporter
 
-def process_file(dataset, remove_duplicates, dedup_strategy, sort_by_correlation, 
-                correlation_strategy, similarity_threshold, max_cluster_size, min_substring_length):
-    """Process the uploaded file with given settings"""
+def process_file(datasets, remove_duplicates, dedup_strategy, sort_by_correlation, 
+                correlation_strategy, similarity_threshold, max_cluster_size, min_substring_length,
+                similarity_mode="dense", workers=1):
+    """Process the uploaded file with given settings (datasets: one dataset per target language)"""
     
     progress_bar = st.progress(0)
     status_text = st.empty()
     
+    def show_progress(stage, done, total, eta):
+        """Progress callback: one bar per pipeline stage"""
+        percent = int(done * 100 / total) if total else 100
+        eta_text = f", ~{eta:.0f}s left" if eta is not None else ""
+        progress_bar.progress(min(percent, 100))
+        status_text.text(f"🔄 {stage.capitalize()}: {done:,}/{total:,} rows{eta_text}")
+    
     try:
         status_text.text("⚙️ Initializing processing...")
-        progress_bar.progress(20)
         
         # Create processing configuration
         config = ProcessingConfig(
@@ -22,20 +30,27 @@ def process_file(dataset, remove_duplicates, dedup_strategy, sort_by_correlation
             correlation_strategy=correlation_strategy,
             similarity_threshold=similarity_threshold,
             max_cluster_size=max_cluster_size,
-            min_substring_length=min_substring_length
+            min_substring_length=min_substring_length,
+            similarity_mode=similarity_mode,
+            workers=workers
         )
         
         processor = TranslationProcessor(config)
         
-        status_text.text("🔄 Processing dataset...")
-        progress_bar.progress(60)
-        
-        processed_dataset = processor.process(dataset)
+        # Several languages share one pass over the source texts
+        if len(datasets) > 1:
+            processed_datasets = processor.process_languages(datasets, ProgressReporter(show_progress))
+        else:
+            processed_datasets = {
+                language: processor.process(dataset, ProgressReporter(show_progress))
+                for language, dataset in datasets.items()
+            }
         
-        progress_bar.progress(90)
         status_text.text("📊 Generating statistics...")
         
-        # Store results
+        # Store results; the first language is shown, the sidebar switches between them
+        processed_dataset = next(iter(processed_datasets.values()))
+        st.session_state.processed_datasets = processed_datasets
         st.session_state.processed_dataset = processed_dataset
         st.session_state.processing_stats = processor.get_processing_stats(processed_dataset)
         
@@ -15,8 +15,12 @@ def initialize_session_state():
     """Initialize all session state variables"""
     if 'dataset' not in st.session_state:
         st.session_state.dataset = None
+    if 'datasets' not in st.session_state:
+        st.session_state.datasets = None
     if 'processed_dataset' not in st.session_state:
         st.session_state.processed_dataset = None
+    if 'processed_datasets' not in st.session_state:
+        st.session_state.processed_datasets = None
     if 'processing_stats' not in st.session_state:
         st.session_state.processing_stats = None
     if 'validation_results' not in st.session_state:
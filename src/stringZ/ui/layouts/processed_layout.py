@@ -1,4 +1,5 @@
 import streamlit as st
+from ...core.processor import TranslationProcessor
 from ..tabs.results_tab import show_results
 from ..tabs.review_tab import show_review_mode
 from ..tabs.validation_tab import show_validation_tab
@@ -28,12 +29,28 @@ def render_processed_sidebar():
         
         if st.button("🆕 Start Over", type="secondary", use_container_width=True):
             st.session_state.dataset = None
+            st.session_state.datasets = None
             st.session_state.processed_dataset = None
+            st.session_state.processed_datasets = None
             st.session_state.processing_stats = None
             st.session_state.validation_results = None
             st.rerun()
         
         st.markdown("---")
+        
+        # Languages processed in the same run
+        processed_datasets = st.session_state.processed_datasets or {}
+        if len(processed_datasets) > 1:
+            languages = list(processed_datasets)
+            current = st.session_state.processed_dataset.target_lang
+            language = st.selectbox("🌍 Show language", languages,
+                                    index=languages.index(current) if current in languages else 0)
+            if language != current:
+                st.session_state.processed_dataset = processed_datasets[language]
+                st.session_state.processing_stats = TranslationProcessor().get_processing_stats(processed_datasets[language])
+                st.session_state.validation_results = None
+                st.rerun()
+        
         dataset = st.session_state.processed_dataset
         st.write(f"📝 **{len(dataset)}** entries")
         st.write(f"🌍 **{dataset.source_lang}** → **{dataset.target_lang}**")
@@ -1,10 +1,12 @@
+import os
 import streamlit as st
-import pandas as pd
 from ..components.file_upload import enhanced_file_upload
 from ..components.processing import process_file
 from ..components.welcome import show_welcome
 from ..components.preview import show_preview
-from ...models.data_models import TranslationDataset
+from ...utils.file_utils import read_header, read_datasets
+
+ALL_LANGUAGES = "All languages"
 
 def render_upload_layout():
     """Layout for upload workflow - sidebar controls + main content"""
@@ -29,11 +31,12 @@ def handle_file_upload(uploaded_file):
     """Handle the file upload and language selection"""
     with st.spinner("Loading file..."):
         try:
-            df = pd.read_excel(uploaded_file)
+            # Only the header row is parsed until a target language is chosen
+            columns, _ = read_header(uploaded_file, filename=uploaded_file.name)
         
             # Flexible column detection
-            str_id_col = detect_str_id_column(df)
-            source_col = detect_source_column(df)
+            str_id_col = detect_str_id_column(columns)
+            source_col = detect_source_column(columns)
         
             if not str_id_col:
                 st.error("❌ No string ID column found! Expected one of: KEY_NAME, strId, ID, strID, 字符串")
@@ -47,7 +50,7 @@ def handle_file_upload(uploaded_file):
             st.subheader("🌍 Select Target Language")
         
             # Find target language columns (exclude detected ID and source columns)
-            lang_columns = [col for col in df.columns if col not in [str_id_col, source_col]]
+            lang_columns = [col for col in columns if col not in [str_id_col, source_col]]
         
             if not lang_columns:
                 st.error(f"No target language columns found! Make sure your file has columns other than '{str_id_col}' and '{source_col}'.")
@@ -56,25 +59,26 @@ def handle_file_upload(uploaded_file):
             # Show detected columns
             st.info(f"✅ Detected: **{str_id_col}** (ID) + **{source_col}** (Source)")
         
-            # Let user select target language
+            # Let user select target language (or all of them, processed together in one run)
             selected_language = st.selectbox(
                 "Choose target language:",
-                options=lang_columns,
+                options=lang_columns + ([ALL_LANGUAGES] if len(lang_columns) > 1 else []),
                 help="All other language columns will be removed"
             )
+            target_languages = lang_columns if selected_language == ALL_LANGUAGES else [selected_language]
         
             # Button to confirm language selection and load data
             if st.button("✅ Load Data", type="primary"):
                 with st.spinner(f"Loading data with {selected_language}..."):
-                    columns_to_keep = [str_id_col, source_col, selected_language]
-                    df_filtered = df[columns_to_keep].copy()
-                
-                    st.session_state.dataset = TranslationDataset.from_dataframe(
-                        df_filtered, 
+                    # Stream only the id, source and selected target columns
+                    st.session_state.datasets = read_datasets(
+                        uploaded_file,
+                        filename=uploaded_file.name,
+                        str_id_col=str_id_col,  # Pass the detected column
                         source_col=source_col,
-                        target_col=selected_language,
-                        str_id_col=str_id_col  # Pass the detected column
+                        target_cols=target_languages
                     )
+                    st.session_state.dataset = st.session_state.datasets[target_languages[0]]
                 
                     st.success(f"✅ Loaded {len(st.session_state.dataset)} entries")
                     st.rerun()
@@ -82,20 +86,20 @@ def handle_file_upload(uploaded_file):
         except Exception as e:
             st.error(f"Error loading file: {str(e)}")
 
-def detect_str_id_column(df):
+def detect_str_id_column(columns):
     """Detect string ID column with flexible naming"""
     possible_names = ['strId', 'ID', 'strID', '字符串', 'id', 'StringID', 'string_id', 'KEY_NAME']
 
-    for col in df.columns:
+    for col in columns:
         if col in possible_names:
             return col
     return None
 
-def detect_source_column(df):
+def detect_source_column(columns):
     """Detect English source column with flexible naming"""
     possible_names = ['EN', 'English', 'Source', 'en', 'english', 'source']
 
-    for col in df.columns:
+    for col in columns:
         if col in possible_names:
             return col
     return None
@@ -104,6 +108,8 @@ def show_processing_options():
     dataset = st.session_state.dataset
     st.subheader("📊 File Information")
     st.write(f"**{len(dataset)}** entries loaded")
+    if len(st.session_state.datasets or {}) > 1:
+        st.write(f"🌍 **{len(st.session_state.datasets)}** target languages: {', '.join(st.session_state.datasets)}")
     
     st.subheader("🔧 Processing Options")
     
@@ -113,13 +119,13 @@ def show_processing_options():
     
     correlation_strategy = st.selectbox(
         "Sorting Method",
-        ["hybrid", "substring", "semantic"],
-        help="hybrid: Best of substring + semantic"
+        ["hybrid", "substring", "semantic", "graph", "minhash"],
+        help="hybrid: Best of substring + semantic, graph: Fast semantic grouping for large files, minhash: Near-duplicates for very large files"
     ) if sort_by_correlation else "hybrid"
     
     # Advanced settings
     with st.expander("⚙️ Advanced Settings"):
-        if sort_by_correlation and correlation_strategy in ["semantic", "hybrid"]:
+        if sort_by_correlation and correlation_strategy in ["semantic", "hybrid", "graph"]:
             similarity_threshold = st.slider("Similarity Threshold", 0.5, 0.9, 0.7, 0.1)
             max_cluster_size = st.slider("Max Cluster Size", 5, 30, 15, 5)
         else:
@@ -130,13 +136,26 @@ def show_processing_options():
             min_substring_length = st.slider("Min Substring Length", 3, 15, 5, 1)
         else:
             min_substring_length = 5
+        
+        if sort_by_correlation and correlation_strategy in ["semantic", "hybrid"]:
+            similarity_mode = st.selectbox(
+                "Similarity Mode", ["dense", "sparse"],
+                help="dense: every similar pair, sparse: only the closest neighbours (less memory on large files)"
+            )
+        else:
+            similarity_mode = "dense"
+        
+        if sort_by_correlation and correlation_strategy in ["semantic", "hybrid", "graph"]:
+            workers = st.number_input("Worker Processes", 1, os.cpu_count() or 1, 1, 1)
+        else:
+            workers = 1
     
     # Process button
     if st.button("🚀 Process File", type="primary", use_container_width=True):
         process_file(
-            dataset, remove_duplicates, "keep_first_with_occurrences",
+            st.session_state.datasets or {dataset.target_lang: dataset}, remove_duplicates, "keep_first_with_occurrences",
             sort_by_correlation, correlation_strategy, similarity_threshold,
-            max_cluster_size, min_substring_length 
+            max_cluster_size, min_substring_length, similarity_mode, int(workers)
         )
 
 def render_main_content():
@@ -87,9 +87,16 @@ def show_results():
     
     with col2:
         df_processed = processed_dataset.to_dataframe()
+        
+        # Every language processed in the same run gets its own sheet
+        processed_datasets = st.session_state.get('processed_datasets') or {}
         buffer = io.BytesIO()
         with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-            df_processed.to_excel(writer, sheet_name='Processed_Translations', index=False)
+            if len(processed_datasets) > 1:
+                for language, language_dataset in processed_datasets.items():
+                    language_dataset.to_dataframe().to_excel(writer, sheet_name=str(language)[:31], index=False)
+            else:
+                df_processed.to_excel(writer, sheet_name='Processed_Translations', index=False)
         
         st.download_button(
             label="📊 Download Processed Spreadsheet",
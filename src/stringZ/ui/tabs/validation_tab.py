@@ -5,6 +5,7 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from stringZ.validation.validators import run_validation
+from stringZ.utils.progress_utils import ProgressReporter
 
 def show_validation_tab():
     """LQA validation tab - SIMPLE AND CLEAN"""
@@ -29,7 +30,12 @@ def show_validation_tab():
     with col2:
         if st.button("🔍 Run Validation", type="primary", use_container_width=True):
             with st.spinner("🔍 Validating translations..."):
-                validation_results = run_validation(processed_dataset)
+                progress_bar = st.progress(0)
+                progress = ProgressReporter(
+                    lambda stage, done, total, eta: progress_bar.progress(int(done * 100 / total) if total else 100)
+                )
+                validation_results = run_validation(processed_dataset, progress)
+                progress_bar.empty()
                 st.session_state.validation_results = validation_results
                 st.success("✅ Validation completed!")
                 st.rerun()
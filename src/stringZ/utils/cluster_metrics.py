@@ -0,0 +1,98 @@
+import numpy as np
+from scipy import sparse
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ClusterMetrics:
+    """Intra-cluster similarity statistics for many clusters at once.
+    Clusters are given as row indices into the vectors they were built from, so no
+    entry lookups are needed and all pairs are scored in one sparse operation"""
+
+    def __init__(self, vectors):
+        """
+        Args:
+            vectors: L2-normalized row vectors (e.g. the TF-IDF CSR matrix)
+        """
+        self.vectors = sparse.csr_matrix(vectors)
+
+    def compute(self, member_groups):
+        """
+        Compute similarity statistics for every cluster
+
+        Args:
+            member_groups: List of row index lists, one per cluster
+
+        Returns:
+            dict: Arrays 'mean', 'min', 'max' (pairwise cosine similarity) and 'cohesion'
+                  (mean cosine similarity of the members to the cluster centroid)
+        """
+        n_clusters = len(member_groups)
+        metrics = {name: np.zeros(n_clusters) for name in ('mean', 'min', 'max', 'cohesion')}
+        if n_clusters == 0:
+            return metrics
+
+        sizes = np.array([len(members) for members in member_groups], dtype=np.int64)
+        members = np.concatenate([np.asarray(group, dtype=np.int64) for group in member_groups])
+        labels = np.repeat(np.arange(n_clusters), sizes)
+
+        # All intra-cluster pairs, grouped by cluster
+        pair_left, pair_right = [], []
+        offset = 0
+        for size in sizes.tolist():
+            left, right = np.triu_indices(size, k=1)
+            pair_left.append(members[offset + left])
+            pair_right.append(members[offset + right])
+            offset += size
+        pair_left = np.concatenate(pair_left)
+        pair_right = np.concatenate(pair_right)
+        pair_counts = sizes * (sizes - 1) // 2
+
+        # Cosine similarity of every pair in a single row-wise product
+        similarities = np.asarray(
+            self.vectors[pair_left].multiply(self.vectors[pair_right]).sum(axis=1)
+        ).ravel()
+
+        has_pairs = pair_counts > 0
+        pair_labels = np.repeat(np.arange(n_clusters), pair_counts)
+        metrics['mean'][has_pairs] = (
+            np.bincount(pair_labels, weights=similarities, minlength=n_clusters)[has_pairs] / pair_counts[has_pairs]
+        )
+
+        if len(similarities):
+            starts = np.concatenate([[0], np.cumsum(pair_counts)[:-1]])[has_pairs]
+            metrics['min'][has_pairs] = np.minimum.reduceat(similarities, starts)
+            metrics['max'][has_pairs] = np.maximum.reduceat(similarities, starts)
+
+        # For unit vectors the mean cosine to the centroid is |sum of members| / size
+        indicator = sparse.csr_matrix(
+            (np.ones(len(members)), (labels, members)),
+            shape=(n_clusters, self.vectors.shape[0])
+        )
+        sums = indicator @ self.vectors
+        norms = np.sqrt(np.asarray(sums.multiply(sums).sum(axis=1)).ravel())
+        metrics['cohesion'] = norms / sizes
+
+        return metrics
+
+    def apply(self, clusters):
+        """
+        Fill the similarity fields of clusters from their member_indices
+
+        Args:
+            clusters: List of CorrelationCluster with member_indices set
+
+        Returns:
+            list: The same clusters, updated in place
+        """
+        metrics = self.compute([cluster.member_indices for cluster in clusters])
+
+        for i, cluster in enumerate(clusters):
+            cluster.similarity_score = float(metrics['mean'][i])
+            cluster.min_similarity = float(metrics['min'][i])
+            cluster.max_similarity = float(metrics['max'][i])
+            cluster.cohesion = float(metrics['cohesion'][i])
+
+        logger.info(f"Computed similarity metrics for {len(clusters)} clusters")
+        return clusters
@@ -0,0 +1,154 @@
+from bisect import bisect_right
+from collections import deque
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ContainmentIndex:
+    """Aho-Corasick automaton over a set of patterns.
+    Lets us find every pattern contained in a text with a single scan of that text,
+    instead of testing `pattern in text` for every pattern/text pair"""
+
+    def __init__(self, patterns):
+        """
+        Build the automaton
+
+        Args:
+            patterns: Iterable of pattern strings (duplicates are ignored)
+        """
+        self.patterns = []
+        self.pattern_ids = {}
+
+        # Node tables: goto transitions, failure links, pattern ending at node, dictionary links
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [-1]
+        self._dict_link = [0]
+
+        for pattern in patterns:
+            if pattern and pattern not in self.pattern_ids:
+                self._add_pattern(pattern)
+
+        self._build_links()
+        logger.info(f"Built containment index with {len(self.patterns)} patterns ({len(self._goto)} nodes)")
+
+    def _add_pattern(self, pattern):
+        """Insert a pattern into the trie"""
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(-1)
+                self._dict_link.append(0)
+                self._goto[node][char] = next_node
+            node = next_node
+
+        pattern_id = len(self.patterns)
+        self.patterns.append(pattern)
+        self.pattern_ids[pattern] = pattern_id
+        self._output[node] = pattern_id
+
+    def _build_links(self):
+        """Compute failure and dictionary links breadth-first"""
+        goto, fail, output, dict_link = self._goto, self._fail, self._output, self._dict_link
+        queue = deque(goto[0].values())
+
+        while queue:
+            node = queue.popleft()
+            for char, child in goto[node].items():
+                # Longest proper suffix of child that is also a trie path
+                state = fail[node]
+                while state and char not in goto[state]:
+                    state = fail[state]
+                target = goto[state].get(char, 0)
+                fail[child] = target if target != child else 0
+
+                # Nearest node on the failure chain where a pattern ends
+                dict_link[child] = fail[child] if output[fail[child]] >= 0 else dict_link[fail[child]]
+                queue.append(child)
+
+    def find_all(self, text):
+        """
+        Find every pattern contained in text
+
+        Args:
+            text: String to scan
+
+        Returns:
+            set: Ids of the patterns occurring in text
+        """
+        goto, fail, output, dict_link = self._goto, self._fail, self._output, self._dict_link
+        found = set()
+        node = 0
+
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            match = node if output[node] >= 0 else dict_link[node]
+            while match and output[match] not in found:
+                found.add(output[match])
+                match = dict_link[match]
+
+        return found
+
+
+def find_containment_groups(keys, min_length, max_group_size=None, identities=None, group_keys=None,
+                            progress=None):
+    """
+    Greedy substring grouping, shortest key first.
+    Each unused key at least min_length long starts a group with every later unused key
+    that contains it, which is what the original pairwise `short in long` loops produced.
+
+    Args:
+        keys: Normalized texts (stripped/lowercased), already in processing order
+        min_length: Keys shorter than this never start a group
+        max_group_size: Optional cap on group size (None means unbounded)
+        identities: Values compared to skip exact matches (defaults to keys)
+        group_keys: Values used to mark entries as used (defaults to positions)
+        progress: Optional ProgressReporter, updated while the keys are scanned
+
+    Returns:
+        list: Groups as lists of positions into keys, first position is the contained key
+    """
+    identities = keys if identities is None else identities
+    group_keys = list(range(len(keys))) if group_keys is None else group_keys
+
+    index = ContainmentIndex(key for key in keys if len(key) >= min_length)
+
+    # Positions of the keys containing each pattern, in processing order
+    containers = [[] for _ in index.patterns]
+    for position, key in enumerate(keys):
+        if progress is not None:
+            progress.update(position)
+        for pattern_id in index.find_all(key):
+            containers[pattern_id].append(position)
+
+    groups = []
+    used = set()
+
+    for position, key in enumerate(keys):
+        if group_keys[position] in used or len(key) < min_length:
+            continue
+
+        group = [position]
+        candidates = containers[index.pattern_ids[key]]
+
+        for other in candidates[bisect_right(candidates, position):]:
+            if group_keys[other] in used or identities[other] == identities[position]:
+                continue
+
+            group.append(other)
+            if max_group_size and len(group) >= max_group_size:
+                break
+
+        if len(group) > 1:
+            used.update(group_keys[member] for member in group)
+            groups.append(group)
+
+    return groups
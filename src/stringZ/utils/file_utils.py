@@ -0,0 +1,555 @@
+import csv
+import io
+import json
+import os
+import zipfile
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Type
+import numpy as np
+import pandas as pd
+import logging
+
+from .progress_utils import ProgressReporter
+
+logger = logging.getLogger(__name__)
+
+# Accepted header names, in order of preference within a file
+STR_ID_COLUMN_NAMES = ['strId', 'ID', 'strID', '字符串', 'id', 'StringID', 'string_id', 'KEY_NAME', "SOURCE"]
+SOURCE_COLUMN_NAMES = ['EN', 'English', 'Source', 'en', 'english', 'source']
+
+# Rows buffered before they are turned into column arrays
+DEFAULT_CHUNK_SIZE = 50000
+
+# Bytes read at a time by the text based readers
+READ_BLOCK_SIZE = 1024 * 1024
+
+
+def detect_columns(columns: Sequence) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Detect the string ID and source columns from header names
+
+    Args:
+        columns: Column names (e.g. the header row)
+
+    Returns:
+        tuple: (str_id_col, source_col), either None when not found
+    """
+    str_id_col = next((col for col in columns if col in STR_ID_COLUMN_NAMES), None)
+    source_col = next((col for col in columns if col in SOURCE_COLUMN_NAMES), None)
+    return str_id_col, source_col
+
+
+class DatasetReader:
+    """Base class for streaming input readers.
+    A reader exposes the column names of its source (read_header) and streams the
+    values of selected columns row by row (iter_rows); the base class groups rows into
+    chunks and turns them into a TranslationDataset without building a DataFrame.
+    Readers are registered per file extension, see register_reader()."""
+
+    def __init__(self, source, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        Args:
+            source: Path or binary file-like object (e.g. an uploaded file)
+            chunk_size: Rows per chunk
+        """
+        self.source = source
+        self.chunk_size = max(1, chunk_size)
+
+    def read_header(self) -> Tuple[List, int]:
+        """
+        Read the column names without parsing the data
+
+        Returns:
+            tuple: (column names, estimated number of data rows, 0 when unknown)
+        """
+        raise NotImplementedError
+
+    def iter_rows(self, columns: Sequence) -> Iterator[Sequence]:
+        """Yield the values of the given columns for every data row (None for missing values)"""
+        raise NotImplementedError
+
+    def iter_chunks(self, columns: Sequence) -> Iterator[List[list]]:
+        """
+        Stream the given columns
+
+        Args:
+            columns: Header names of the columns to read
+
+        Yields:
+            list: One list of values per requested column, at most chunk_size rows each
+        """
+        chunk = [[] for _ in columns]
+        for row in self.iter_rows(columns):
+            for values, value in zip(chunk, row):
+                values.append(value)
+
+            if len(chunk[0]) >= self.chunk_size:
+                yield chunk
+                chunk = [[] for _ in columns]
+
+        if chunk[0]:
+            yield chunk
+
+    def read_dataset(self, str_id_col: str, source_col: str, target_col: Optional[str] = None,
+                     progress: Optional[ProgressReporter] = None):
+        """
+        Stream the id, source and target columns into a TranslationDataset
+
+        Args:
+            str_id_col: String ID column
+            source_col: Source text column
+            target_col: Optional target language column
+            progress: Optional progress/cancellation reporter (stage "ingest")
+
+        Returns:
+            TranslationDataset with the rows that have both an id and a source text
+        """
+        from ..models.data_models import TranslationDataset
+
+        arrays = self._read_columns([str_id_col, source_col] + ([target_col] if target_col else []), progress)
+
+        return TranslationDataset.from_columns(
+            str_ids=arrays[0],
+            source_texts=arrays[1],
+            target_texts=arrays[2] if target_col else None,
+            source_lang=source_col,
+            target_lang=target_col
+        )
+
+    def read_datasets(self, str_id_col: str, source_col: str, target_cols: Sequence,
+                      progress: Optional[ProgressReporter] = None) -> Dict[str, "TranslationDataset"]:
+        """
+        Stream the id, source and several target columns in one pass
+
+        Args:
+            str_id_col: String ID column
+            source_col: Source text column
+            target_cols: Target language columns
+            progress: Optional progress/cancellation reporter (stage "ingest")
+
+        Returns:
+            dict: One TranslationDataset per target column, in target_cols order, all over the
+                  same rows and sharing their ids, source texts and normalised source variants
+        """
+        from ..models.data_models import TranslationDataset
+
+        target_cols = list(target_cols)
+        if not target_cols:
+            raise ValueError("No target language columns given")
+
+        arrays = self._read_columns([str_id_col, source_col] + target_cols, progress)
+
+        first = TranslationDataset.from_columns(
+            str_ids=arrays[0],
+            source_texts=arrays[1],
+            target_texts=arrays[2],
+            source_lang=source_col,
+            target_lang=target_cols[0]
+        )
+        datasets = {target_cols[0]: first}
+        for target_col, target_texts in zip(target_cols[1:], arrays[3:]):
+            datasets[target_col] = first.with_target(target_texts, target_col)
+        return datasets
+
+    def _read_columns(self, columns: List, progress: Optional[ProgressReporter] = None) -> List[np.ndarray]:
+        """Object arrays of the given columns (id and source first) over the rows that have both"""
+        progress = ProgressReporter.ensure(progress)
+        progress.start("ingest", self.read_header()[1] if progress.enabled else 0)
+
+        parts = [[] for _ in columns]
+        rows_read = 0
+        for chunk in self.iter_chunks(columns):
+            rows_read += len(chunk[0])
+            for part, values in zip(parts, _chunk_columns(chunk)):
+                part.append(values)
+            progress.update(rows_read)
+        progress.finish()
+
+        arrays = [np.concatenate(part) if part else np.zeros(0, dtype=object) for part in parts]
+        logger.info(f"Read {len(arrays[0])} of {rows_read} rows with {self.__class__.__name__} "
+                    f"({', '.join(map(str, columns))})")
+        return arrays
+
+    def _rewind(self):
+        if hasattr(self.source, 'seek'):
+            self.source.seek(0)
+        return self.source
+
+    def _open_text(self):
+        """Text stream over the source (UTF-8, a BOM is skipped); close it when done"""
+        if isinstance(self.source, (str, os.PathLike)):
+            return open(self.source, 'r', encoding='utf-8-sig', newline='')
+        stream = io.TextIOWrapper(self._rewind(), encoding='utf-8-sig', newline='')
+        # Closing the wrapper must not close the caller's file object
+        return _Detached(stream)
+
+    def _count_bytes(self, *tokens: bytes) -> int:
+        """Occurrences of the tokens in the raw source, counted block by block in one pass"""
+        count, tails = 0, [b""] * len(tokens)
+        stream = open(self.source, 'rb') if isinstance(self.source, (str, os.PathLike)) else self._rewind()
+        try:
+            while True:
+                block = stream.read(READ_BLOCK_SIZE)
+                if not block:
+                    break
+                for i, token in enumerate(tokens):
+                    data = tails[i] + block
+                    count += data.count(token)
+                    # A token cut at the block end is completed by the next block (the tail is too short to hold a whole one)
+                    tails[i] = data[-(len(token) - 1):] if len(token) > 1 else b""
+        finally:
+            if stream is not self.source:
+                stream.close()
+        return count
+
+
+class ExcelReader(DatasetReader):
+    """Streaming reader for translation spreadsheets.
+    .xlsx files are opened in openpyxl's read-only mode and parsed row by row; only
+    the requested columns are kept, and rows are handed out in chunks, so memory
+    stays proportional to the chunk size instead of the workbook size. Legacy .xls
+    files are not streamable and go through pandas (still reading only the
+    requested columns)."""
+
+    def __init__(self, source, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        super().__init__(source, chunk_size)
+        self.is_xlsx = self._is_xlsx(source)
+
+    def read_header(self) -> Tuple[List, int]:
+        if not self.is_xlsx:
+            df = pd.read_excel(self._rewind(), nrows=0)
+            return df.columns.tolist(), 0
+
+        workbook, sheet = self._open_sheet()
+        try:
+            header = next(sheet.iter_rows(min_row=1, max_row=1, values_only=True), ())
+            # The sheet dimension is only a hint, files written by some tools omit it
+            rows = max((sheet.max_row or 1) - 1, 0)
+        finally:
+            workbook.close()
+
+        return _header_names(header), rows
+
+    def iter_chunks(self, columns: Sequence) -> Iterator[List[list]]:
+        if not self.is_xlsx:
+            df = pd.read_excel(self._rewind(), usecols=list(columns))
+            for start in range(0, len(df), self.chunk_size):
+                part = df.iloc[start:start + self.chunk_size]
+                yield [part[col].astype(object).where(part[col].notna(), None).tolist() for col in columns]
+            return
+
+        yield from super().iter_chunks(columns)
+
+    def iter_rows(self, columns: Sequence) -> Iterator[Sequence]:
+        workbook, sheet = self._open_sheet()
+        try:
+            rows = sheet.iter_rows(values_only=True)
+            positions = _column_positions(_header_names(next(rows, ())), columns)
+
+            for row in rows:
+                width = len(row)
+                yield [row[position] if position < width else None for position in positions]
+        finally:
+            workbook.close()
+
+    def _open_sheet(self):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(self._rewind(), read_only=True, data_only=True)
+        # Same sheet as pandas.read_excel: the first one, not the active one
+        return workbook, workbook.worksheets[0]
+
+    @staticmethod
+    def _is_xlsx(source) -> bool:
+        if isinstance(source, (str, os.PathLike)):
+            return zipfile.is_zipfile(source)
+        position = source.tell()
+        try:
+            return zipfile.is_zipfile(source)
+        finally:
+            source.seek(position)
+
+
+class CsvReader(DatasetReader):
+    """Delimited text reader (CSV by default) on top of the csv module; the first row is the header.
+    Empty fields count as missing values."""
+
+    delimiter = ','
+
+    def read_header(self) -> Tuple[List, int]:
+        with self._open_text() as stream:
+            header = next(csv.reader(stream, delimiter=self.delimiter), [])
+        # Quoted fields may span lines, so the line count is an estimate
+        return _header_names([value or None for value in header]), max(self._count_bytes(b"\n") - 1, 0)
+
+    def iter_rows(self, columns: Sequence) -> Iterator[Sequence]:
+        with self._open_text() as stream:
+            rows = csv.reader(stream, delimiter=self.delimiter)
+            positions = _column_positions(_header_names([value or None for value in next(rows, [])]), columns)
+
+            for row in rows:
+                if not row:
+                    continue
+                width = len(row)
+                yield [(row[position] or None) if position < width else None for position in positions]
+
+
+class TsvReader(CsvReader):
+    """Tab separated variant of CsvReader"""
+
+    delimiter = '\t'
+
+
+class JsonReader(DatasetReader):
+    """Reader for JSON exports: either an array of row objects or JSON Lines (one object
+    per line). Arrays are decoded object by object from a buffered stream, so the whole
+    document is never held in memory. The header is the keys of the first object."""
+
+    def read_header(self) -> Tuple[List, int]:
+        first = next(self._iter_objects(), {})
+        rows = self._count_bytes(b"\n") if not self._is_array() else 0
+        return list(first.keys()), rows
+
+    def iter_rows(self, columns: Sequence) -> Iterator[Sequence]:
+        for record in self._iter_objects():
+            yield [_json_value(record.get(col)) for col in columns]
+
+    def _is_array(self) -> bool:
+        with self._open_text() as stream:
+            while True:
+                char = stream.read(1)
+                if not char or not char.isspace():
+                    return char == '['
+
+    def _iter_objects(self) -> Iterator[dict]:
+        decoder = json.JSONDecoder()
+        with self._open_text() as stream:
+            buffer, position = "", 0
+
+            while True:
+                # Skip whitespace and the separators/brackets between top-level records
+                while position < len(buffer) and (buffer[position].isspace() or buffer[position] in ',[]'):
+                    position += 1
+
+                if position < len(buffer):
+                    try:
+                        record, position = decoder.raw_decode(buffer, position)
+                        if isinstance(record, dict):
+                            yield record
+                        continue
+                    except json.JSONDecodeError:
+                        pass  # Record cut at the buffer end, read more and retry
+
+                block = stream.read(READ_BLOCK_SIZE)
+                if not block:
+                    if buffer[position:].strip():
+                        raise ValueError(f"Invalid JSON near: {buffer[position:position + 80]!r}")
+                    return
+                buffer, position = buffer[position:] + block, 0
+
+
+class XliffReader(DatasetReader):
+    """Reader for XLIFF 1.2 (trans-unit) and 2.x (unit/segment) files, parsed with
+    iterparse so only the current unit is in memory. Columns are "strId", the source
+    language ("EN" for English sources, otherwise "Source") and the target language
+    code (or "Target"). Inline markup is flattened to its text content."""
+
+    def read_header(self) -> Tuple[List, int]:
+        return self._column_names(), self._count_bytes(b"<trans-unit", b"<unit")
+
+    def iter_rows(self, columns: Sequence) -> Iterator[Sequence]:
+        positions = _column_positions(self._column_names(), columns)
+
+        for _, element in self._iterparse(('end',)):
+            if _local_name(element.tag) not in ('trans-unit', 'unit'):
+                continue
+
+            # 1.2: source/target children of the trans-unit; 2.x: one source/target per segment
+            parts = element if _local_name(element.tag) == 'trans-unit' else [
+                part for segment in element for part in segment
+            ]
+            sources = ["".join(part.itertext()) for part in parts if _local_name(part.tag) == 'source']
+            targets = ["".join(part.itertext()) for part in parts if _local_name(part.tag) == 'target']
+            if _local_name(element.tag) == 'trans-unit':
+                sources, targets = sources[:1], targets[:1]
+
+            row = [element.get('id'), "".join(sources) or None, "".join(targets) or None]
+            yield [row[position] for position in positions]
+            element.clear()
+
+    def _column_names(self) -> List[str]:
+        """Column names from the languages on the xliff/file start elements (the file is read only up to there)"""
+        source_lang, target_lang = None, None
+        for _, element in self._iterparse(('start',)):
+            tag = _local_name(element.tag)
+            if tag == 'xliff':
+                source_lang = element.get('srcLang') or source_lang
+                target_lang = element.get('trgLang') or target_lang
+            elif tag == 'file':
+                source_lang = element.get('source-language') or source_lang
+                target_lang = element.get('target-language') or target_lang
+                break
+
+        source_name = 'EN' if (source_lang or '').lower().split('-')[0] == 'en' else 'Source'
+        return ['strId', source_name, target_lang or 'Target']
+
+    def _iterparse(self, events):
+        from xml.etree.ElementTree import iterparse
+
+        source = self.source if isinstance(self.source, (str, os.PathLike)) else self._rewind()
+        return iterparse(source, events=events)
+
+
+class ParquetReader(DatasetReader):
+    """Parquet reader: record batches of only the requested columns (needs pyarrow)"""
+
+    def read_header(self) -> Tuple[List, int]:
+        parquet_file = self._open()
+        return parquet_file.schema_arrow.names, parquet_file.metadata.num_rows
+
+    def iter_chunks(self, columns: Sequence) -> Iterator[List[list]]:
+        parquet_file = self._open()
+        missing = [col for col in columns if col not in parquet_file.schema_arrow.names]
+        if missing:
+            raise ValueError(f"Columns not found in file: {missing}")
+
+        for batch in parquet_file.iter_batches(batch_size=self.chunk_size, columns=list(columns)):
+            yield [batch.column(i).to_pylist() for i in range(len(columns))]
+
+    def _open(self):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Reading Parquet files requires pyarrow")
+        return pq.ParquetFile(self._rewind())
+
+
+# File extension -> reader class
+READERS: Dict[str, Type[DatasetReader]] = {
+    'xlsx': ExcelReader,
+    'xls': ExcelReader,
+    'csv': CsvReader,
+    'tsv': TsvReader,
+    'json': JsonReader,
+    'jsonl': JsonReader,
+    'xliff': XliffReader,
+    'xlf': XliffReader,
+    'parquet': ParquetReader,
+}
+
+
+def register_reader(extension: str, reader_class: Type[DatasetReader]) -> None:
+    """Use reader_class for files with the given extension"""
+    READERS[extension.lower().lstrip('.')] = reader_class
+
+
+def get_reader(source, filename: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> DatasetReader:
+    """
+    Reader for a file, chosen by extension
+
+    Args:
+        source: Path or binary file-like object
+        filename: Name used for the extension when source is a file object
+        chunk_size: Rows per chunk
+
+    Returns:
+        DatasetReader
+    """
+    name = filename or (os.fspath(source) if isinstance(source, (str, os.PathLike)) else getattr(source, 'name', ''))
+    extension = name.rsplit('.', 1)[-1].lower() if '.' in name else ''
+    reader_class = READERS.get(extension)
+    if reader_class is None:
+        raise ValueError(f"Unsupported file type: .{extension}" if extension else "Unknown file type")
+    return reader_class(source, chunk_size)
+
+
+def read_header(source, filename: Optional[str] = None) -> Tuple[List, int]:
+    """Column names and estimated data rows of any supported file (see DatasetReader.read_header)"""
+    return get_reader(source, filename).read_header()
+
+
+def read_dataset(source, str_id_col: str, source_col: str, target_col: Optional[str] = None,
+                 filename: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 progress: Optional[ProgressReporter] = None):
+    """Stream the needed columns of any supported file into a TranslationDataset (see DatasetReader.read_dataset)"""
+    return get_reader(source, filename, chunk_size).read_dataset(str_id_col, source_col, target_col, progress)
+
+
+def read_datasets(source, str_id_col: str, source_col: str, target_cols: Sequence,
+                  filename: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  progress: Optional[ProgressReporter] = None):
+    """Stream several target columns of any supported file in one pass (see DatasetReader.read_datasets)"""
+    return get_reader(source, filename, chunk_size).read_datasets(str_id_col, source_col, target_cols, progress)
+
+
+class _Detached:
+    """Context manager that detaches a TextIOWrapper instead of closing the wrapped file"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def __enter__(self):
+        return self.stream
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream.detach()
+
+
+def _header_names(header) -> List:
+    """Column names like pandas gives them: blanks become "Unnamed: i", repeats get a ".n" suffix"""
+    names, seen = [], {}
+    for i, value in enumerate(header):
+        name = f"Unnamed: {i}" if value is None else value
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+
+    # pandas drops trailing blank header cells that have no data either; keep names only up to the last real one
+    while names and header[len(names) - 1] is None:
+        names.pop()
+    return names
+
+
+def _column_positions(header: List, columns: Sequence) -> List[int]:
+    missing = [col for col in columns if col not in header]
+    if missing:
+        raise ValueError(f"Columns not found in file: {missing}")
+    return [header.index(col) for col in columns]
+
+
+def _json_value(value):
+    """JSON scalars as cell values: null and "" are missing, nested values are kept as JSON text"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def _local_name(tag: str) -> str:
+    """Tag name without its XML namespace"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _chunk_columns(chunk: List[list]) -> List[np.ndarray]:
+    """Object arrays of one chunk: rows without id or source dropped (empty cells count as
+    missing, like in pandas), values as strings (targets may be None)"""
+    str_ids, sources = chunk[0], chunk[1]
+    keep = [i for i, (str_id, source) in enumerate(zip(str_ids, sources))
+            if str_id is not None and str_id != "" and source is not None and source != ""]
+
+    arrays = [
+        _object_array([str(str_ids[i]) for i in keep]),
+        _object_array([str(sources[i]) for i in keep])
+    ]
+    for targets in chunk[2:]:
+        arrays.append(_object_array([None if targets[i] is None else str(targets[i]) for i in keep]))
+    return arrays
+
+
+def _object_array(values: list) -> np.ndarray:
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
@@ -0,0 +1,133 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class HashingTextVectorizer:
+    """Stateless text vectorizer based on feature hashing.
+    Word and character n-grams are hashed into a fixed feature space, so there is no
+    vocabulary to fit: chunks can be vectorized independently (also in worker processes)
+    and new texts never need a refit. IDF weights are optional and are accumulated
+    in a streaming way with partial_fit()"""
+
+    def __init__(self, n_features=2 ** 20, word_ngram_range=(1, 2), char_ngram_range=(3, 5),
+                 stop_words='english', use_idf=True, chunk_size=10000, workers=1):
+        """
+        Args:
+            n_features: Hash buckets per analyzer (word and character features are stacked)
+            word_ngram_range: Word n-gram sizes
+            char_ngram_range: Character n-gram sizes (inside word boundaries)
+            stop_words: Stop words dropped by the word analyzer
+            use_idf: Weight features by streaming inverse document frequency
+            chunk_size: Texts hashed per chunk
+            workers: Processes used to hash chunks (1 hashes in this process)
+        """
+        self.n_features = n_features
+        self.word_ngram_range = word_ngram_range
+        self.char_ngram_range = char_ngram_range
+        self.stop_words = stop_words
+        self.use_idf = use_idf
+        self.chunk_size = chunk_size
+        self.workers = workers
+
+        self.document_count_ = 0
+        self.document_frequency_ = np.zeros(2 * n_features, dtype=np.int64)
+
+    def get_params(self):
+        """Parameters that define the feature space (used for cache fingerprints)"""
+        return {
+            'backend': 'hashing',
+            'n_features': self.n_features,
+            'word_ngram_range': self.word_ngram_range,
+            'char_ngram_range': self.char_ngram_range,
+            'stop_words': self.stop_words,
+            'use_idf': self.use_idf
+        }
+
+    def hash(self, texts):
+        """
+        Hash texts into raw n-gram counts (stateless)
+
+        Args:
+            texts: List of strings
+
+        Returns:
+            scipy.sparse.csr_matrix: (len(texts), 2 * n_features) count matrix
+        """
+        chunks = [texts[start:start + self.chunk_size] for start in range(0, len(texts), self.chunk_size)]
+        if not chunks:
+            return sparse.csr_matrix((0, 2 * self.n_features))
+
+        # Only the hashing parameters go to the workers, not the document frequencies
+        hash_chunk = partial(
+            _hash_chunk,
+            n_features=self.n_features,
+            word_ngram_range=self.word_ngram_range,
+            char_ngram_range=self.char_ngram_range,
+            stop_words=self.stop_words
+        )
+
+        if self.workers > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(chunks))) as executor:
+                parts = list(executor.map(hash_chunk, chunks))
+        else:
+            parts = [hash_chunk(chunk) for chunk in chunks]
+
+        return sparse.vstack(parts, format='csr')
+
+    def partial_fit(self, texts):
+        """
+        Add texts to the streaming document frequencies
+
+        Args:
+            texts: List of strings
+
+        Returns:
+            HashingTextVectorizer: self
+        """
+        self._update_document_frequency(self.hash(texts))
+        return self
+
+    def fit_transform(self, texts):
+        """Reset the document frequencies, fit them on texts and return the weighted vectors"""
+        counts = self.hash(texts)
+        self.document_count_ = 0
+        self.document_frequency_ = np.zeros(2 * self.n_features, dtype=np.int64)
+        self._update_document_frequency(counts)
+        return self._weight(counts)
+
+    def transform(self, texts):
+        """Vectorize texts with the current document frequencies (no refit)"""
+        return self._weight(self.hash(texts))
+
+    def _update_document_frequency(self, counts):
+        """Count documents per feature"""
+        self.document_count_ += counts.shape[0]
+        self.document_frequency_ += np.bincount(counts.indices, minlength=2 * self.n_features)
+
+    def _weight(self, counts):
+        """Apply smoothed IDF weights (when enabled) and L2-normalize rows"""
+        weighted = counts.astype(np.float64)
+        if self.use_idf:
+            idf = np.log((1 + self.document_count_) / (1 + self.document_frequency_)) + 1
+            weighted = weighted @ sparse.diags(idf)
+        return normalize(weighted, norm='l2', copy=False).tocsr()
+
+
+def _hash_chunk(texts, n_features, word_ngram_range, char_ngram_range, stop_words):
+    """Word and character n-gram counts of one chunk"""
+    word_hasher = HashingVectorizer(
+        n_features=n_features, ngram_range=word_ngram_range, stop_words=stop_words,
+        alternate_sign=False, norm=None
+    )
+    char_hasher = HashingVectorizer(
+        n_features=n_features, analyzer='char_wb', ngram_range=char_ngram_range,
+        alternate_sign=False, norm=None
+    )
+    return sparse.hstack([word_hasher.transform(texts), char_hasher.transform(texts)], format='csr')
@@ -0,0 +1,185 @@
+import numpy as np
+from scipy import sparse
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Odd 64-bit multipliers for the rolling shingle hash and the band keys
+_SHINGLE_BASE = np.uint64(0x100000001B3)
+_BAND_BASE = np.uint64(0x9E3779B97F4A7C15)
+
+
+class MinHashLSH:
+    """Near-duplicate detection with MinHash signatures and banded LSH.
+    Texts are reduced to fixed-size signatures over character shingles, and only
+    texts sharing a band bucket become candidate pairs, so no all-pairs matrix is built"""
+
+    def __init__(self, num_bands=20, rows_per_band=3, shingle_size=3, chunk_size=20000, seed=42):
+        """
+        Args:
+            num_bands: Number of LSH bands
+            rows_per_band: Signature rows per band (num_bands * rows_per_band hash functions)
+            shingle_size: Characters per shingle
+            chunk_size: Texts hashed at once (bounds peak memory)
+            seed: Seed for the hash functions, fixed so results are reproducible
+        """
+        self.num_bands = num_bands
+        self.rows_per_band = rows_per_band
+        self.shingle_size = shingle_size
+        self.chunk_size = chunk_size
+
+        rng = np.random.default_rng(seed)
+        num_perm = num_bands * rows_per_band
+        self._hash_a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._hash_b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+        logger.info(
+            f"Initialized MinHash LSH ({num_bands} bands x {rows_per_band} rows, "
+            f"threshold ~{(1 / num_bands) ** (1 / rows_per_band):.2f})"
+        )
+
+    @property
+    def num_perm(self):
+        return self.num_bands * self.rows_per_band
+
+    def signatures(self, texts, progress=None):
+        """
+        Compute MinHash signatures
+
+        Args:
+            texts: List of strings
+            progress: Optional ProgressReporter, updated after every chunk
+
+        Returns:
+            numpy.ndarray: (len(texts), num_perm) uint32 signatures, empty texts get all-max rows
+        """
+        signatures = np.full((len(texts), self.num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+
+        for start in range(0, len(texts), self.chunk_size):
+            chunk = [self._normalize(text) for text in texts[start:start + self.chunk_size]]
+            self._chunk_signatures(chunk, signatures[start:start + len(chunk)])
+            if progress is not None:
+                progress.update(start + len(chunk))
+
+        return signatures
+
+    def candidate_pairs(self, signatures):
+        """
+        Find candidate pairs that share at least one band bucket.
+        Rows in a bucket are linked to their neighbour in bucket order, so every band
+        adds at most n - 1 pairs no matter how large its buckets are.
+
+        Args:
+            signatures: MinHash signatures from signatures()
+
+        Returns:
+            tuple: (left, right) arrays of row indices with left < right, without duplicates
+        """
+        n = signatures.shape[0]
+        valid = signatures[:, 0] != np.iinfo(np.uint32).max
+        pair_keys = []
+
+        for band in range(self.num_bands):
+            band_rows = signatures[:, band * self.rows_per_band:(band + 1) * self.rows_per_band].astype(np.uint64)
+
+            keys = np.zeros(n, dtype=np.uint64)
+            for column in range(self.rows_per_band):
+                keys = keys * _BAND_BASE + band_rows[:, column]
+
+            rows = np.flatnonzero(valid)
+            rows = rows[np.argsort(keys[rows], kind='stable')]
+            same_bucket = keys[rows[1:]] == keys[rows[:-1]]
+
+            left, right = rows[:-1][same_bucket], rows[1:][same_bucket]
+            pair_keys.append(np.minimum(left, right) * n + np.maximum(left, right))
+
+        if not pair_keys:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        unique_keys = np.unique(np.concatenate(pair_keys))
+        return unique_keys // n, unique_keys % n
+
+    def estimate_similarity(self, signatures, left, right, chunk_size=100000):
+        """Estimated Jaccard similarity of row pairs (fraction of equal signature values)"""
+        similarities = np.empty(len(left))
+
+        for start in range(0, len(left), chunk_size):
+            stop = start + chunk_size
+            similarities[start:stop] = np.mean(signatures[left[start:stop]] == signatures[right[start:stop]], axis=1)
+
+        return similarities
+
+    def similarity_graph(self, texts, threshold, progress=None):
+        """
+        Build a sparse graph of near-duplicate pairs
+
+        Args:
+            texts: List of strings
+            threshold: Only pairs with estimated Jaccard similarity above this value are kept
+            progress: Optional ProgressReporter, updated while signatures are computed
+
+        Returns:
+            tuple: (graph, signatures) where graph is an upper-triangular CSR matrix of similarities
+        """
+        n = len(texts)
+        signatures = self.signatures(texts, progress)
+        left, right = self.candidate_pairs(signatures)
+        similarities = self.estimate_similarity(signatures, left, right)
+
+        keep = similarities > threshold
+        graph = sparse.csr_matrix((similarities[keep], (left[keep], right[keep])), shape=(n, n))
+
+        logger.info(f"MinHash LSH: {len(left)} candidate pairs, {graph.nnz} above threshold for {n} texts")
+        return graph, signatures
+
+    def signature_vectors(self, signatures, rows):
+        """
+        Encode signatures as unit vectors whose dot product is the estimated Jaccard similarity
+
+        Args:
+            signatures: MinHash signatures from signatures()
+            rows: Rows to encode (other rows stay empty, keeping memory proportional to rows)
+
+        Returns:
+            scipy.sparse.csr_matrix: (n, d) one-hot encoding of (hash function, value) pairs
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        keys = signatures[rows].astype(np.uint64) * np.uint64(self.num_perm) + np.arange(self.num_perm, dtype=np.uint64)
+        _, columns = np.unique(keys.ravel(), return_inverse=True)
+
+        return sparse.csr_matrix(
+            (np.full(columns.size, 1 / np.sqrt(self.num_perm)), (np.repeat(rows, self.num_perm), columns.ravel())),
+            shape=(signatures.shape[0], int(columns.max()) + 1 if columns.size else 0)
+        )
+
+    def _chunk_signatures(self, texts, out):
+        """Fill out with the signatures of a chunk of normalized texts"""
+        k = self.shingle_size
+        lengths = np.array([len(text) for text in texts], dtype=np.int64)
+        present = np.flatnonzero(lengths > 0)
+        if not len(present):
+            return
+
+        # Code points of the whole chunk in one array, one rolling hash per position
+        codes = np.frombuffer(''.join(texts).encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+        window_count = len(codes) - k + 1
+        hashes = np.zeros(window_count, dtype=np.uint64)
+        for offset in range(k):
+            hashes = hashes * _SHINGLE_BASE + codes[offset:offset + window_count]
+        hashes ^= hashes >> np.uint64(29)
+
+        # Shingles that start and end inside the same text
+        starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])[present]
+        counts = lengths[present] - k + 1
+        positions = np.repeat(starts - np.concatenate([[0], np.cumsum(counts)[:-1]]), counts) + np.arange(counts.sum())
+        shingle_hashes = hashes[positions]
+        segment_starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+        for perm in range(self.num_perm):
+            permuted = (self._hash_a[perm] * shingle_hashes + self._hash_b[perm]) >> np.uint64(32)
+            out[present, perm] = np.minimum.reduceat(permuted, segment_starts)
+
+    def _normalize(self, text):
+        """Case-fold and collapse whitespace, padding short texts to one full shingle"""
+        text = ' '.join(str(text).lower().split()) if text else ''
+        return text.ljust(self.shingle_size, '\0') if text else ''
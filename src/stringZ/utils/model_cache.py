@@ -0,0 +1,196 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import stat
+import tempfile
+
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+
+def default_cache_dir():
+    """Per-user cache folder (under XDG_CACHE_HOME, or ~/.cache)"""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'stringz', 'vectorizers')
+
+
+def ensure_private_dir(path):
+    """
+    Create a directory only the current user can access, or check an existing one.
+    Cache entries are unpickled, so a folder anyone else can write to (or own) is refused.
+
+    Args:
+        path: Directory path
+
+    Raises:
+        PermissionError: The directory is a symlink, belongs to another user, or cannot be made private
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if not hasattr(os, 'getuid'):
+        # No POSIX ownership (Windows): user folders are private by their ACLs
+        return
+
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode):
+        raise PermissionError(f"Cache path {path} is a symlink or not a directory")
+    if info.st_uid != os.getuid():
+        raise PermissionError(f"Cache directory {path} belongs to another user")
+    if stat.S_IMODE(info.st_mode) & 0o077:
+        os.chmod(path, 0o700)
+
+
+class VectorizerCache:
+    """On-disk cache of fitted vectorizers and their transformed CSR matrices.
+    Entries are keyed by a fingerprint of the corpus and the vectorizer parameters,
+    and the least recently used entries are evicted once the cache exceeds max_bytes"""
+
+    MODEL_SUFFIX = ".vectorizer.pkl"
+    MATRIX_SUFFIX = ".matrix.npz"
+
+    def __init__(self, cache_dir=None, max_bytes=512 * 1024 * 1024):
+        """
+        Args:
+            cache_dir: Directory for cache files (defaults to default_cache_dir())
+            max_bytes: Maximum total size of the cache on disk
+
+        Raises:
+            PermissionError: cache_dir is not private to the current user (see ensure_private_dir)
+        """
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        ensure_private_dir(self.cache_dir)
+
+    @staticmethod
+    def fingerprint(texts, params):
+        """
+        Hash a corpus together with the vectorizer parameters
+
+        Args:
+            texts: Cleaned texts the vectorizer is fitted on
+            params: Vectorizer parameters (e.g. from get_params())
+
+        Returns:
+            str: Hex digest used as the cache key
+        """
+        digest = hashlib.sha256()
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode('utf-8'))
+        for text in texts:
+            digest.update(b'\0')
+            digest.update(text.encode('utf-8'))
+        return digest.hexdigest()
+
+    def load(self, key):
+        """
+        Load a cached vectorizer and matrix
+
+        Args:
+            key: Fingerprint from fingerprint()
+
+        Returns:
+            tuple: (vectorizer, matrix), or None when the entry is missing or unreadable
+        """
+        model_path, matrix_path = self._paths(key)
+        if not os.path.exists(model_path) or not os.path.exists(matrix_path):
+            return None
+
+        try:
+            with open(model_path, 'rb') as f:
+                vectorizer = pickle.load(f)
+            matrix = sparse.load_npz(matrix_path).tocsr()
+
+            # Mark as recently used for LRU eviction
+            for path in (model_path, matrix_path):
+                os.utime(path)
+
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {key[:12]}: {str(e)}")
+            self._remove(key)
+            return None
+
+        logger.info(f"Loaded fitted vectorizer from cache ({key[:12]})")
+        return vectorizer, matrix
+
+    def save(self, key, vectorizer, matrix):
+        """
+        Store a fitted vectorizer and its matrix, then evict old entries if needed
+
+        Args:
+            key: Fingerprint from fingerprint()
+            vectorizer: Fitted vectorizer
+            matrix: Sparse matrix produced by the vectorizer
+        """
+        model_path, matrix_path = self._paths(key)
+
+        writers = (
+            (model_path, lambda f: pickle.dump(vectorizer, f, protocol=pickle.HIGHEST_PROTOCOL)),
+            (matrix_path, lambda f: sparse.save_npz(f, sparse.csr_matrix(matrix)))
+        )
+        temp_path = None
+
+        try:
+            # Write to temporary files first so readers never see partial entries
+            for path, write in writers:
+                with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix=".tmp", delete=False) as f:
+                    temp_path = f.name
+                    write(f)
+                os.replace(temp_path, path)
+                temp_path = None
+
+        except Exception as e:
+            logger.warning(f"Could not write cache entry {key[:12]}: {str(e)}")
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+            self._remove(key)
+            return
+
+        logger.info(f"Saved fitted vectorizer to cache ({key[:12]})")
+        self._evict()
+
+    def clear(self):
+        """Remove every cache entry"""
+        for key in self._entries():
+            self._remove(key)
+
+    def _entries(self):
+        """Keys of all entries currently on disk"""
+        return {
+            name[:-len(self.MODEL_SUFFIX)]
+            for name in os.listdir(self.cache_dir)
+            if name.endswith(self.MODEL_SUFFIX)
+        }
+
+    def _evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for key in self._entries():
+            paths = [path for path in self._paths(key) if os.path.exists(path)]
+            if paths:
+                entries.append((
+                    max(os.path.getmtime(path) for path in paths),
+                    sum(os.path.getsize(path) for path in paths),
+                    key
+                ))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+            logger.info(f"Evicted cache entry {key[:12]} ({size} bytes)")
+
+    def _paths(self, key):
+        return (
+            os.path.join(self.cache_dir, key + self.MODEL_SUFFIX),
+            os.path.join(self.cache_dir, key + self.MATRIX_SUFFIX)
+        )
+
+    def _remove(self, key):
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,89 @@
+import logging
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessingCancelled(Exception):
+    """Raised inside the pipeline when the caller asked to cancel"""
+
+
+class ProgressReporter:
+    """Progress and cancellation protocol shared by the processing stages.
+
+    Stages call start() once and update() from their inner loops; update() is cheap
+    enough to call on every row because it only looks at the clock every `stride`
+    rows and only invokes the callback every `interval` seconds. The callback
+    receives (stage, done, total, eta_seconds). Cancellation is polled at the same
+    points and surfaces as ProcessingCancelled.
+    """
+
+    def __init__(self, callback: Optional[Callable[[str, int, int, Optional[float]], None]] = None,
+                 should_cancel: Optional[Callable[[], bool]] = None,
+                 interval: float = 0.25, stride: int = 256):
+        """
+        Args:
+            callback: Called with (stage, done, total, eta_seconds) at bounded intervals
+            should_cancel: Returns True when processing must stop
+            interval: Minimum seconds between two callback calls
+            stride: Rows between two clock/cancellation checks
+        """
+        self.callback = callback
+        self.should_cancel = should_cancel
+        self.interval = interval
+        self.stride = max(1, stride)
+
+        self.stage = None
+        self.total = 0
+        self._started = 0.0
+        self._last_report = 0.0
+        self._next_check = 0
+
+    @classmethod
+    def ensure(cls, progress: Optional["ProgressReporter"]) -> "ProgressReporter":
+        """The given reporter, or a silent one so callers never need None checks"""
+        return progress if progress is not None else cls()
+
+    @property
+    def enabled(self) -> bool:
+        return self.callback is not None or self.should_cancel is not None
+
+    def start(self, stage: str, total: int) -> None:
+        """Begin a stage of `total` rows and report it at 0"""
+        self.stage = stage
+        self.total = max(0, int(total))
+        self._started = time.monotonic()
+        self._next_check = self.stride
+        self._report(0, force=True)
+
+    def update(self, done: int) -> None:
+        """Report that `done` rows of the current stage are finished"""
+        if done < self._next_check or not self.enabled:
+            return
+        self._next_check = done + self.stride
+        self._report(done)
+
+    def finish(self) -> None:
+        """Report the current stage as complete"""
+        self._report(self.total, force=True)
+
+    def check_cancelled(self) -> None:
+        """Raise ProcessingCancelled when the caller asked to stop"""
+        if self.should_cancel is not None and self.should_cancel():
+            logger.info(f"Processing cancelled during {self.stage}")
+            raise ProcessingCancelled(f"Processing cancelled during {self.stage}")
+
+    def _report(self, done: int, force: bool = False) -> None:
+        self.check_cancelled()
+        if self.callback is None:
+            return
+
+        now = time.monotonic()
+        if not force and now - self._last_report < self.interval:
+            return
+        self._last_report = now
+
+        elapsed = now - self._started
+        eta = elapsed / done * (self.total - done) if 0 < done <= self.total else None
+        self.callback(self.stage, done, self.total, eta)
@@ -0,0 +1,173 @@
+import logging
+import time
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Trigrams are hashed into 2**HASH_BITS posting lists; collisions only add candidates,
+# which the substring check removes
+HASH_BITS = 20
+NGRAM = 3
+
+# Rows indexed per batch (bounds the temporary trigram arrays)
+BATCH_ROWS = 16384
+
+# Separator between the fields of a row; never part of a query
+SEPARATOR = '\x00'
+
+
+class SearchIndex:
+    """Case-insensitive substring search over the text fields of a table.
+    Every row is lowercased once and its trigrams go into an inverted index of
+    hashed trigram -> sorted row ids. A query intersects the posting lists of its
+    trigrams, starting from the shortest, and checks only the surviving rows for the
+    actual substring. Queries shorter than a trigram are matched with vectorised byte
+    comparisons over the UTF-8 text of all rows instead. Named boolean filters
+    (bitmaps) are stored next to the index, so queries and filters resolve to sorted
+    row-id arrays without touching the data."""
+
+    def __init__(self, fields: Dict[str, Sequence], filters: Optional[Dict[str, np.ndarray]] = None):
+        """
+        Args:
+            fields: Text columns to search, name -> values (strings or None), all of the same length
+            filters: Optional name -> boolean array of the same length
+        """
+        start = time.time()
+        columns = [np.asarray(values, dtype=object) for values in fields.values()]
+        self.num_rows = len(columns[0]) if columns else 0
+
+        self.documents = np.empty(self.num_rows, dtype=object)
+        self.documents[:] = [
+            SEPARATOR.join('' if value is None else str(value) for value in row).lower()
+            for row in zip(*columns)
+        ]
+        self.offsets, self.rows = _build_postings(self.documents)
+
+        # Every row followed by a separator, as UTF-8 bytes, with the first byte of each row
+        encoded = [(document + SEPARATOR).encode('utf-8') for document in self.documents]
+        self._bytes = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        lengths = np.fromiter((len(row) for row in encoded), dtype=np.int64, count=len(encoded))
+        self._starts = np.concatenate(([0], np.cumsum(lengths)[:-1])) if len(encoded) else lengths
+
+        self.filters = {name: np.asarray(bitmap, dtype=bool) for name, bitmap in (filters or {}).items()}
+        logger.info(
+            f"Indexed {self.num_rows} rows ({len(self.rows)} postings) in {time.time() - start:.2f}s"
+        )
+
+    def __len__(self):
+        return self.num_rows
+
+    def search(self, query: str = '', filter_name: Optional[str] = None) -> np.ndarray:
+        """
+        Rows containing the query (case-insensitive) in any field and passing the filter
+
+        Args:
+            query: Text to find; empty matches every row
+            filter_name: Name of a filter bitmap, or None/unknown for no filter
+
+        Returns:
+            np.ndarray: Sorted row ids
+        """
+        query = query.lower()
+        bitmap = self.filters.get(filter_name)
+
+        if not query:
+            return np.flatnonzero(bitmap) if bitmap is not None else np.arange(self.num_rows)
+
+        if len(query) < NGRAM:
+            rows = self._scan(query)
+        else:
+            rows = self._candidates(query)
+            if bitmap is not None:
+                # Cheaper to drop filtered rows before the substring check
+                rows = rows[bitmap[rows]]
+                bitmap = None
+            documents = self.documents[rows]
+            rows = rows[np.fromiter((query in document for document in documents), dtype=bool, count=len(rows))]
+
+        if bitmap is not None:
+            rows = rows[bitmap[rows]]
+        return rows
+
+    def count(self, rows: np.ndarray, filter_name: str) -> int:
+        """Number of the given rows that pass a filter"""
+        bitmap = self.filters.get(filter_name)
+        return int(np.count_nonzero(bitmap[rows])) if bitmap is not None else 0
+
+    def _scan(self, query: str) -> np.ndarray:
+        """Rows containing a (short) query, by comparing it against every byte offset"""
+        pattern = np.frombuffer(query.encode('utf-8'), dtype=np.uint8)
+        size = len(self._bytes) - len(pattern) + 1
+        if self.num_rows == 0 or size <= 0:
+            return np.zeros(0, dtype=np.int64)
+
+        hits = np.zeros(len(self._bytes), dtype=bool)
+        hits[:size] = self._bytes[:size] == pattern[0]
+        for i in range(1, len(pattern)):
+            hits[:size] &= self._bytes[i:size + i] == pattern[i]
+        # Matches never span rows: rows end with a separator the query cannot contain
+        return np.flatnonzero(np.logical_or.reduceat(hits, self._starts))
+
+    def _candidates(self, query: str) -> np.ndarray:
+        """Rows holding every trigram of the query (a superset of the matches)"""
+        buckets = np.unique(_trigram_buckets(_codepoints(query)))
+        lists = sorted(
+            (self.rows[self.offsets[bucket]:self.offsets[bucket + 1]] for bucket in buckets),
+            key=len
+        )
+        rows = lists[0]
+        for postings in lists[1:]:
+            if len(rows) == 0:
+                break
+            rows = np.intersect1d(rows, postings, assume_unique=True)
+        return rows
+
+
+def _codepoints(text: str) -> np.ndarray:
+    return np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+
+
+def _trigram_buckets(codepoints: np.ndarray) -> np.ndarray:
+    """Hash bucket of every trigram of a codepoint array"""
+    codes = codepoints.astype(np.uint64)
+    trigrams = (codes[:-2] << np.uint64(42)) | (codes[1:-1] << np.uint64(21)) | codes[2:]
+    # Fibonacci hashing: the top bits of a multiplicative hash
+    return ((trigrams * np.uint64(0x9E3779B97F4A7C15)) >> np.uint64(64 - HASH_BITS)).astype(np.int64)
+
+
+def _build_postings(documents: np.ndarray):
+    """
+    CSR inverted index: rows[offsets[b]:offsets[b + 1]] are the sorted rows with a
+    trigram in bucket b. Built in row batches; each batch is vectorised over the
+    concatenated codepoints of its documents.
+    """
+    separator = np.uint32(0)
+    batches = []
+    for start in range(0, len(documents), BATCH_ROWS):
+        batch = documents[start:start + BATCH_ROWS]
+        codepoints = _codepoints(SEPARATOR.join(batch) + SEPARATOR)
+        lengths = np.fromiter((len(document) + 1 for document in batch), dtype=np.int64, count=len(batch))
+        row_of = np.repeat(np.arange(start, start + len(batch), dtype=np.int64), lengths)
+
+        if len(codepoints) < NGRAM:
+            continue
+        buckets = _trigram_buckets(codepoints)
+        # Trigrams across a field or row boundary contain the separator
+        valid = (codepoints[:-2] != separator) & (codepoints[1:-1] != separator) & (codepoints[2:] != separator)
+        keys = np.sort((buckets[valid] << 32) | row_of[:-2][valid])
+        # Unique (bucket, row) pairs
+        batches.append(keys[np.concatenate(([True], keys[1:] != keys[:-1]))])
+
+    if not batches:
+        return np.zeros((1 << HASH_BITS) + 1, dtype=np.int64), np.zeros(0, dtype=np.int32)
+
+    keys = np.concatenate(batches)
+    # Batches are in row order, so a stable sort by bucket keeps every posting list sorted
+    buckets = keys >> 32
+    order = np.argsort(buckets, kind='stable')
+    rows = (keys[order] & 0xFFFFFFFF).astype(np.int32)
+    offsets = np.zeros((1 << HASH_BITS) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(buckets, minlength=1 << HASH_BITS), out=offsets[1:])
+    return offsets, rows
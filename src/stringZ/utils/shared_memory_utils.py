@@ -0,0 +1,74 @@
+import numpy as np
+from multiprocessing import shared_memory
+from scipy import sparse
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SharedCSRMatrix:
+    """CSR matrix whose data, indices and indptr arrays live in shared memory.
+    The owning process creates it from a matrix; worker processes attach to it from
+    its handle and get a zero-copy CSR view instead of a pickled copy"""
+
+    def __init__(self, matrix):
+        """
+        Args:
+            matrix: Sparse matrix to copy into shared memory
+        """
+        matrix = sparse.csr_matrix(matrix)
+        self.shape = matrix.shape
+        self._blocks = []
+
+        try:
+            for array in (matrix.data, matrix.indices, matrix.indptr):
+                # Zero-sized segments are not allowed, empty arrays still get one byte
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+                self._blocks.append((block, array.dtype.str, array.shape[0]))
+        except Exception:
+            self.close()
+            raise
+
+    @property
+    def handle(self):
+        """Picklable description used by attach()"""
+        return (self.shape, [(block.name, dtype, length) for block, dtype, length in self._blocks])
+
+    @staticmethod
+    def attach(handle):
+        """
+        Attach to a shared matrix created in another process
+
+        Args:
+            handle: SharedCSRMatrix.handle of the owning process
+
+        Returns:
+            tuple: (matrix, blocks) - the blocks must be kept alive as long as the matrix is used
+        """
+        shape, specs = handle
+        blocks, arrays = [], []
+
+        for name, dtype, length in specs:
+            block = shared_memory.SharedMemory(name=name)
+            blocks.append(block)
+            arrays.append(np.ndarray((length,), dtype=np.dtype(dtype), buffer=block.buf))
+
+        data, indices, indptr = arrays
+        return sparse.csr_matrix((data, indices, indptr), shape=shape, copy=False), blocks
+
+    def close(self):
+        """Release and unlink the shared memory (owner only)"""
+        for block, _, _ in self._blocks:
+            try:
+                block.close()
+                block.unlink()
+            except FileNotFoundError:
+                pass
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
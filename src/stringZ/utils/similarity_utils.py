@@ -1,58 +1,209 @@
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import logging
 
+from .model_cache import VectorizerCache
+from .hashing_utils import HashingTextVectorizer
+from .shared_memory_utils import SharedCSRMatrix
+from .progress_utils import ProgressReporter, ProcessingCancelled
+from .text_utils import clean_text
+
 logger = logging.getLogger(__name__)
 
 
 class SimilarityCalculator:
-    """Calculate text similarity using TF-IDF and cosine similarity.
+    """Calculate text similarity using TF-IDF (or hashed n-gram) vectors and cosine similarity.
     Necessary as replacement of Spacy (too large of a model to run fast)"""
     
-    def __init__(self):
-        """Initialize the similarity calculator"""
-        self.vectorizer = TfidfVectorizer(
-            lowercase=True,
-            stop_words='english',
-            ngram_range=(1, 2),  # Use unigrams and bigrams
-            max_features=5000,   # Limit features for performance
-            min_df=1,            # Minimum document frequency
-            max_df=0.95          # Maximum document frequency
-        )
-        logger.info("Initialized TF-IDF based similarity calculator")
+    def __init__(self, cache=None, backend="tfidf", workers=1):
+        """
+        Initialize the similarity calculator
+        
+        Args:
+            cache: Optional VectorizerCache so fitted models are reused across runs
+            backend: "tfidf" (fitted vocabulary) or "hashing" (stateless feature hashing)
+            workers: Processes used for neighbour search (and vectorizing with the hashing backend)
+        """
+        self.cache = cache
+        self.backend = backend
+        self.workers = workers
+        self.fitted = False
+        
+        if backend == "hashing":
+            self.vectorizer = HashingTextVectorizer(workers=workers)
+        else:
+            self.vectorizer = TfidfVectorizer(
+                lowercase=True,
+                stop_words='english',
+                ngram_range=(1, 2),  # Use unigrams and bigrams
+                max_features=5000,   # Limit features for performance
+                min_df=1,            # Minimum document frequency
+                max_df=0.95          # Maximum document frequency
+            )
+        logger.info(f"Initialized {backend} based similarity calculator")
     
-    def calculate_similarity_matrix(self, texts):
+    def vectorize(self, texts, cleaned=False):
         """
-        Calculate similarity matrix for a list of texts
+        Fit the vectorizer and convert texts to TF-IDF vectors
         
         Args:
-            texts: List of strings to compare
+            texts: List of strings to vectorize
+            cleaned: The texts already went through clean_text (e.g. TranslationEntry.cleaned_source)
             
         Returns:
-            numpy.ndarray: Similarity matrix where entry [i,j] is similarity between texts[i] and texts[j]
+            scipy.sparse.csr_matrix: L2-normalized TF-IDF row vectors
+            (texts without usable terms, e.g. only stop words, get empty vectors)
         """
-        if not texts or len(texts) < 2:
-            return np.array([[1.0]])
+        cleaned_texts = list(texts) if cleaned else [self._clean_text(text) for text in texts]
+        
+        # Fit on every distinct text once, in a fixed order, so the model only depends on the corpus content
+        unique_texts = sorted(set(cleaned_texts))
         
         try:
-            # Clean and prepare texts
-            cleaned_texts = [self._clean_text(text) for text in texts]
+            unique_matrix = self._fit_transform(unique_texts)
             
-            # Convert texts to TF-IDF vectors
-            tfidf_matrix = self.vectorizer.fit_transform(cleaned_texts)
+        except ValueError as e:
+            logger.error(f"Error vectorizing texts: {str(e)}")
+            return sparse.csr_matrix((len(texts), 0))
+        
+        positions = {text: i for i, text in enumerate(unique_texts)}
+        return unique_matrix[[positions[text] for text in cleaned_texts]]
+    
+    def transform(self, texts, cleaned=False):
+        """
+        Convert texts to vectors with the already fitted vectorizer (no refit)
+        
+        Args:
+            texts: List of strings to vectorize
+            cleaned: The texts already went through clean_text
             
-            # Calculate cosine similarity
-            similarity_matrix = cosine_similarity(tfidf_matrix)
+        Returns:
+            scipy.sparse.csr_matrix: L2-normalized TF-IDF row vectors
+        """
+        return self.vectorizer.transform(list(texts) if cleaned else [self._clean_text(text) for text in texts])
+    
+    def partial_fit(self, texts):
+        """
+        Add new texts to the model without refitting (hashing backend only)
+        
+        Args:
+            texts: List of strings to add to the streaming IDF statistics
+        """
+        if self.backend != "hashing":
+            raise ValueError("partial_fit is only supported by the hashing backend")
+        
+        self.vectorizer.partial_fit([self._clean_text(text) for text in texts])
+        self.fitted = True
+    
+    @property
+    def is_fitted(self):
+        # The hashing feature space needs no fitting, only its optional IDF weights do
+        return self.fitted or (self.backend == "hashing" and not self.vectorizer.use_idf)
+    
+    def _fit_transform(self, texts):
+        """Fit and transform, going through the vectorizer cache when one is configured"""
+        if self.cache is None:
+            matrix = self.vectorizer.fit_transform(texts)
+            self.fitted = True
+            return matrix
+        
+        key = self.cache.fingerprint(texts, self.vectorizer.get_params())
+        cached = self.cache.load(key)
+        if cached is not None:
+            self.vectorizer, matrix = cached
+            self.fitted = True
+            return matrix
+        
+        matrix = self.vectorizer.fit_transform(texts)
+        self.fitted = True
+        self.cache.save(key, self.vectorizer, matrix)
+        return matrix
+    
+    def similarity_matrix(self, vectors):
+        """
+        Calculate the dense similarity matrix of already vectorized texts
+        
+        Args:
+            vectors: Row vectors from vectorize()
             
-            logger.info(f"Calculated similarity matrix for {len(texts)} texts")
-            return similarity_matrix
+        Returns:
+            numpy.ndarray: Similarity matrix where entry [i,j] is similarity between rows i and j
+        """
+        try:
+            return cosine_similarity(vectors)
             
         except Exception as e:
             logger.error(f"Error calculating similarity matrix: {str(e)}")
             # Fallback to identity matrix
-            n = len(texts)
-            return np.eye(n)
+            return np.eye(vectors.shape[0])
+    
+    def similarity_graph(self, vectors, threshold, top_k=20, chunk_size=1000, progress=None):
+        """
+        Calculate the sparse top-k neighbour graph of already vectorized texts
+        
+        Args:
+            vectors: Row vectors from vectorize()
+            threshold: Only similarities above this value are kept
+            top_k: Maximum neighbours kept per text
+            chunk_size: Rows multiplied at once (bounds peak memory)
+            progress: Optional ProgressReporter, updated with the rows done
+            
+        Returns:
+            scipy.sparse.csr_matrix: Graph where entry [i,j] is similarity of a neighbour j of row i
+        """
+        n = vectors.shape[0]
+        
+        try:
+            graph = top_k_similarity_graph(vectors, threshold, top_k, chunk_size, self.workers, progress)
+            logger.info(f"Calculated similarity graph for {n} texts ({graph.nnz} edges)")
+            return graph
+            
+        except ProcessingCancelled:
+            raise
+        except Exception as e:
+            logger.error(f"Error calculating similarity graph: {str(e)}")
+            # Fallback to a graph without edges
+            return sparse.csr_matrix((n, n))
+    
+    def calculate_similarity_matrix(self, texts):
+        """
+        Calculate similarity matrix for a list of texts
+        
+        Args:
+            texts: List of strings to compare
+            
+        Returns:
+            numpy.ndarray: Similarity matrix where entry [i,j] is similarity between texts[i] and texts[j]
+        """
+        if not texts or len(texts) < 2:
+            return np.array([[1.0]])
+        
+        similarity_matrix = self.similarity_matrix(self.vectorize(texts))
+        logger.info(f"Calculated similarity matrix for {len(texts)} texts")
+        return similarity_matrix
+    
+    def calculate_similarity_graph(self, texts, threshold, top_k=20, chunk_size=1000):
+        """
+        Calculate a sparse top-k neighbour graph for a list of texts
+        
+        Args:
+            texts: List of strings to compare
+            threshold: Only similarities above this value are kept
+            top_k: Maximum neighbours kept per text
+            chunk_size: Rows multiplied at once (bounds peak memory)
+            
+        Returns:
+            scipy.sparse.csr_matrix: Graph where entry [i,j] is similarity of a neighbour j of texts[i]
+        """
+        n = len(texts)
+        if n < 2:
+            return sparse.csr_matrix((n, n))
+        
+        return self.similarity_graph(self.vectorize(texts), threshold, top_k, chunk_size)
     
     def calculate_pairwise_similarity(self, text1, text2):
         """
@@ -66,6 +217,11 @@ class SimilarityCalculator:
             float: Similarity score between 0 and 1
         """
         try:
+            # Reuse the fitted model when there is one, refitting on two texts is slow and unreliable
+            if self.is_fitted:
+                vectors = self.transform([text1, text2])
+                return float(vectors[0].multiply(vectors[1]).sum())
+            
             # Use the matrix calculation for consistency
             matrix = self.calculate_similarity_matrix([text1, text2])
             return float(matrix[0, 1])
@@ -76,30 +232,228 @@ class SimilarityCalculator:
     
     def _clean_text(self, text):
         """Clean and normalize text for better similarity calculation"""
-        if not text:
-            return ""
-        
-        # Convert to string and clean
-        text = str(text).strip()
+        return clean_text(text)
+
+
+def top_k_similarity_graph(vectors, threshold, top_k=20, chunk_size=1000, workers=1, progress=None):
+    """
+    Find the top-k most similar rows of each row using chunked sparse products.
+    Only chunk_size rows of the similarity matrix exist at any time (per worker), so
+    memory stays bounded by the chunk size plus k neighbours per row.
+    
+    Args:
+        vectors: L2-normalized sparse row vectors (e.g. a TF-IDF CSR matrix)
+        threshold: Only similarities above this value are kept
+        top_k: Maximum neighbours kept per row (None or 0 keeps all)
+        chunk_size: Rows multiplied at once
+        workers: Processes the row blocks are spread over (1 computes in this process)
+        progress: Optional ProgressReporter, updated after every block
         
-        # Remove common game/UI patterns that might interfere
-        import re
+    Returns:
+        scipy.sparse.csr_matrix: n x n graph, row i holds the neighbours of row i (self excluded)
+    """
+    vectors = sparse.csr_matrix(vectors)
+    n = vectors.shape[0]
+    transposed = vectors.T.tocsr()
+    blocks = [(start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)]
+    
+    progress = ProgressReporter.ensure(progress)
+    
+    if workers > 1 and len(blocks) > 1:
+        parts = _parallel_top_k_blocks(vectors, transposed, blocks, threshold, top_k, workers, progress)
+    else:
+        parts = []
+        for start, stop in blocks:
+            parts.append(_top_k_block(vectors, transposed, start, stop, threshold, top_k))
+            progress.update(stop)
+    
+    if not parts:
+        return sparse.csr_matrix((n, n))
+    
+    rows, cols, data = (np.concatenate(arrays) for arrays in zip(*parts))
+    graph = sparse.csr_matrix((data, (rows, cols)), shape=(n, n))
+    graph.sort_indices()
+    return graph
+
+
+def _top_k_block(vectors, transposed, start, stop, threshold, top_k):
+    """Top-k neighbours of rows start:stop as (rows, cols, data) arrays"""
+    block = vectors[start:stop] @ transposed
+    
+    # Drop weak pairs before expanding to coordinates
+    block.data[block.data <= threshold] = 0
+    block.eliminate_zeros()
+    block = block.tocoo()
+    
+    rows = block.row.astype(np.int64) + start
+    cols = block.col.astype(np.int64)
+    data = block.data
+    
+    keep = rows != cols
+    rows, cols, data = rows[keep], cols[keep], data[keep]
+    
+    if top_k and len(data):
+        # Rank neighbours within each row: best score first, lowest column on ties
+        order = np.lexsort((cols, -data, rows))
+        rows, cols, data = rows[order], cols[order], data[order]
+        rank = np.arange(len(rows)) - np.searchsorted(rows, rows, side='left')
+        keep = rank < top_k
+        rows, cols, data = rows[keep], cols[keep], data[keep]
+    
+    return rows, cols, data
+
+
+def _parallel_top_k_blocks(vectors, transposed, blocks, threshold, top_k, workers, progress):
+    """Compute row blocks in a process pool, sharing both CSR matrices through shared memory"""
+    with SharedCSRMatrix(vectors) as shared_vectors, SharedCSRMatrix(transposed) as shared_transposed:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(blocks)),
+            initializer=_init_top_k_worker,
+            initargs=(shared_vectors.handle, shared_transposed.handle)
+        ) as executor:
+            starts, stops = zip(*blocks)
+            count = len(blocks)
+            parts = []
+            
+            try:
+                results = executor.map(_top_k_worker_block, starts, stops, [threshold] * count, [top_k] * count)
+                for stop, part in zip(stops, results):
+                    parts.append(part)
+                    progress.update(stop)
+            except ProcessingCancelled:
+                # Do not wait for the queued blocks
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+            
+            return parts
+
+
+# Matrices attached once per worker process by _init_top_k_worker
+_worker_matrices = {}
+
+
+def _init_top_k_worker(vectors_handle, transposed_handle):
+    _worker_matrices['vectors'], vector_blocks = SharedCSRMatrix.attach(vectors_handle)
+    _worker_matrices['transposed'], transposed_blocks = SharedCSRMatrix.attach(transposed_handle)
+    _worker_matrices['blocks'] = vector_blocks + transposed_blocks
+
+
+def _top_k_worker_block(start, stop, threshold, top_k):
+    return _top_k_block(
+        _worker_matrices['vectors'], _worker_matrices['transposed'], start, stop, threshold, top_k
+    )
+
+
+def upper_triangular_graph(similarity, threshold=None):
+    """
+    Convert a similarity matrix or neighbour graph into a symmetric upper-triangular graph
+    
+    Args:
+        similarity: Dense similarity matrix or sparse neighbour graph
+        threshold: For dense input, only similarities above this value become edges
         
-        # Remove color tags
-        text = re.sub(r'<color="[^"]*">(.*?)</color>', r'\1', text)
+    Returns:
+        scipy.sparse.csr_matrix: Graph where row i holds the neighbours j > i, sorted by j
+    """
+    if sparse.issparse(similarity):
+        graph = sparse.triu(similarity.maximum(similarity.T), k=1, format='csr')
+    else:
+        similarity = np.asarray(similarity)
+        graph = sparse.csr_matrix(np.where(np.triu(similarity > threshold, k=1), similarity, 0.0))
+    
+    graph.sort_indices()
+    return graph
+
+
+def cluster_similarity_graph(graph, threshold, max_cluster_size, step=0.05):
+    """
+    Cluster a similarity graph into connected components of bounded size.
+    Components larger than max_cluster_size are split by raising the edge threshold
+    for their edges only, until they break apart; anything still too large at a
+    similarity of 1.0 (identical texts) is cut into consecutive chunks.
+    
+    Args:
+        graph: Sparse similarity graph (any orientation, symmetrized here)
+        threshold: Only edges above this value connect rows
+        max_cluster_size: Maximum rows per cluster
+        step: Threshold increase per split round
         
-        # Remove other HTML-like tags
-        text = re.sub(r'<[^>]+>', '', text)
+    Returns:
+        numpy.ndarray: Cluster label for every row (deterministic for a given graph)
+    """
+    n = graph.shape[0]
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    
+    edges = sparse.triu(graph.maximum(graph.T), k=1).tocoo()
+    keep = edges.data > threshold
+    rows, cols, weights = edges.row[keep], edges.col[keep], edges.data[keep]
+    labels = _component_labels(n, rows, cols)
+    
+    current = threshold
+    while True:
+        oversized = np.bincount(labels)[labels] > max_cluster_size
+        current += step
+        if not oversized.any() or current >= 1.0:
+            break
         
-        # Replace multiple spaces with single space
-        text = re.sub(r'\s+', ' ', text)
+        # Only edges inside oversized components are cut, other components keep their edges
+        keep = ~oversized[rows] | (weights > current)
+        rows, cols, weights = rows[keep], cols[keep], weights[keep]
+        labels = _component_labels(n, rows, cols)
+    
+    return _split_oversized_labels(labels, max_cluster_size)
+
+
+def label_groups(labels, min_size=2):
+    """
+    Group row indices by cluster label
+    
+    Args:
+        labels: Cluster label for every row
+        min_size: Groups smaller than this are dropped
         
-        return text.strip()
+    Returns:
+        list: Arrays of row indices (ascending) for every label with at least min_size rows
+    """
+    labels = np.asarray(labels)
+    if len(labels) == 0:
+        return []
+    
+    order = np.argsort(labels, kind='stable')
+    boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+    return [group for group in np.split(order, boundaries) if len(group) >= min_size]
+
+
+def _component_labels(n, rows, cols):
+    """Connected component label of every node for an undirected edge list"""
+    adjacency = sparse.csr_matrix((np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=(n, n))
+    _, labels = connected_components(adjacency, directed=False)
+    return labels.astype(np.int64)
+
 
+def _split_oversized_labels(labels, max_cluster_size):
+    """Cut every label group larger than max_cluster_size into chunks in row order"""
+    n = len(labels)
+    order = np.argsort(labels, kind='stable')
+    sorted_labels = labels[order]
+    
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.arange(n) - np.searchsorted(sorted_labels, sorted_labels, side='left')
+    
+    _, split_labels = np.unique(labels * (n + 1) + rank // max_cluster_size, return_inverse=True)
+    return split_labels.ravel()
 
-def create_similarity_calculator():
-    """Factory function to create similarity calculator"""
-    return SimilarityCalculator()
+
+def create_similarity_calculator(cache_dir=None, cache_max_bytes=512 * 1024 * 1024, backend="tfidf", workers=1):
+    """Factory function to create similarity calculator (cached when cache_dir is given)"""
+    cache = None
+    if cache_dir:
+        try:
+            cache = VectorizerCache(cache_dir, cache_max_bytes)
+        except PermissionError as e:
+            logger.warning(f"Vectorizer cache disabled: {str(e)}")
+    return SimilarityCalculator(cache=cache, backend=backend, workers=workers)
 
 
 # Alternative simple similarity function if you need a quick fallback
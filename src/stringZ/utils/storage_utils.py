@@ -0,0 +1,224 @@
+import json
+import os
+import tempfile
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Schema metadata key of the JSON metadata passed to write_table
+METADATA_KEY = b'stringz'
+
+# Column names of DatasetFile; every target language gets a "target:<language>" column
+DATASET_COLUMNS = ['str_id', 'source_text', 'occurrences']
+TARGET_PREFIX = 'target:'
+
+
+def write_table(path: str, data, metadata: Optional[dict] = None) -> str:
+    """
+    Write columns to an uncompressed Arrow IPC file that ColumnarFile memory-maps.
+    The file is written next to path and renamed, so readers never see a partial file.
+
+    Args:
+        path: Target file path
+        data: DataFrame, or dict of column name -> values (text columns: strings or None)
+        metadata: Optional JSON-serialisable dict stored with the schema
+
+    Returns:
+        path
+    """
+    if isinstance(data, pd.DataFrame):
+        data = {str(name): data[name].to_numpy() for name in data.columns}
+    table = pa.table({name: _arrow_column(values) for name, values in data.items()})
+    if metadata is not None:
+        table = table.replace_schema_metadata({METADATA_KEY: json.dumps(metadata).encode('utf-8')})
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=directory, suffix=".tmp", delete=False) as f:
+        temp_path = f.name
+
+    try:
+        with pa.OSFile(temp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    except Exception:
+        os.remove(temp_path)
+        raise
+
+    os.replace(temp_path, path)
+    logger.info(f"Wrote {table.num_rows} rows x {table.num_columns} columns to {path}")
+    return path
+
+
+class ColumnarFile:
+    """Read-only view of a file written by write_table.
+    The file is memory-mapped: opening it only reads the schema, columns and row ranges
+    are zero-copy slices of the mapping, and only the cells a caller asks for are turned
+    into pandas/Python values. Text columns come back as object columns with None for
+    missing values, like the in-memory datasets. Use as a context manager or call close()."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._source = pa.memory_map(path, 'r')
+        try:
+            self.table = pa.ipc.open_file(self._source).read_all()
+        except Exception:
+            self._source.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self.table.num_rows
+
+    def close(self) -> None:
+        self.table = None
+        self._source.close()
+
+    @property
+    def column_names(self) -> List[str]:
+        return self.table.column_names
+
+    @property
+    def metadata(self) -> dict:
+        """The metadata given to write_table ({} when there was none)"""
+        raw = (self.table.schema.metadata or {}).get(METADATA_KEY)
+        return json.loads(raw) if raw else {}
+
+    def column(self, name: str, start: int = 0, stop: Optional[int] = None) -> pa.ChunkedArray:
+        """Arrow column (or row range of it), without copying"""
+        column = self.table.column(name)
+        return column.slice(start, _length(len(self), start, stop))
+
+    def read(self, columns: Optional[Sequence[str]] = None, start: int = 0,
+             stop: Optional[int] = None) -> pd.DataFrame:
+        """
+        DataFrame of some columns over a row range
+
+        Args:
+            columns: Column names (default: all)
+            start: First row
+            stop: Row after the last one (default: the end)
+        """
+        table = self.table.slice(start, _length(len(self), start, stop))
+        return _to_dataframe(table, columns)
+
+    def take(self, rows, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """DataFrame of some columns at the given row positions"""
+        table = self.table.take(pa.array(np.asarray(rows, dtype=np.int64)))
+        return _to_dataframe(table, columns)
+
+
+class DatasetFile(ColumnarFile):
+    """Stored TranslationDatasets over the same rows, one target column per language
+    (what file_utils.read_datasets produces). A single language is read without
+    touching the other target columns."""
+
+    @staticmethod
+    def write(path: str, datasets: Dict[str, "TranslationDataset"]) -> str:
+        """
+        Write datasets to path
+
+        Args:
+            path: Target file path
+            datasets: Dataset per target language, all over the same rows
+
+        Returns:
+            path
+        """
+        datasets = dict(datasets)
+        if not datasets:
+            raise ValueError("No datasets to store")
+
+        first = next(iter(datasets.values()))
+        columns = first.columns
+        data = {
+            'str_id': columns['str_id'].to_numpy(),
+            'source_text': columns['source_text'].to_numpy(),
+            'occurrences': columns['occurrences'].to_numpy()
+        }
+        for language, dataset in datasets.items():
+            if len(dataset) != len(first):
+                raise ValueError(f"Dataset for {language} has {len(dataset)} rows, expected {len(first)}")
+            data[TARGET_PREFIX + str(language)] = dataset.columns['target_text'].to_numpy()
+
+        metadata = {'source_lang': first.source_lang, 'target_langs': list(datasets)}
+        return write_table(path, data, metadata)
+
+    @property
+    def languages(self) -> List:
+        return self.metadata.get('target_langs', [])
+
+    @property
+    def source_lang(self) -> str:
+        return self.metadata.get('source_lang', "EN")
+
+    def target(self, language) -> pa.ChunkedArray:
+        """Arrow target column of a language, without copying"""
+        return self.table.column(self._target_name(language))
+
+    def load(self, language=None) -> "TranslationDataset":
+        """TranslationDataset of one language (default: the first)"""
+        from ..models.data_models import TranslationDataset
+
+        if language is None:
+            language = self.languages[0]
+        columns = self.read(DATASET_COLUMNS + [self._target_name(language)])
+        return TranslationDataset.from_columns(
+            str_ids=columns['str_id'].to_numpy(),
+            source_texts=columns['source_text'].to_numpy(),
+            target_texts=columns[self._target_name(language)].to_numpy(),
+            source_lang=self.source_lang,
+            target_lang=language,
+            occurrences=columns['occurrences'].to_numpy()
+        )
+
+    def load_all(self) -> Dict[str, "TranslationDataset"]:
+        """TranslationDataset per language, sharing ids, source texts and normalised source variants"""
+        languages = self.languages
+        first = self.load(languages[0])
+        datasets = {languages[0]: first}
+        for language in languages[1:]:
+            target = _to_series(self.target(language)).to_numpy()
+            datasets[language] = first.with_target(target, language)
+        return datasets
+
+    def _target_name(self, language) -> str:
+        name = TARGET_PREFIX + str(language)
+        if name not in self.column_names:
+            raise KeyError(f"No target column for {language} in {self.path}")
+        return name
+
+
+def _length(num_rows: int, start: int, stop: Optional[int]) -> int:
+    stop = num_rows if stop is None else min(stop, num_rows)
+    return max(0, stop - start)
+
+
+def _arrow_column(values) -> pa.Array:
+    values = np.asarray(values)
+    if values.dtype == object:
+        # Text columns; NaN (missing in pandas) is stored as null like None
+        return pa.array(values, type=pa.string(), from_pandas=True)
+    return pa.array(values)
+
+
+def _to_series(column: pa.ChunkedArray) -> pd.Series:
+    if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+        # Object column with None for nulls, the layout the datasets use
+        return pd.Series(column.to_numpy(zero_copy_only=False), dtype=object)
+    # Copied, so nothing keeps the mapping alive after close()
+    return pd.Series(np.array(column.to_numpy(zero_copy_only=False)))
+
+
+def _to_dataframe(table: pa.Table, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    names = table.column_names if columns is None else list(columns)
+    return pd.DataFrame({name: _to_series(table.column(name)) for name in names})
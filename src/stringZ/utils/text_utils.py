@@ -0,0 +1,201 @@
+import re
+from typing import Optional, Sequence
+import numpy as np
+import logging
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # Optional: the regex variants fall back to per-text Python regexes
+    pa = None
+    pc = None
+
+logger = logging.getLogger(__name__)
+
+# Compiled once at import instead of on every call
+COLOR_TAG_PATTERN = re.compile(r'<color="[^"]*">(.*?)</color>')
+MARKUP_TAG_PATTERN = re.compile(r'<[^>]+>')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Everything the validators inspect: tags, {skill} variables, [ability] references,
+# literal "\n" sequences and stray token characters
+PLACEHOLDER_PATTERN = re.compile(r'<[^>]*>|\{[^}]*\}|\[[^\]]*\]|\\n|[<>{}\[\]%]')
+PLACEHOLDER_MASK = "\ufffc"
+
+# The same patterns for Arrow's RE2 engine; RE2's \s is ASCII only, so whitespace is
+# spelled out to match exactly what Python's str.isspace() accepts
+_RE2_WHITESPACE = r'[\s\x{0b}\x{1c}-\x{1f}\x{85}\pZ]'
+_RE2_COLOR_TAG = r'<color="[^"]*">(.*?)</color>'
+_RE2_MARKUP_TAG = r'<[^>]+>'
+_RE2_PLACEHOLDER = r'<[^>]*>|\{[^}]*\}|\[[^\]]*\]|\\n|[<>{}\[\]%]'
+
+
+def clean_text(text):
+    """Clean and normalize text for better similarity calculation
+    (markup removed, whitespace collapsed, surrounding whitespace stripped)"""
+    if not text:
+        return ""
+
+    text = str(text).strip()
+
+    # Remove color tags, keeping their content
+    text = COLOR_TAG_PATTERN.sub(r'\1', text)
+
+    # Remove other HTML-like tags
+    text = MARKUP_TAG_PATTERN.sub('', text)
+
+    # Replace multiple spaces with single space
+    text = WHITESPACE_PATTERN.sub(' ', text)
+
+    return text.strip()
+
+
+def mask_placeholders(text):
+    """Stripped text with every tag, variable, reference and token character replaced by PLACEHOLDER_MASK"""
+    if not text:
+        return ""
+    return PLACEHOLDER_PATTERN.sub(PLACEHOLDER_MASK, str(text).strip())
+
+
+class NormalizedColumn:
+    """Normalised variants of one text column.
+    Each variant is computed for the whole column on first access and cached;
+    missing values count as "". The regex variants run as Arrow compute kernels
+    when pyarrow is available. take() carries the computed variants over to a
+    subset of rows, so later stages never normalise the same text twice.
+
+    Variants:
+        stripped: surrounding whitespace removed (deduplication key)
+        lowered: lowercased (alphabetical sort key)
+        folded: stripped and lowercased (substring matching key)
+        cleaned: markup removed and whitespace collapsed, see clean_text (vectorizer input)
+        masked: placeholders masked, see mask_placeholders (validation)
+    """
+
+    VARIANTS = ('stripped', 'lowered', 'folded', 'cleaned', 'masked')
+
+    def __init__(self, texts: Sequence, variants: Optional[dict] = None):
+        """
+        Args:
+            texts: Column values (strings or None)
+            variants: Already computed variants, by name
+        """
+        self.texts = np.asarray(texts, dtype=object)
+        self._variants = dict(variants or {})
+
+    def __len__(self):
+        return len(self.texts)
+
+    def get(self, variant: str) -> np.ndarray:
+        """Object array of the variant, computed on first use"""
+        values = self._variants.get(variant)
+        if values is None:
+            if variant not in self.VARIANTS:
+                raise ValueError(f"Unknown text variant: {variant}")
+            values = self._variants[variant] = getattr(self, f"_compute_{variant}")()
+        return values
+
+    def compute(self, *variants: str) -> "NormalizedColumn":
+        """Compute the given variants (all when none are given) up front"""
+        for variant in variants or self.VARIANTS:
+            self.get(variant)
+        return self
+
+    def computed(self, variant: str) -> Optional[np.ndarray]:
+        """The variant if it was already computed, else None"""
+        return self._variants.get(variant)
+
+    @property
+    def stripped(self) -> np.ndarray:
+        return self.get('stripped')
+
+    @property
+    def lowered(self) -> np.ndarray:
+        return self.get('lowered')
+
+    @property
+    def folded(self) -> np.ndarray:
+        return self.get('folded')
+
+    @property
+    def cleaned(self) -> np.ndarray:
+        return self.get('cleaned')
+
+    @property
+    def masked(self) -> np.ndarray:
+        return self.get('masked')
+
+    @property
+    def has_placeholders(self) -> np.ndarray:
+        """Bool array: the text contains something the placeholder mask replaced"""
+        return self.masked != self.stripped
+
+    def take(self, indices) -> "NormalizedColumn":
+        """Rows at indices, keeping every variant computed so far"""
+        indices = np.asarray(indices, dtype=np.int64)
+        return NormalizedColumn(
+            self.texts[indices],
+            {name: values[indices] for name, values in self._variants.items()}
+        )
+
+    def _filled(self) -> list:
+        return ["" if text is None or text != text else str(text) for text in self.texts.tolist()]
+
+    def _compute_stripped(self) -> np.ndarray:
+        return _object_array([text.strip() for text in self._filled()])
+
+    def _compute_lowered(self) -> np.ndarray:
+        return _object_array([text.lower() for text in self._filled()])
+
+    def _compute_folded(self) -> np.ndarray:
+        # Texts without surrounding whitespace share their lowercased string
+        return _object_array([
+            lowered if stripped is text else stripped.lower()
+            for text, stripped, lowered in zip(self._filled(), self.stripped.tolist(), self.lowered.tolist())
+        ])
+
+    def _compute_cleaned(self) -> np.ndarray:
+        if pc is None:
+            return _object_array([clean_text(text) for text in self._filled()])
+
+        texts = pa.array(self._filled(), type=pa.string())
+        texts = _arrow_strip(texts)
+        texts = pc.replace_substring_regex(texts, _RE2_COLOR_TAG, r'\1')
+        texts = pc.replace_substring_regex(texts, _RE2_MARKUP_TAG, '')
+        texts = pc.replace_substring_regex(texts, _RE2_WHITESPACE + '+', ' ')
+        return _object_array(_arrow_strip(texts).to_numpy(zero_copy_only=False))
+
+    def _compute_masked(self) -> np.ndarray:
+        if pc is None:
+            return _object_array([PLACEHOLDER_PATTERN.sub(PLACEHOLDER_MASK, text) for text in self.stripped.tolist()])
+
+        texts = pa.array(self.stripped.tolist(), type=pa.string())
+        texts = pc.replace_substring_regex(texts, _RE2_PLACEHOLDER, PLACEHOLDER_MASK)
+        return _object_array(texts.to_numpy(zero_copy_only=False))
+
+
+class NormalizedTexts:
+    """Normalised source and target columns of a dataset (see NormalizedColumn)"""
+
+    def __init__(self, source: NormalizedColumn, target: NormalizedColumn):
+        self.source = source
+        self.target = target
+
+    @classmethod
+    def from_columns(cls, source_texts: Sequence, target_texts: Sequence) -> "NormalizedTexts":
+        return cls(NormalizedColumn(source_texts), NormalizedColumn(target_texts))
+
+    def take(self, indices) -> "NormalizedTexts":
+        indices = np.asarray(indices, dtype=np.int64)
+        return NormalizedTexts(self.source.take(indices), self.target.take(indices))
+
+
+def _arrow_strip(texts):
+    """Strip exactly the characters str.strip() removes"""
+    return pc.replace_substring_regex(texts, f'^{_RE2_WHITESPACE}+|{_RE2_WHITESPACE}+$', '')
+
+
+def _object_array(values) -> np.ndarray:
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
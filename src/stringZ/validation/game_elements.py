@@ -12,6 +12,17 @@ MECHANICS_KEYWORDS = [
     "heal", "shield", "stun", "silence", "freeze", "burn", "poison", "bleed"
 ]
 
+# Compiled once instead of on every validated string
+COLOR_TAG_PATTERN = re.compile(r'<color[^>]*>.*?</color>')
+COLOR_VALUE_PATTERN = re.compile(r'<color[=]([^>]+)>')
+COLOR_OPEN_PATTERN = re.compile(r'<color[^>]*>')
+ABILITY_REF_PATTERN = re.compile(r'\[(\d+)\]')
+SKILL_VAR_PATTERN = re.compile(r'\{(skm\d+)\}')
+EXTRA_CLOSE_PATTERN = re.compile(r'</color>>+')
+EXTRA_OPEN_PATTERN = re.compile(r'<color=[^>]*>>[^<]*')
+MALFORMED_ABILITY_PATTERN = re.compile(r'\[+\d+\]+')
+MALFORMED_SKILL_PATTERN = re.compile(r'\{+skm\d+\}+')
+
 def extract_game_elements(text):
     """Extract all game-specific elements from text"""
     elements = {
@@ -23,22 +34,18 @@ def extract_game_elements(text):
     }
     
     # Extract color tags with their hex values
-    color_pattern = r'<color[^>]*>.*?</color>'
-    color_matches = re.findall(color_pattern, text)
+    color_matches = COLOR_TAG_PATTERN.findall(text)
     elements['color_tags'] = color_matches
     
     # Extract color values from color tags
-    color_value_pattern = r'<color[=]([^>]+)>'
-    color_values = re.findall(color_value_pattern, text)
+    color_values = COLOR_VALUE_PATTERN.findall(text)
     elements['color_values'] = color_values
     
     # Extract ability references [numbers]
-    ability_pattern = r'\[(\d+)\]'
-    elements['ability_refs'] = re.findall(ability_pattern, text)
+    elements['ability_refs'] = ABILITY_REF_PATTERN.findall(text)
     
     # Extract skill variables {skm1}, {skm2}, etc.
-    skill_pattern = r'\{(skm\d+)\}'
-    elements['skill_vars'] = re.findall(skill_pattern, text)
+    elements['skill_vars'] = SKILL_VAR_PATTERN.findall(text)
     
     return elements
 
@@ -54,7 +61,7 @@ def count_enhanced_tokens(text):
     game_elements = extract_game_elements(text)
     
     # Count color tags
-    counts["<color>"] = len(re.findall(r'<color[^>]*>', text))
+    counts["<color>"] = len(COLOR_OPEN_PATTERN.findall(text))
     counts["</color>"] = text.count("</color>")
     
     # Count ability references
@@ -70,31 +77,27 @@ def detect_malformed_tags(text):
     issues = []
     
     # Malformed color tags with extra > characters
-    if re.search(r'</color>>+', text):
+    if EXTRA_CLOSE_PATTERN.search(text):
         issues.append("Extra '>' after closing color tag")
     
-    if re.search(r'<color=[^>]*>>[^<]*', text):
+    if EXTRA_OPEN_PATTERN.search(text):
         issues.append("Extra '>' after opening color tag")
     
     # Check for unmatched color tag counts
-    open_tags = len(re.findall(r'<color[^>]*>', text))
+    open_tags = len(COLOR_OPEN_PATTERN.findall(text))
     close_tags = text.count("</color>")
     
     if open_tags != close_tags:
         issues.append(f"Unmatched color tags: {open_tags} open, {close_tags} close")
     
     # Malformed ability references
-    if re.search(r'\[+\d+\]+', text):
-        malformed_abilities = re.findall(r'\[+\d+\]+', text)
-        for match in malformed_abilities:
-            if match.count('[') > 1 or match.count(']') > 1:
-                issues.append(f"Malformed ability reference: {match}")
+    for match in MALFORMED_ABILITY_PATTERN.findall(text):
+        if match.count('[') > 1 or match.count(']') > 1:
+            issues.append(f"Malformed ability reference: {match}")
     
     # Malformed skill variables
-    if re.search(r'\{+skm\d+\}+', text):
-        malformed_skills = re.findall(r'\{+skm\d+\}+', text)
-        for match in malformed_skills:
-            if match.count('{') > 1 or match.count('}') > 1:
-                issues.append(f"Malformed skill variable: {match}")
+    for match in MALFORMED_SKILL_PATTERN.findall(text):
+        if match.count('{') > 1 or match.count('}') > 1:
+            issues.append(f"Malformed skill variable: {match}")
     
     return issues
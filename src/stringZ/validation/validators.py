@@ -1,5 +1,23 @@
 import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+import numpy as np
 from .game_elements import count_enhanced_tokens, detect_malformed_tags
+from ..utils.progress_utils import ProgressReporter
+
+PUNCTUATION_MARKS = {'.', '!', '?', ':', ';', ','}
+COLOR_CONTENT_PATTERN = re.compile(r'<color[^>]*>([^<]+)</color>')
+NUMBER_PATTERN = re.compile(r'\d+(?:\.\d+)?%?')
+
+# Distinct EN texts whose token analysis is kept between validated pairs
+SOURCE_ANALYSIS_CACHE_SIZE = 65536
+
+@lru_cache(maxsize=SOURCE_ANALYSIS_CACHE_SIZE)
+def analyze_source_text(en_text):
+    """Token counts, game elements and malformed tags of an EN text.
+    Cached, since the same EN text is checked against every target language; callers must not modify the result"""
+    en_counts, en_elements = count_enhanced_tokens(en_text)
+    return en_counts, en_elements, detect_malformed_tags(en_text)
 
 def validate_translation_pair(str_id, en_text, target_text, target_lang):
     """Validate a single translation pair - returns list of issues"""
@@ -8,8 +26,8 @@ def validate_translation_pair(str_id, en_text, target_text, target_lang):
     if not en_text or not target_text:
         return issues
     
-    # Enhanced token counting
-    en_counts, en_elements = count_enhanced_tokens(en_text)
+    # Enhanced token counting (EN side shared between languages)
+    en_counts, en_elements, en_malformed = analyze_source_text(en_text)
     target_counts, target_elements = count_enhanced_tokens(target_text)
     
     # Check basic token mismatches
@@ -74,7 +92,6 @@ def validate_translation_pair(str_id, en_text, target_text, target_lang):
             })
     
     # Check for malformed tags
-    en_malformed = detect_malformed_tags(en_text)
     target_malformed = detect_malformed_tags(target_text)
     
     for malformed in en_malformed:
@@ -111,41 +128,111 @@ def validate_translation_pair(str_id, en_text, target_text, target_lang):
     
     return issues
 
-def run_validation(dataset):
-    """Run validation on the entire dataset"""
+def run_validation(dataset, progress=None):
+    """Run validation on the entire dataset (progress: optional ProgressReporter, stage "validation")"""
+    progress = ProgressReporter.ensure(progress)
+    progress.start("validation", len(dataset))
+    
     validation_results = {
-        'total_strings': len(dataset.entries),
+        'total_strings': len(dataset),
         'issues_found': 0,
         'critical_issues': 0,
         'warnings': 0,
         'detailed_issues': []
     }
     
-    for entry in dataset.entries:
-        if entry.target_text:  # Only validate if translation exists
-            issues = validate_translation_pair(
-                entry.str_id, 
-                entry.source_text, 
-                entry.target_text, 
-                dataset.target_lang
-            )
+    columns = dataset.columns
+    texts = dataset.normalized
+    
+    # Only validate if translation exists
+    translated = columns['target_text'].notna().to_numpy()
+    
+    # Rows without any tag, variable or token character on either side (nothing masked)
+    # can only fail the ending punctuation check, which is decided on the stripped columns.
+    # Only the remaining candidates go through the full per-pair validation.
+    structured = translated & (texts.source.has_placeholders | texts.target.has_placeholders)
+    candidates = np.flatnonzero(
+        structured | (translated & punctuation_mismatch(texts.source.stripped, texts.target.stripped))
+    )
+    
+    str_ids = columns['str_id'].to_numpy()
+    source_texts = columns['source_text'].to_numpy()
+    target_texts = columns['target_text'].to_numpy()
+    
+    for i in candidates.tolist():
+        progress.update(i)
+        issues = validate_translation_pair(
+            str_ids[i],
+            source_texts[i],
+            target_texts[i],
+            dataset.target_lang
+        )
+        
+        for issue in issues:
+            validation_results['issues_found'] += 1
+            if issue['severity'] == 'CRITICAL':
+                validation_results['critical_issues'] += 1
+            else:
+                validation_results['warnings'] += 1
             
-            for issue in issues:
-                validation_results['issues_found'] += 1
-                if issue['severity'] == 'CRITICAL':
-                    validation_results['critical_issues'] += 1
-                else:
-                    validation_results['warnings'] += 1
-                
-                validation_results['detailed_issues'].append({
-                    'str_id': entry.str_id,
-                    'en_text': entry.source_text,
-                    'target_text': entry.target_text,
-                    **issue
-                })
+            validation_results['detailed_issues'].append({
+                'str_id': str_ids[i],
+                'en_text': source_texts[i],
+                'target_text': target_texts[i],
+                **issue
+            })
     
+    progress.finish()
     return validation_results
 
+def validate_languages(datasets, workers=1, progress=None):
+    """
+    Run validation for several target languages, e.g. the output of TranslationProcessor.process_languages
+    
+    Args:
+        datasets: Dataset per target language
+        workers: Processes the languages are spread over (1 validates them in this process,
+                 sharing the EN analysis cache between languages)
+        progress: Optional ProgressReporter (stage "validation" of every language; in parallel
+                  runs one stage over the languages, polled for cancellation as they finish)
+    
+    Returns:
+        dict: run_validation results per language, in the input order
+    """
+    if workers <= 1 or len(datasets) <= 1:
+        return {language: run_validation(dataset, progress) for language, dataset in datasets.items()}
+    
+    progress = ProgressReporter.ensure(progress)
+    progress.start("validation", len(datasets))
+    
+    results = {}
+    with ProcessPoolExecutor(max_workers=min(workers, len(datasets))) as executor:
+        futures = {executor.submit(run_validation, dataset): language for language, dataset in datasets.items()}
+        try:
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                progress.check_cancelled()
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    
+    progress.finish()
+    return {language: results[language] for language in datasets}
+
+def punctuation_mismatch(en_stripped, target_stripped):
+    """Vectorised form of detect_punctuation_inconsistencies over stripped text arrays:
+    True where the pair would get a punctuation issue"""
+    en_last = np.array([text[-1:] for text in en_stripped], dtype=object)
+    target_last = np.array([text[-1:] for text in target_stripped], dtype=object)
+    
+    marks = list(PUNCTUATION_MARKS)
+    en_punct = np.isin(en_last, marks)
+    target_punct = np.isin(target_last, marks)
+    
+    # Missing (target has other last char) or different ending punctuation; empty texts never mismatch
+    return en_punct & (target_last != "") & (~target_punct | (en_last != target_last))
+
 def detect_punctuation_inconsistencies(en_text, target_text):
     """Detect punctuation inconsistencies between EN and target text"""
     issues = []
@@ -159,11 +246,9 @@ def detect_punctuation_inconsistencies(en_text, target_text):
     en_last_char = en_clean[-1]
     target_last_char = target_clean[-1]
     
-    punctuation_marks = {'.', '!', '?', ':', ';', ','}
-    
     # Check ending punctuation consistency
-    en_ends_with_punct = en_last_char in punctuation_marks
-    target_ends_with_punct = target_last_char in punctuation_marks
+    en_ends_with_punct = en_last_char in PUNCTUATION_MARKS
+    target_ends_with_punct = target_last_char in PUNCTUATION_MARKS
     
     # Flag when English HAS punctuation but target is MISSING it
     if en_ends_with_punct and not target_ends_with_punct:
@@ -178,18 +263,18 @@ def detect_content_inconsistencies(en_text, target_text):
     issues = []
     
     # Extract numeric values from color tags
-    en_color_contents = re.findall(r'<color[^>]*>([^<]+)</color>', en_text)
-    target_color_contents = re.findall(r'<color[^>]*>([^<]+)</color>', target_text)
+    en_color_contents = COLOR_CONTENT_PATTERN.findall(en_text)
+    target_color_contents = COLOR_CONTENT_PATTERN.findall(target_text)
     
     en_numbers = []
     target_numbers = []
     
     for content in en_color_contents:
-        numbers = re.findall(r'\d+(?:\.\d+)?%?', content)
+        numbers = NUMBER_PATTERN.findall(content)
         en_numbers.extend(numbers)
     
     for content in target_color_contents:
-        numbers = re.findall(r'\d+(?:\.\d+)?%?', content)
+        numbers = NUMBER_PATTERN.findall(content)
         target_numbers.extend(numbers)
     
     # Compare numeric values (using sets to ignore order)
@@ -33,6 +33,9 @@ a = Analysis(
         'scipy.sparse.linalg',
         'scipy.linalg',
         'threadpoolctl',
+        'pyarrow',
+        'pyarrow.compute',
+        'pyarrow.ipc',
 	],
 	hookspath=[],
 	hooksconfig={},